@@ -0,0 +1,215 @@
+"""
+Enemy archetype table.
+
+Every enemy kind is a behaviour class plus a stat block. Subjects list the
+kinds they field with spawn weights. compile_table() builds the weight tables once;
+each kind is resolved into a compact record the first time it is needed, so
+a subject's enemy module is only imported once that subject is played.
+Spawning picks kinds with a single bisect and builds enemies with
+difficulty-scaled stats already in place, however many subjects the table
+grows to.
+
+Subjects from Gameplan.txt that don't have bespoke enemy code yet reuse the
+closest existing behaviour with their own stats.
+"""
+import random
+from bisect import bisect
+from collections import Counter, OrderedDict, namedtuple
+
+from config import (WIDTH, HEIGHT, ARENA, MATH_SWORDSMAN, MATH_ARCHER, EXAM_BOSS,
+                    BINARY_BLADE, BUG_SWARM, KINETIC_BRUTE, GRAVITY_MANIPULATOR,
+                    ACIDIC_ALCHEMIST, POISON_MITE, BIO_ENGINEER, ANCIENT_WARRIOR,
+                    ARTILLERY_COMMANDER)
+
+# Behaviour classes, imported by name the first time a kind using them is needed
+BEHAVIOURS = {
+    "MathSwordsman": "enemy",
+    "MathArcher": "enemy",
+    "ExamBoss": "enemy",
+    "BinaryBlade": "computer_science_enemies",
+    "BugSwarm": "computer_science_enemies",
+    "KineticBrute": "physics_enemies",
+    "GravityManipulator": "physics_enemies",
+    "AcidicAlchemist": "chemistry_enemies",
+    "PoisonMite": "biology_enemies",
+    "BioEngineer": "biology_enemies",
+    "AncientWarrior": "history_enemies",
+    "ArtilleryCommander": "history_enemies",
+}
+
+# kind: (behaviour, base stats, overrides)
+KINDS = {
+    # Math
+    "math_swordsman": ("MathSwordsman", MATH_SWORDSMAN, {}),
+    "math_archer": ("MathArcher", MATH_ARCHER, {}),
+    "exam_boss": ("ExamBoss", EXAM_BOSS, {}),
+    # Computer Science
+    "binary_blade": ("BinaryBlade", BINARY_BLADE, {}),
+    "bug_swarm": ("BugSwarm", BUG_SWARM, {}),
+    # Physics
+    "kinetic_brute": ("KineticBrute", KINETIC_BRUTE, {}),
+    "gravity_manipulator": ("GravityManipulator", GRAVITY_MANIPULATOR, {}),
+    # Chemistry
+    "acidic_alchemist": ("AcidicAlchemist", ACIDIC_ALCHEMIST, {}),
+    # Biology
+    "poison_mite": ("PoisonMite", POISON_MITE, {}),
+    "bio_engineer": ("BioEngineer", BIO_ENGINEER, {}),
+    # History
+    "ancient_warrior": ("AncientWarrior", ANCIENT_WARRIOR, {}),
+    "artillery_commander": ("ArtilleryCommander", ARTILLERY_COMMANDER, {}),
+    # Astronomy
+    "cosmic_dust_cloud": ("AcidicAlchemist", ACIDIC_ALCHEMIST,
+                          {"radius": 20, "move_speed": 90.0, "max_hp": 60}),
+    "stellar_sniper": ("MathArcher", MATH_ARCHER,
+                       {"keep_distance": 320.0, "aggro_range": 600.0, "projectile_speed": 420.0,
+                        "shoot_cooldown": 1.8, "base_damage": 9}),
+    # Business
+    "aggressive_investor": ("MathSwordsman", MATH_SWORDSMAN,
+                            {"move_speed": 150.0, "base_damage": 12, "max_hp": 45}),
+    "market_analyst": ("BioEngineer", BIO_ENGINEER, {"max_hp": 40}),
+    # Geology
+    "rock_golem": ("AncientWarrior", ANCIENT_WARRIOR,
+                   {"radius": 22, "move_speed": 70.0, "max_hp": 90, "base_damage": 14}),
+    "crystal_shard_slinger": ("ArtilleryCommander", ARTILLERY_COMMANDER,
+                              {"projectile_speed": 300.0, "shoot_cooldown": 1.6, "base_damage": 8}),
+    # Music
+    "rhythm_brute": ("KineticBrute", KINETIC_BRUTE, {"max_hp": 75, "move_speed": 95.0}),
+    "melody_maestro": ("GravityManipulator", GRAVITY_MANIPULATOR, {"max_hp": 50}),
+    # Health
+    "infection_carrier": ("PoisonMite", POISON_MITE, {"move_speed": 200.0, "max_hp": 24}),
+    "disease_vector": ("BioEngineer", BIO_ENGINEER, {"projectile_speed": 320.0}),
+    # Psychology
+    "cognitive_dissonance": ("BinaryBlade", BINARY_BLADE, {"max_hp": 55}),
+    "projectionist": ("BugSwarm", BUG_SWARM, {"shoot_cooldown": 1.2}),
+    # Engineering
+    "robotic_enforcer": ("KineticBrute", KINETIC_BRUTE, {"max_hp": 100, "base_damage": 13}),
+    "drone_operator": ("MathArcher", MATH_ARCHER, {"shoot_cooldown": 0.9, "base_damage": 5}),
+    # Art
+    "graffiti_golem": ("AcidicAlchemist", ACIDIC_ALCHEMIST, {"max_hp": 80, "move_speed": 100.0}),
+    "brushstroke_blaster": ("BugSwarm", BUG_SWARM, {"projectile_speed": 280.0}),
+    # Communication
+    "misinformation_agent": ("BinaryBlade", BINARY_BLADE, {"move_speed": 150.0, "max_hp": 50}),
+    "echoing_orator": ("ArtilleryCommander", ARTILLERY_COMMANDER,
+                       {"projectile_speed": 240.0, "base_damage": 8}),
+}
+
+# Room class_type -> [(kind, spawn weight)]
+SUBJECTS = {
+    "math": [("math_swordsman", 0.6), ("math_archer", 0.4)],
+    "computer science": [("binary_blade", 0.5), ("bug_swarm", 0.5)],
+    "physics": [("kinetic_brute", 0.6), ("gravity_manipulator", 0.4)],
+    "chemistry": [("acidic_alchemist", 1.0)],
+    "biology": [("poison_mite", 0.6), ("bio_engineer", 0.4)],
+    "history": [("ancient_warrior", 0.5), ("artillery_commander", 0.5)],
+    "astronomy": [("cosmic_dust_cloud", 0.6), ("stellar_sniper", 0.4)],
+    "business": [("aggressive_investor", 0.6), ("market_analyst", 0.4)],
+    "geology": [("rock_golem", 0.6), ("crystal_shard_slinger", 0.4)],
+    "music": [("rhythm_brute", 0.6), ("melody_maestro", 0.4)],
+    "health": [("infection_carrier", 0.6), ("disease_vector", 0.4)],
+    "psychology": [("cognitive_dissonance", 0.6), ("projectionist", 0.4)],
+    "engineering": [("robotic_enforcer", 0.6), ("drone_operator", 0.4)],
+    "art": [("graffiti_golem", 0.6), ("brushstroke_blaster", 0.4)],
+    "communication": [("misinformation_agent", 0.6), ("echoing_orator", 0.4)],
+}
+FALLBACK_SUBJECT = "math"
+BOSS_KIND = "exam_boss"
+SCALED_CACHE_SIZE = 128  # scaled stat blocks kept, least recently used dropped first
+
+Archetype = namedtuple("Archetype", "name cls stats")
+SubjectTable = namedtuple("SubjectTable", "kinds cum_weights total")
+
+_archetypes = {}
+_subjects = {}
+_scaled = OrderedDict()  # (kind, multiplier) -> stats
+
+
+def compile_table():
+    """Build the per-subject weight tables; safe to call repeatedly"""
+    if _subjects:
+        return
+    for subject, entries in SUBJECTS.items():
+        cum, total = [], 0.0
+        for _, weight in entries:
+            total += weight
+            cum.append(total)
+        _subjects[subject] = SubjectTable(tuple(k for k, _ in entries), tuple(cum), total)
+
+
+def get_archetype(kind):
+    arche = _archetypes.get(kind)
+    if arche is None:
+        behaviour, base, overrides = KINDS[kind]
+        # __import__ rather than importlib.import_module so -X importtime reports it
+        cls = getattr(__import__(BEHAVIOURS[behaviour]), behaviour)
+        arche = _archetypes[kind] = Archetype(kind, cls, {**base, **overrides})
+    return arche
+
+
+def load_subjects(subjects):
+    """Import the enemy modules for the given room class_types (and the boss) up front"""
+    compile_table()
+    for subject in subjects:
+        table = _subjects.get(subject) or _subjects[FALLBACK_SUBJECT]
+        for kind in table.kinds:
+            get_archetype(kind)
+    get_archetype(BOSS_KIND)
+
+
+def scaled_stats(kind, difficulty_mult):
+    """Stat block for kind with difficulty applied, cached per multiplier.
+
+    The multiplier is rounded to 0.01, the step horde mode ramps in. Endless
+    runs still reach a new one every room, so only the SCALED_CACHE_SIZE most
+    recently used blocks are kept.
+    """
+    difficulty_mult = round(difficulty_mult, 2)
+    key = (kind, difficulty_mult)
+    stats = _scaled.get(key)
+    if stats is None:
+        stats = dict(get_archetype(kind).stats)
+        if difficulty_mult != 1.0:
+            stats["max_hp"] = int(stats["max_hp"] * difficulty_mult)
+            stats["base_damage"] = int(stats["base_damage"] * difficulty_mult)
+        _scaled[key] = stats
+        if len(_scaled) > SCALED_CACHE_SIZE:
+            _scaled.popitem(last=False)
+    else:
+        _scaled.move_to_end(key)
+    return stats
+
+
+def random_positions(n, rng=random, inset=80):
+    lo = ARENA["margin"] + inset
+    return [(rng.randint(lo, WIDTH - lo), rng.randint(lo, HEIGHT - lo)) for _ in range(n)]
+
+
+def spawn_batch(kind, n, difficulty_mult=1.0, rng=random, positions=None):
+    """Build n enemies of one kind with difficulty scaling already applied"""
+    arche = get_archetype(kind)
+    stats = scaled_stats(kind, difficulty_mult)
+    if positions is None:
+        positions = random_positions(n, rng)
+    cls = arche.cls
+    enemies = [cls(pos, stats) for pos in positions]
+    for e in enemies:
+        e.archetype = kind
+        e.rng = rng  # AI rolls draw from the same generator as the room that spawned them
+    return enemies
+
+
+def pick_kinds(subject, n, rng=random):
+    """Draw n kinds from a subject's weighted table"""
+    compile_table()
+    table = _subjects.get(subject) or _subjects[FALLBACK_SUBJECT]
+    kinds, cum, total = table
+    if len(kinds) == 1:
+        return [kinds[0]] * n
+    return [kinds[bisect(cum, rng.random() * total)] for _ in range(n)]
+
+
+def spawn_wave(subject, n, difficulty_mult=1.0, rng=random):
+    """Spawn n enemies for a subject, one batch per kind drawn"""
+    enemies = []
+    for kind, count in Counter(pick_kinds(subject, n, rng)).items():
+        enemies.extend(spawn_batch(kind, count, difficulty_mult, rng))
+    return enemies
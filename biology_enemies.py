@@ -1,13 +1,16 @@
 import pygame
 import random
 import math
-from sprite_renderer import draw_enemy_sprite
-from config import WIDTH, HEIGHT, ARENA, COLORS
+from sprite_renderer import draw_enemy_sprite, draw_hp_bar
+from utils import swept_circle_hit
+from pathing import chase_direction
+from config import WIDTH, HEIGHT, ARENA, COLORS, POISON_MITE, BIO_ENGINEER
 
 
 class Projectile:
     def __init__(self, pos, vel, radius, damage, lifetime=3.0):
         self.pos = pygame.Vector2(pos)
+        self.prev_pos = self.pos.copy()  # start of the last step, for swept hits
         self.vel = pygame.Vector2(vel)
         self.radius = radius
         self.damage = damage
@@ -15,6 +18,7 @@ class Projectile:
         self.alive_flag = True
 
     def update(self, dt):
+        self.prev_pos.update(self.pos)
         self.pos += self.vel * dt
         self.lifetime -= dt
         
@@ -30,8 +34,8 @@ class Projectile:
     def try_hit_player(self, player):
         if not self.alive_flag:
             return
-        dist = self.pos.distance_to(player.pos)
-        if dist <= (self.radius + player.radius):
+        if swept_circle_hit(self.prev_pos, self.pos, self.radius,
+                            player.prev_pos, player.pos, player.radius) is not None:
             player.take_damage(self.damage)
             self.alive_flag = False
 
@@ -41,25 +45,26 @@ class Projectile:
 
 class PoisonMite:
     """Biology melee: Small, fast enemy that applies poison"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or POISON_MITE
         self.pos = pygame.Vector2(pos)
-        self.radius = 10
-        self.speed = 180.0
-        self.max_hp = 20
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 5
-        self.aggro_range = 450.0
-        self.attack_range = 35.0
-        self.attack_cooldown = 0.6
-        self.attack_windup = 0.25
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.attack_range = stats["attack_range"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
         self._atk_timer = 0.0
         self.state = "idle"  # idle, windup, swing
         self.state_timer = 0.0
         self.flash_timer = 0.0
         
         # Poison application
-        self.poison_duration = 3.0
-        self.poison_dps = 2.0
+        self.poison_duration = stats["poison_duration"]
+        self.poison_dps = stats["poison_dps"]
     
     def update(self, dt, player):
         self._atk_timer = max(0.0, self._atk_timer - dt)
@@ -71,9 +76,9 @@ class PoisonMite:
         if self.state == "idle":
             # Move toward player
             if dist > self.attack_range * 0.9 and dist <= self.aggro_range:
-                direction = (player.pos - self.pos)
-                if direction.length_squared() > 0:
-                    self.pos += direction.normalize() * self.speed * dt
+                direction = chase_direction(self.pos, player.pos)
+                if direction is not None:
+                    self.pos += direction * self.speed * dt
             
             # Start attack if in range
             if dist <= self.attack_range and self._atk_timer <= 0.0:
@@ -114,31 +119,26 @@ class PoisonMite:
         pygame.draw.circle(surf, color, (int(self.pos.x), int(self.pos.y)), self.radius)
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 30
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 8
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 30, 4, self.radius + 8)
 
 
 class BioEngineer:
     """Biology ranged: Shoots projectiles that heal enemies or poison player"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or BIO_ENGINEER
         self.pos = pygame.Vector2(pos)
-        self.radius = 13
-        self.speed = 110.0
-        self.max_hp = 35
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 6
-        self.aggro_range = 500.0
-        self.keep_distance = 220.0
-        self.shoot_cd = 1.6
-        self.proj_speed = 280.0
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.keep_distance = stats["keep_distance"]
+        self.shoot_cd = stats["shoot_cooldown"]
+        self.proj_speed = stats["projectile_speed"]
         self._shoot_timer = 0.0
         self._heal_timer = 0.0
-        self.heal_cooldown = 5.0
+        self.heal_cooldown = stats["heal_cooldown"]
         self.projectiles = []
         self.flash_timer = 0.0
     
@@ -199,13 +199,7 @@ class BioEngineer:
                         (self.pos.x, self.pos.y + cross_size), 2)
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 40
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 8
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 40, 4, self.radius + 8)
         
         # Draw projectiles
         for p in self.projectiles:
@@ -1,12 +1,14 @@
 import pygame
 import math
-from config import WIDTH, HEIGHT, ARENA, COLORS
-from utils import clamp, circle_hit
+from config import WIDTH, HEIGHT, ARENA, COLORS, ACIDIC_ALCHEMIST, HAZARDS
+from utils import clamp, swept_circle_hit
+from pathing import chase_direction
 from sprite_renderer import draw_enemy_sprite
 
 class Projectile:
     def __init__(self, pos, vel, radius, damage, ttl=3.0):
         self.pos = pygame.Vector2(pos)
+        self.prev_pos = self.pos.copy()  # start of the last step, for swept hits
         self.vel = pygame.Vector2(vel)
         self.radius = radius
         self.damage = damage
@@ -14,6 +16,7 @@ class Projectile:
         self.alive_flag = True
 
     def update(self, dt):
+        self.prev_pos.update(self.pos)
         if not self.alive_flag:
             return
         self.ttl -= dt
@@ -28,7 +31,8 @@ class Projectile:
     def try_hit_player(self, player):
         if not self.alive_flag:
             return False
-        if circle_hit(self.pos.x, self.pos.y, self.radius, player.pos.x, player.pos.y, player.radius):
+        if swept_circle_hit(self.prev_pos, self.pos, self.radius,
+                            player.prev_pos, player.pos, player.radius) is not None:
             self.alive_flag = False
             player.take_damage(self.damage)
             if hasattr(player, 'apply_poison'):
@@ -41,22 +45,24 @@ class Projectile:
 
 class AcidicAlchemist:
     """Chemistry melee: applies poison debuff"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or ACIDIC_ALCHEMIST
         self.pos = pygame.Vector2(pos)
-        self.radius = 16
-        self.speed = 125.0
-        self.max_hp = 70
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 8
-        self.aggro_range = 420.0
-        self.attack_range = 45.0
-        self.attack_cooldown = 0.95
-        self.attack_windup = 0.35
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.attack_range = stats["attack_range"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
         
         self._atk_timer = 0.0
         self.state_timer = 0.0
         self.state = "idle"
         self.flash_timer = 0.0
+        self.spills = []  # hazards.py: (kind, pos, radius) for the world to stamp
         
     def update(self, dt, player):
         self._atk_timer = max(0.0, self._atk_timer - dt)
@@ -67,9 +73,9 @@ class AcidicAlchemist:
         
         if self.state == "idle":
             if dist > self.attack_range * 0.9 and dist <= self.aggro_range:
-                direction = (player.pos - self.pos)
-                if direction.length_squared() > 0:
-                    self.pos += direction.normalize() * self.speed * dt
+                direction = chase_direction(self.pos, player.pos)
+                if direction is not None:
+                    self.pos += direction * self.speed * dt
             
             if dist <= self.attack_range and self._atk_timer <= 0.0:
                 self.state = "windup"
@@ -81,6 +87,8 @@ class AcidicAlchemist:
                     player.take_damage(self.base_damage)
                     if hasattr(player, 'apply_poison'):
                         player.apply_poison(6.0, 1)
+                # The beaker shatters where the player stood, hit or miss
+                self.spills.append(("acid", (player.pos.x, player.pos.y), HAZARDS["alchemist_splash"]))
                 self.state = "swing"
                 self.state_timer = 0.15
                 self._atk_timer = self.attack_cooldown
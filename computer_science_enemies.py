@@ -1,13 +1,18 @@
 import pygame
 import math
-import random  # ADD AT TOP
-from config import WIDTH, HEIGHT, ARENA, COLORS
-from utils import clamp, circle_hit
-from sprite_renderer import draw_enemy_sprite
+import random
+import numpy as np
+from config import WIDTH, HEIGHT, ARENA, COLORS, BINARY_BLADE, BUG_SWARM, FLOCK
+from utils import clamp, swept_circle_hit, get_font, new_surface
+from pathing import chase_direction
+import flocking
+import patterns
+from sprite_renderer import draw_enemy_sprite, draw_hp_bar, lod_level, LOD_MINIMAL
 
 class Projectile:
     def __init__(self, pos, vel, radius, damage, ttl=3.0):
         self.pos = pygame.Vector2(pos)
+        self.prev_pos = self.pos.copy()  # start of the last step, for swept hits
         self.vel = pygame.Vector2(vel)
         self.radius = radius
         self.damage = damage
@@ -15,6 +20,7 @@ class Projectile:
         self.alive_flag = True
 
     def update(self, dt):
+        self.prev_pos.update(self.pos)
         if not self.alive_flag:
             return
         self.ttl -= dt
@@ -29,7 +35,8 @@ class Projectile:
     def try_hit_player(self, player):
         if not self.alive_flag:
             return False
-        if circle_hit(self.pos.x, self.pos.y, self.radius, player.pos.x, player.pos.y, player.radius):
+        if swept_circle_hit(self.prev_pos, self.pos, self.radius,
+                            player.prev_pos, player.pos, player.radius) is not None:
             self.alive_flag = False
             player.take_damage(self.damage)
             return True
@@ -40,24 +47,26 @@ class Projectile:
 
 class BinaryBlade:
     """CS Hacker: melee with consecutive hit scaling"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or BINARY_BLADE
         self.pos = pygame.Vector2(pos)
-        self.radius = 16
-        self.speed = 135.0
-        self.max_hp = 65
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 9
-        self.aggro_range = 400.0
-        self.attack_range = 45.0
-        self.attack_cooldown = 0.8
-        self.attack_windup = 0.3
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.attack_range = stats["attack_range"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
+        self.teleport_interval = stats["teleport_interval"]
         
         self._atk_timer = 0.0
         self.state_timer = 0.0
         self.state = "idle"
         self.flash_timer = 0.0
         self.consecutive_hits = 1
-        self._teleport_timer = 60.0
+        self._teleport_timer = self.teleport_interval
         self.animation_time = 0.0
         
     def update(self, dt, player):
@@ -72,14 +81,14 @@ class BinaryBlade:
         if self._teleport_timer <= 0:
             direction = (player.pos - self.pos).normalize() if dist > 0 else pygame.Vector2(1, 0)
             self.pos = player.pos - direction * 60
-            self._teleport_timer = 60.0
+            self._teleport_timer = self.teleport_interval
             self.consecutive_hits = 0
         
         if self.state == "idle":
             if dist > self.attack_range * 0.9 and dist <= self.aggro_range:
-                direction = (player.pos - self.pos)
-                if direction.length_squared() > 0:
-                    self.pos += direction.normalize() * self.speed * dt
+                direction = chase_direction(self.pos, player.pos)
+                if direction is not None:
+                    self.pos += direction * self.speed * dt
             
             if dist <= self.attack_range and self._atk_timer <= 0.0:
                 self.state = "windup"
@@ -117,111 +126,146 @@ class BinaryBlade:
         draw_enemy_sprite(surf, self.pos, self.radius, 'cs', self.state, self.animation_time)
         
         # Flash effect when hit
-        if self.flash_timer > 0:
-            flash_surf = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
+        if self.flash_timer > 0 and lod_level() < LOD_MINIMAL:
+            flash_surf = new_surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
             alpha = int(150 * (self.flash_timer / 0.12))
             pygame.draw.circle(flash_surf, (255, 255, 255, alpha), (self.radius * 2, self.radius * 2), self.radius * 2)
             surf.blit(flash_surf, (int(self.pos.x) - self.radius * 2, int(self.pos.y) - self.radius * 2))
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 40
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 24
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 40, 4, self.radius + 24)
         
-        hit_text = pygame.font.SysFont("arial", 12).render(str(self.consecutive_hits), True, (255, 255, 100))
+        hit_text = get_font("arial", 12).render(str(self.consecutive_hits), True, (255, 255, 100))
         surf.blit(hit_text, (self.pos.x - 7, self.pos.y - 7))
 
 class BugSwarm:
-    """CS Bug Swarm: ranged enemy shooting error code projectiles"""
-    def __init__(self, pos):
+    """CS Bug Swarm: a flock of small bugs that hangs back and fires error codes.
+
+    Each bug has its own position, velocity and HP; the swarm as a whole
+    reports its centroid as pos, its spread as radius and the sum of its bugs'
+    HP as hp. The bugs move by flocking.step.
+    """
+    flock = True  # moves its own units; the crowd solver leaves it alone
+
+    def __init__(self, pos, stats=None):
+        stats = stats or BUG_SWARM
         self.pos = pygame.Vector2(pos)
-        self.radius = 14
-        self.speed = 125.0
-        self.max_hp = 48
+        self.min_radius = stats["radius"]
+        self.radius = self.min_radius
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 7
-        self.aggro_range = 500.0
-        self.keep_distance = 240.0
-        self.shoot_cd = 1.4
-        self.proj_speed = 320.0
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.keep_distance = stats["keep_distance"]
+        self.shoot_cd = stats["shoot_cooldown"]
+        self.proj_speed = stats["projectile_speed"]
+        self.unit_radius = stats["unit_radius"]
+        n = stats["units"]
+        angles = np.linspace(0.0, 2.0 * math.pi, n, endpoint=False)
+        spread = stats["unit_spread"] * np.sqrt(np.linspace(0.2, 1.0, n))
+        self.unit_pos = np.column_stack((self.pos.x + np.cos(angles) * spread,
+                                         self.pos.y + np.sin(angles) * spread))
+        self.unit_vel = np.zeros((n, 2))
+        self.unit_hp = np.full(n, self.max_hp / n)
+        self.flocked = False  # set by flocking.step when it has already moved the bugs this tick
         self._shoot_timer = 0.0
         self.projectiles = []
+        self.batches = []  # error-code fans (patterns.BulletBatch)
+        self.rng = random  # archetypes.spawn_batch swaps in the room's generator
         self.flash_timer = 0.0
         self._homing_spawn_timer = 0.0
         self.animation_time = 0.0
-        
+
     def update(self, dt, player):
         self.animation_time += dt
         self._shoot_timer = max(0.0, self._shoot_timer - dt)
         self.flash_timer = max(0.0, self.flash_timer - dt)
         self._homing_spawn_timer -= dt
-        
+
+        if not self.flocked:
+            flocking.step([self], dt, player)  # World steps all of a room's swarms at once
+        self.flocked = False
+        live = np.flatnonzero(self.unit_hp > 0.0)
+
         dist = self.pos.distance_to(player.pos)
-        
-        if dist < self.keep_distance * 0.8:
-            dir = (self.pos - player.pos)
-            if dir.length_squared() > 0:
-                self.pos += dir.normalize() * self.speed * dt
-        elif dist > self.keep_distance * 1.2 and dist <= self.aggro_range:
-            dir = (player.pos - self.pos)
-            if dir.length_squared() > 0:
-                self.pos += dir.normalize() * self.speed * dt
-        
-        if dist <= self.aggro_range and self._shoot_timer <= 0.0:
-            dir = (player.pos - self.pos)
+        if dist <= self.aggro_range and self._shoot_timer <= 0.0 and len(live):
+            # Fire from one of the bugs
+            x, y = self.unit_pos[live[self.rng.randrange(len(live))]].tolist()
+            origin = pygame.Vector2(x, y)
+            dir = (player.pos - origin)
             if dir.length_squared() > 0:
                 v = dir.normalize() * self.proj_speed
-                self.projectiles.append(Projectile(self.pos.copy(), v, 6, self.base_damage, 2.5))
+                self.projectiles.append(Projectile(origin, v, 6, self.base_damage, 2.5))
                 self._shoot_timer = self.shoot_cd
-        
+
         if self._homing_spawn_timer <= 0:
             self._homing_spawn_timer = 4.0
             if dist <= self.aggro_range:
-                for _ in range(random.randint(2, 3)):
-                    angle = random.uniform(0, 6.28)
-                    vel = pygame.Vector2(math.cos(angle), math.sin(angle)) * 150
-                    self.projectiles.append(Projectile(self.pos.copy(), vel, 5, self.base_damage - 1, 8.0))
-        
+                self.batches.append(patterns.fire("bug_fan", self.pos, player.pos, self.base_damage, self.rng))
+        self.batches = patterns.advance(self.batches, dt)
+
         for p in self.projectiles:
             p.update(dt)
         # remove dead projectiles to prevent memory leak
         self.projectiles = [p for p in self.projectiles if p.alive_flag]
-        
-        margin = ARENA["margin"]
-        self.pos.x = max(margin, min(WIDTH - margin, self.pos.x))
-        self.pos.y = max(margin, min(HEIGHT - margin, self.pos.y))
-    
+
+    def hit_units(self, start, end, reach, dmg):
+        """Split dmg between the bugs within reach of the segment start -> end.
+
+        A swing deals its damage once however many bugs it catches, so
+        sweeping the whole flock costs it no more than one enemy's hit would.
+        Returns the damage actually dealt (0 when no bug was in reach).
+        """
+        live = np.flatnonzero(self.unit_hp > 0.0)
+        if not len(live):
+            return 0
+        pos = self.unit_pos[live]
+        sx, sy = start
+        ex, ey = end
+        seg = np.array((ex - sx, ey - sy))
+        rel = pos - (sx, sy)
+        seg2 = float(seg @ seg)
+        t = np.clip(rel @ seg / seg2, 0.0, 1.0) if seg2 > 0.0 else np.zeros(len(pos))
+        off = rel - t[:, None] * seg
+        hit = (off * off).sum(axis=1) < (reach + self.unit_radius) ** 2
+        if not hit.any():
+            return 0
+        idx = live[hit]
+        taken = np.minimum(self.unit_hp[idx], dmg / len(idx))
+        self.unit_hp[idx] -= taken
+        # Scatter the bugs that were hit away from the blow
+        off = off[hit]
+        norm = np.maximum(np.sqrt((off * off).sum(axis=1)), 1e-6)[:, None]
+        self.unit_vel[idx] += off / norm * FLOCK["hit_scatter"]
+        self.hp = float(self.unit_hp.sum())
+        self.flash_timer = 0.12
+        return float(taken.sum())
+
     def take_damage(self, dmg):
-        self.hp = max(0.0, self.hp - dmg)
+        """Damage that isn't aimed at particular bugs lands on the one nearest the centre"""
+        live = np.flatnonzero(self.unit_hp > 0.0)
+        if len(live):
+            rel = self.unit_pos[live] - (self.pos.x, self.pos.y)
+            i = live[np.argmin((rel * rel).sum(axis=1))]
+            self.unit_hp[i] = max(0.0, self.unit_hp[i] - dmg)
+            self.hp = float(self.unit_hp.sum())
         self.flash_timer = 0.12
-    
+
     def alive(self):
         return self.hp > 0
-    
+
     def draw(self, surf):
-        # Draw sprite
-        draw_enemy_sprite(surf, self.pos, self.radius, 'cs', 'idle', self.animation_time)
-        
-        # Flash effect when hit
-        if self.flash_timer > 0:
-            flash_surf = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
-            alpha = int(150 * (self.flash_timer / 0.12))
-            pygame.draw.circle(flash_surf, (255, 255, 255, alpha), (self.radius * 2, self.radius * 2), self.radius * 2)
-            surf.blit(flash_surf, (int(self.pos.x) - self.radius * 2, int(self.pos.y) - self.radius * 2))
-        
-        # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 40
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 24
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
-        
+        color = (255, 255, 255) if self.flash_timer > 0 else COLORS["bug"]
+        r = self.unit_radius
+        for x, y in self.unit_pos[self.unit_hp > 0.0].astype(int).tolist():
+            pygame.draw.circle(surf, color, (x, y), r)
+
+        # HP bar for the whole swarm
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 40, 4, self.radius + 12)
+
         for p in self.projectiles:
             if p.alive_flag:
-                p.draw(surf)
\ No newline at end of file
+                p.draw(surf)
+        for b in self.batches:
+            b.draw(surf)
@@ -10,6 +10,7 @@ COLORS = {
     "bg": (15, 20, 35),  # Darker, richer background
     "bg_accent": (25, 35, 60),  # Accent background
     "arena": (120, 140, 200),  # Brighter arena border
+    "wall": (45, 55, 85),  # Room obstacles
     "player": (80, 180, 255),  # Vibrant cyan-blue player
     "player_glow": (100, 220, 255),  # Glow effect
     "attack": (255, 120, 200),  # Vibrant magenta attack
@@ -26,6 +27,7 @@ COLORS = {
     "interact": (150, 200, 255),  # Bright blue interact
     "proj": (255, 200, 100),  # Orange projectile
     "poison": (150, 255, 100),  # Bright green poison
+    "bug": (120, 230, 140),  # Bug swarm units
     "history": (220, 180, 130),  # Warm history color
     "menu_accent": (80, 120, 200),  # Menu accent blue
     "menu_hover": (100, 150, 230),  # Menu hover effect
@@ -36,6 +38,7 @@ COLORS = {
 PLAYER = {
     "move_speed": 300,
     "max_hp": 100,
+    "mass": 2.0,  # crowd separation and knockback; enemies default to 1 at radius 16
     "melee_damage": 12,
     "attack_cooldown": 0.35,
     "attack_range": 38,
@@ -44,6 +47,7 @@ PLAYER = {
 
 # Math Swordsman
 MATH_SWORDSMAN = {
+    "radius": 16,
     "move_speed": 100.0,
     "max_hp": 25,
     "base_damage": 8,
@@ -56,6 +60,7 @@ MATH_SWORDSMAN = {
 
 # Math Archer
 MATH_ARCHER = {
+    "radius": 15,
     "move_speed": 90.0,
     "max_hp": 20,
     "base_damage": 6,
@@ -71,6 +76,7 @@ MATH_ARCHER = {
 
 # Exam Boss
 EXAM_BOSS = {
+    "radius": 28,
     "max_hp": 200,
     "base_damage": 15,
     "move_speed": 110.0,
@@ -78,6 +84,137 @@ EXAM_BOSS = {
     "attack_windup": 0.35,
 }
 
+# Binary Blade (Computer Science melee)
+BINARY_BLADE = {
+    "radius": 16,
+    "move_speed": 135.0,
+    "max_hp": 65,
+    "base_damage": 9,
+    "aggro_range": 400.0,
+    "attack_range": 45.0,
+    "attack_cooldown": 0.8,
+    "attack_windup": 0.3,
+    "teleport_interval": 60.0,
+}
+
+# Bug Swarm (Computer Science ranged)
+BUG_SWARM = {
+    "radius": 14,  # smallest the swarm's outline gets; it grows with the flock's spread
+    "move_speed": 125.0,
+    "max_hp": 48,  # whole swarm, split evenly between the bugs
+    "base_damage": 7,
+    "aggro_range": 500.0,
+    "keep_distance": 240.0,
+    "shoot_cooldown": 1.4,
+    "projectile_speed": 320.0,
+    "units": 16,
+    "unit_radius": 5,
+    "unit_spread": 24,  # spawn radius of the flock
+}
+
+# Bug swarm flocking, shared by every swarm
+FLOCK = {
+    "perception": 30,  # neighbour radius in pixels (also the hash cell size)
+    "neighbours": 7,  # most flockmates each bug steers by
+    "separation": 14,  # bugs closer than this push apart
+    "separation_weight": 1.6,
+    "cohesion": 0.5,
+    "alignment": 0.6,
+    "attraction": 1.0,
+    "arrive": 20,  # the flock stops seeking once its centre is this close to the goal
+    "responsiveness": 4.0,  # how quickly velocity follows the steering, per second
+    "max_speed": 1.4,  # times move_speed
+    "hit_scatter": 180.0,  # speed given to bugs that are hit
+}
+
+# Kinetic Brute (Physics melee)
+KINETIC_BRUTE = {
+    "radius": 18,
+    "move_speed": 85.0,
+    "max_hp": 85,
+    "base_damage": 12,
+    "aggro_range": 450.0,
+    "attack_range": 50.0,
+    "attack_cooldown": 1.0,
+    "attack_windup": 0.35,
+    "knockback": 420.0,  # impulse on the player when the punch lands
+}
+
+# Gravity Manipulator (Physics ranged)
+GRAVITY_MANIPULATOR = {
+    "radius": 16,
+    "move_speed": 115.0,
+    "max_hp": 70,
+    "base_damage": 9,
+    "aggro_range": 520.0,
+    "keep_distance": 280.0,
+    "shoot_cooldown": 1.3,
+}
+
+# Acidic Alchemist (Chemistry melee)
+ACIDIC_ALCHEMIST = {
+    "radius": 16,
+    "move_speed": 125.0,
+    "max_hp": 70,
+    "base_damage": 8,
+    "aggro_range": 420.0,
+    "attack_range": 45.0,
+    "attack_cooldown": 0.95,
+    "attack_windup": 0.35,
+}
+
+# Poison Mite (Biology melee)
+POISON_MITE = {
+    "radius": 10,
+    "move_speed": 180.0,
+    "max_hp": 20,
+    "base_damage": 5,
+    "aggro_range": 450.0,
+    "attack_range": 35.0,
+    "attack_cooldown": 0.6,
+    "attack_windup": 0.25,
+    "poison_duration": 3.0,
+    "poison_dps": 2.0,
+}
+
+# Bio Engineer (Biology ranged)
+BIO_ENGINEER = {
+    "radius": 13,
+    "move_speed": 110.0,
+    "max_hp": 35,
+    "base_damage": 6,
+    "aggro_range": 500.0,
+    "keep_distance": 220.0,
+    "shoot_cooldown": 1.6,
+    "projectile_speed": 280.0,
+    "heal_cooldown": 5.0,
+}
+
+# Ancient Warrior (History melee)
+ANCIENT_WARRIOR = {
+    "radius": 18,
+    "move_speed": 85.0,
+    "max_hp": 55,
+    "base_damage": 12,
+    "aggro_range": 400.0,
+    "attack_range": 45.0,
+    "attack_cooldown": 1.0,
+    "attack_windup": 0.4,
+    "bash_cooldown": 6.0,
+}
+
+# Artillery Commander (History ranged)
+ARTILLERY_COMMANDER = {
+    "radius": 14,
+    "move_speed": 95.0,
+    "max_hp": 40,
+    "base_damage": 10,
+    "aggro_range": 550.0,
+    "keep_distance": 300.0,
+    "shoot_cooldown": 2.0,
+    "projectile_speed": 200.0,
+}
+
 # Arena
 ARENA = {
     "margin": 30,
@@ -98,4 +235,208 @@ REST_STOP = {
     "heal_amount": 100,
     "upgrade_attack_amount": 3,
     "upgrade_speed_amount": 15,
-}
\ No newline at end of file
+}
+# Headless agent environments (env.py)
+ENV = {
+    "tick_rate": 60,  # hits are swept, so batch runs can drop this (e.g. 15 with frame_skip 1)
+    "frame_skip": 4,
+    "max_steps": 20000,
+    "max_enemies": 32,
+    "max_projectiles": 128,
+    "raster": False,  # also publish the raster.py semantic grid
+    "reward_damage_dealt": 0.01,
+    "reward_damage_taken": 0.02,
+    "reward_kill": 1.0,
+    "reward_room": 5.0,
+    "reward_death": 10.0,
+}
+
+# Crowd separation and knockback (crowd.py)
+CROWD = {
+    "cell": 64,  # spatial hash cell in pixels; at least the largest body's diameter
+    "push": 0.8,  # fraction of an overlap removed per tick
+    "ref_radius": 16,  # a body this size has mass 1 unless it sets .mass
+    "knockback_decay": 12.0,  # per second
+    "melee_knockback": 260.0,  # impulse of the player's melee on a mass-1 enemy
+}
+
+# Static room geometry (geometry.py). Hall and classroom rooms get their
+# subject's layout of obstacle rects (x, y, w, h); boss rooms and the rest
+# stop stay open. Layouts keep the player's entry point (bottom centre) and the
+# door (top centre) clear.
+GEOMETRY = {
+    "cell": 64,  # collision index bucket size in pixels
+    "room_types": ("hall", "classroom"),
+    "templates": {
+        "math": "desks",
+        "computer science": "firewall",
+        "physics": "pillars",
+        "chemistry": "graphite_wall",
+        "biology": "lab_benches",
+        "history": "pillars",
+    },
+    "layouts": {
+        "desks": [(180, 190, 130, 32), (690, 190, 130, 32), (180, 440, 130, 32), (690, 440, 130, 32)],
+        "firewall": [(484, 140, 32, 150), (484, 380, 32, 120), (150, 330, 140, 32), (710, 330, 140, 32)],
+        "pillars": [(240, 220, 56, 56), (704, 220, 56, 56), (240, 420, 56, 56), (704, 420, 56, 56)],
+        "graphite_wall": [(330, 320, 340, 32), (120, 170, 32, 130), (848, 170, 32, 130)],
+        "lab_benches": [(150, 290, 170, 44), (680, 290, 170, 44), (420, 150, 160, 36)],
+    },
+}
+
+# Flow-field steering for chasers (pathing.py)
+PATHING = {
+    "cell": 25,  # grid cell size in pixels
+    "clearance": 10,  # obstacles are padded by this much so chasers don't scrape them
+}
+
+# Bullet patterns (patterns.py has the keys a volley spec can use)
+PATTERNS = {
+    # Exam Boss, phase 3: three-way spread at the player
+    "exam_boss_spread": [
+        {"shape": "spread", "count": 3, "arc": 0.8, "speed": 200.0, "radius": 8, "damage": -3},
+    ],
+    # Gravity Manipulator: orbs circle where the player stood, then collapse onto it
+    "gravity_orb": [
+        {"shape": "ring", "count": 1, "radius": 8, "ttl": 4.0, "color": (100, 180, 255),
+         "orbit": {"radius": 90.0, "spin": 4.5, "hold": 2.0, "collapse": 250.0}},
+    ],
+    "gravity_burst": [
+        {"shape": "ring", "count": 3, "radius": 7, "ttl": 4.5, "color": (180, 220, 255),
+         "orbit": {"radius": 90.0, "spin": 4.5, "hold": 2.0, "collapse": 250.0}},
+    ],
+    # Bug Swarm: a slow fan of error codes in every direction
+    "bug_fan": [
+        {"shape": "ring", "count": 3, "jitter": 3.1416, "speed": 150.0, "radius": 5, "ttl": 8.0, "damage": -1},
+    ],
+}
+
+# Ground hazards (hazards.py). Each kind hurts one side: "player" hazards come
+# from enemies, "enemies" hazards from the player. dps is damage per second,
+# slow the fraction of movement lost while standing in it; where kinds overlap
+# their dps adds up and the strongest slow wins.
+HAZARDS = {
+    "cell": 10,  # grid cell size in pixels
+    "fade": 0.75,  # seconds over which a zone fades out before it expires
+    "kinds": {
+        "runtime_error": {"target": "player", "dps": 4.0, "slow": 0.35, "duration": 4.0, "color": (255, 90, 90)},
+        "mercury": {"target": "player", "dps": 3.0, "slow": 0.5, "duration": 5.0, "color": (190, 200, 215)},
+        "acid": {"target": "player", "dps": 5.0, "slow": 0.0, "duration": 3.0, "color": (150, 255, 100)},
+        "crystals": {"target": "player", "dps": 6.0, "slow": 0.0, "duration": 6.0, "color": (170, 130, 255)},
+        "time_distortion": {"target": "player", "dps": 2.0, "slow": 0.6, "duration": 3.0, "color": (220, 180, 130)},
+        "ink": {"target": "enemies", "dps": 0.0, "slow": 0.5, "duration": 3.0, "color": (40, 60, 160)},
+    },
+    "alpha": 90,  # opacity of a fresh zone
+    "alpha_levels": 4,  # fade steps; fewer means fewer cells redrawn while zones fade
+    "alchemist_splash": 38,  # radius of the acid puddle an Acidic Alchemist's swing leaves
+    "ink_combo": 3,  # every this-many-th hit of a combo splatters ink
+    "ink_radius": 55,
+}
+
+# Semantic observation raster (raster.py)
+RASTER = {
+    "width": 100,
+    "height": 70,
+}
+
+# Endless mode (map_system.MapManager with endless=True)
+ENDLESS = {
+    "floor_scaling": 0.08,  # extra difficulty per room cleared
+    "history_len": 256,  # compact summaries kept for past rooms
+}
+
+# Run snapshots (snapshot.py)
+SAVE = {
+    "path": "savegame.sts",
+    "compress_level": 1,  # zlib level; favour speed, saves happen mid-run
+}
+
+# Practice rewind (rewind.py), only in runs started with PRACTICE on in the
+# menu: the fight in the current room is captured every interval seconds of
+# game time and the last "seconds" of it kept; Backspace goes back "step"
+# seconds. Every keyframe_every-th capture stands alone, the others are stored
+# as deltas against it.
+REWIND = {
+    "seconds": 30.0,
+    "interval": 0.1,
+    "step": 5.0,
+    "keyframe_every": 10,
+    "compress_level": 1,
+}
+
+# Level of detail for crowded rooms (sprite_renderer.update_lod). A level is
+# entered once the live entity count reaches "enter" and left only when it
+# drops below "exit", so sprites don't flicker around a threshold.
+LOD = {
+    "enter": (120, 400),  # counts that switch to reduced, then minimal detail
+    "exit": (90, 300),
+}
+
+# Floating damage numbers (visual_effects.DamageNumbers): hits on an enemy
+# whose number was last bumped less than merge_window seconds ago add to it
+# instead of spawning another
+DAMAGE_NUMBERS = {
+    "merge_window": 0.5,
+    "text_cache": 64,  # rendered numbers kept for the threaded renderer
+}
+
+# Horde survival (horde.py)
+HORDE = {
+    "start_rate": 2.0,  # enemies spawned per second at the start
+    "rate_growth": 0.6,  # added to the spawn rate every second
+    "max_rate": 120.0,
+    "max_live": 1000,  # spawning pauses once this many enemies are on the field
+    "difficulty_growth": 0.1,  # extra difficulty per minute survived
+    "compact_interval": 0.5,  # seconds between sweeps that drop dead enemies
+    "edge_inset": 10,  # spawn just inside the arena border
+}
+
+# Adaptive quality (quality.py). Level 0 is full quality; each later level
+# trims optional visual work. The governor steps down when the rolling
+# update + draw time goes over "degrade_above" of the frame budget and back
+# up when it stays under "restore_below".
+QUALITY = {
+    "levels": [
+        {"hit_particles": 5, "death_particles": 10, "trail_steps": 5, "slash_steps": 10,
+         "glow_layers": 3, "menu_effects": 5},
+        {"hit_particles": 3, "death_particles": 6, "trail_steps": 3, "slash_steps": 7,
+         "glow_layers": 2, "menu_effects": 3},
+        {"hit_particles": 1, "death_particles": 3, "trail_steps": 2, "slash_steps": 5,
+         "glow_layers": 1, "menu_effects": 1},
+        {"hit_particles": 0, "death_particles": 1, "trail_steps": 1, "slash_steps": 3,
+         "glow_layers": 0, "menu_effects": 0},
+    ],
+    "window": 30,  # frames averaged per decision
+    "degrade_above": 0.9,  # fraction of the frame budget
+    "restore_below": 0.6,
+    "degrade_cooldown": 0.5,  # seconds between steps down
+    "restore_cooldown": 3.0,  # slower to restore so quality doesn't oscillate
+}
+
+# Rendering (render_thread.py). With threaded on, game_loop hands a snapshot of
+# each tick to a render thread instead of drawing inline; enemies are then
+# drawn from their cached sprite icons.
+RENDER = {
+    "threaded": False,
+}
+
+# Garbage collector scheduling (gc_policy.py). "scheduled" freezes the loaded
+# run, holds back gen-2 collections while a room is fought and collects fully
+# at room clears, doors, the rest stop and the end screen; "default" leaves
+# Python's collector alone (pauses are still reported).
+GC = {
+    "policy": "scheduled",
+    "combat_threshold2": 1000000,  # gen-1 collections before an automatic gen-2 one mid-fight
+    "recent_safe_points": 16,  # safe-point collections listed one by one in telemetry
+}
+
+# Per-session performance log (telemetry.py), one JSONL file per game session
+TELEMETRY = {
+    "enabled": True,
+    "dir": "telemetry",
+    "flush_interval": 2.0,  # seconds between writes to disk
+    # Room frame times are kept as a histogram of this many bins of bin_ms each
+    # (slower frames land in the last one), so a long room costs no more memory
+    "frame_bin_ms": 0.25,
+    "frame_bins": 400,
+}
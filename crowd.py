@@ -0,0 +1,132 @@
+"""
+Crowd separation and knockback.
+
+Once per tick, after everything has moved, overlapping bodies (live enemies
+and the player) are pushed apart. Each side takes a share of the correction
+inversely proportional to its mass. Neighbours come from a spatial hash that
+is rebuilt every tick, so the cost grows with the number of bodies, not with
+its square. The pair search and the push are vectorized with NumPy.
+
+Knockback is an impulse. knockback(body, source, strength) gives the body a
+velocity away from source, scaled by 1 / mass, which separate() applies and
+decays over the next few ticks.
+"""
+import math
+
+import numpy as np
+
+from config import WIDTH, HEIGHT, ARENA, CROWD
+
+
+def mass_of(body):
+    """A body's mass attribute, else its area relative to a CROWD["ref_radius"] circle"""
+    mass = getattr(body, "mass", None)
+    if mass is None:
+        r = body.radius / CROWD["ref_radius"]
+        mass = r * r
+    return mass
+
+
+def knockback(body, source, strength):
+    """Push body away from source (a position) with an impulse of strength px/s at mass 1"""
+    dx = body.pos.x - source[0]
+    dy = body.pos.y - source[1]
+    d = math.hypot(dx, dy)
+    if d == 0.0:
+        dx, dy, d = 1.0, 0.0, 1.0
+    s = strength / (d * mass_of(body))
+    vx, vy = getattr(body, "knock_vel", None) or (0.0, 0.0)
+    body.knock_vel = (vx + dx * s, vy + dy * s)
+
+
+def candidate_pairs(x, y, cell):
+    """Index arrays (a, b) of every pair of points in the same or adjacent hash cells.
+
+    x and y are float arrays. Each unordered pair appears once. The hash is a
+    sort of the points by cell, so nothing here loops over the points in Python.
+    """
+    n = len(x)
+    if n < 2:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    cx = np.floor_divide(x, cell).astype(np.intp)
+    cy = np.floor_divide(y, cell).astype(np.intp)
+    cx -= cx.min()
+    cy -= cy.min()
+    width = int(cx.max()) + 3  # keys for cx - 1 and cx + 1 stay on the same row
+    key = cy * width + cx + 1
+    order = np.argsort(key, kind="stable")
+    skey = key[order]
+    index = np.arange(n)
+    a_parts, b_parts = [], []
+    # Same cell (later points only), then the neighbours right, down-left, down, down-right
+    for offset in (0, 1, width - 1, width, width + 1):
+        target = skey + offset
+        lo = index + 1 if offset == 0 else np.searchsorted(skey, target, "left")
+        hi = np.searchsorted(skey, target, "right")
+        count = np.maximum(hi - lo, 0)
+        total = int(count.sum())
+        if not total:
+            continue
+        first = np.repeat(index, count)
+        run_start = np.repeat(np.cumsum(count) - count, count)
+        second = np.repeat(lo, count) + (np.arange(total) - run_start)
+        a_parts.append(order[first])
+        b_parts.append(order[second])
+    if not a_parts:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    return np.concatenate(a_parts), np.concatenate(b_parts)
+
+
+def separate(bodies, dt):
+    """Apply pending knockback, then push overlapping bodies apart.
+
+    The hash cell (CROWD["cell"]) must be at least the largest body's diameter
+    so every overlapping pair shares a cell or sits in neighbouring ones.
+    """
+    decay = math.exp(-CROWD["knockback_decay"] * dt)
+    lo = ARENA["margin"]
+    n = len(bodies)
+    x = np.empty(n)
+    y = np.empty(n)
+    radius = np.empty(n)
+    mass = np.empty(n)
+    for i, b in enumerate(bodies):
+        bx, by = b.pos
+        kv = getattr(b, "knock_vel", None)
+        if kv:
+            vx, vy = kv
+            # Knocked into the arena border, stop there
+            bx = max(lo, min(WIDTH - lo, bx + vx * dt))
+            by = max(lo, min(HEIGHT - lo, by + vy * dt))
+            b.pos.update(bx, by)
+            vx *= decay
+            vy *= decay
+            b.knock_vel = (vx, vy) if vx * vx + vy * vy > 1.0 else None
+        x[i] = bx
+        y[i] = by
+        radius[i] = b.radius
+        mass[i] = mass_of(b)
+
+    a, b = candidate_pairs(x, y, CROWD["cell"])
+    dx = x[b] - x[a]
+    dy = y[b] - y[a]
+    r = radius[a] + radius[b]
+    d2 = dx * dx + dy * dy
+    hit = d2 < r * r
+    if not hit.any():
+        return
+    a, b, dx, dy, r, d2 = a[hit], b[hit], dx[hit], dy[hit], r[hit], d2[hit]
+    same = d2 == 0.0
+    dx[same] = 1.0
+    d = np.sqrt(np.where(same, 1.0, d2))
+    overlap = (r - d) * CROWD["push"] / d
+    share_a = mass[b] / (mass[a] + mass[b])
+    # Every pair's correction is summed per body (Jacobi style)
+    move_x = (np.bincount(b, dx * overlap * (1.0 - share_a), n)
+              - np.bincount(a, dx * overlap * share_a, n))
+    move_y = (np.bincount(b, dy * overlap * (1.0 - share_a), n)
+              - np.bincount(a, dy * overlap * share_a, n))
+    for i in np.unique(np.concatenate((a, b))).tolist():
+        bodies[i].pos.update(x[i] + move_x[i], y[i] + move_y[i])
@@ -3,8 +3,12 @@ import math
 import random
 from config import (MATH_SWORDSMAN, MATH_ARCHER, EXAM_BOSS,
                     COLORS, WIDTH, HEIGHT, ARENA)
-from utils import clamp, circle_hit, draw_triangle
-from sprite_renderer import draw_enemy_sprite, draw_projectile_trail
+from utils import clamp, swept_circle_hit, draw_triangle, get_font, new_surface
+from pathing import chase_direction
+from raycast import line_of_sight
+import patterns
+from sprite_renderer import (draw_enemy_sprite, draw_projectile_trail, draw_hp_bar,
+                             lod_level, LOD_MINIMAL)
 
 # ---------------------------
 # Math Archer projectile
@@ -12,6 +16,7 @@ from sprite_renderer import draw_enemy_sprite, draw_projectile_trail
 class Projectile:
     def __init__(self, pos, vel, radius, damage, ttl=3.0):
         self.pos = pygame.Vector2(pos)
+        self.prev_pos = self.pos.copy()  # start of the last step, for swept hits
         self.vel = pygame.Vector2(vel)
         self.radius = radius
         self.damage = damage
@@ -19,6 +24,7 @@ class Projectile:
         self.alive_flag = True
 
     def update(self, dt):
+        self.prev_pos.update(self.pos)
         if not self.alive_flag:
             return
         self.ttl -= dt
@@ -35,7 +41,8 @@ class Projectile:
     def try_hit_player(self, player):
         if not self.alive_flag:
             return False
-        if circle_hit(self.pos.x, self.pos.y, self.radius, player.pos.x, player.pos.y, player.radius):
+        if swept_circle_hit(self.prev_pos, self.pos, self.radius,
+                            player.prev_pos, player.pos, player.radius) is not None:
             self.alive_flag = False
             player.take_damage(self.damage)
             return True
@@ -44,8 +51,9 @@ class Projectile:
     def draw(self, surf):
         pygame.draw.circle(surf, COLORS["proj"], (int(self.pos.x), int(self.pos.y)), int(self.radius))
         # small pointing triangle for direction feel
-        angle = math.atan2(self.vel.y, self.vel.x)
-        draw_triangle(surf, (self.pos.x, self.pos.y), angle, self.radius + 6, COLORS["proj"])
+        if lod_level() < LOD_MINIMAL:
+            angle = math.atan2(self.vel.y, self.vel.x)
+            draw_triangle(surf, (self.pos.x, self.pos.y), angle, self.radius + 6, COLORS["proj"])
 
 
 # ---------------------------
@@ -56,23 +64,24 @@ class MathSwordsman:
     Walks toward player. When in attack range, it does a visible windup before applying damage.
     Line length: +1 every 20s; if reaches 5, next hit deals double damage and resets to 1.
     """
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or MATH_SWORDSMAN
         self.pos = pygame.Vector2(pos)
-        self.radius = 16
-        self.speed = MATH_SWORDSMAN["move_speed"]
-        self.max_hp = MATH_SWORDSMAN["max_hp"]
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = MATH_SWORDSMAN["base_damage"]
-        self.aggro_range = MATH_SWORDSMAN["aggro_range"]
-        self.attack_range = MATH_SWORDSMAN["attack_range"]
-        self.attack_cooldown = MATH_SWORDSMAN["attack_cooldown"]
-        self.attack_windup = MATH_SWORDSMAN["attack_windup"]
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.attack_range = stats["attack_range"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
         self._atk_timer = 0.0
 
         # line-length mechanic
         self.line_len = 1
         self._line_timer = 0.0
-        self._line_tick = MATH_SWORDSMAN["line_len_tick"]
+        self._line_tick = stats["line_len_tick"]
         
         # Animation
         self.animation_time = 0.0
@@ -103,9 +112,9 @@ class MathSwordsman:
         if self.state == "idle":
             # move toward player if far
             if dist > self.attack_range * 0.9 and dist <= self.aggro_range:
-                direction = (player.pos - self.pos)
-                if direction.length_squared() > 0:
-                    self.pos += direction.normalize() * self.speed * dt
+                direction = chase_direction(self.pos, player.pos)
+                if direction is not None:
+                    self.pos += direction * self.speed * dt
             # start windup if in range and off cooldown
             if dist <= self.attack_range and self._atk_timer <= 0.0:
                 self.state = "windup"
@@ -146,20 +155,14 @@ class MathSwordsman:
         draw_enemy_sprite(surf, self.pos, self.radius, 'math', self.state, self.animation_time)
         
         # Flash effect when hit
-        if self.flash_timer > 0:
-            flash_surf = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
+        if self.flash_timer > 0 and lod_level() < LOD_MINIMAL:
+            flash_surf = new_surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
             alpha = int(150 * (self.flash_timer / 0.12))
             pygame.draw.circle(flash_surf, (255, 255, 255, alpha), (self.radius * 2, self.radius * 2), self.radius * 2)
             surf.blit(flash_surf, (int(self.pos.x) - self.radius * 2, int(self.pos.y) - self.radius * 2))
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 40
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 24
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 40, 4, self.radius + 24)
         
         # visualize line length ticks
         x = int(self.pos.x); y = int(self.pos.y + self.radius + 8)
@@ -171,26 +174,27 @@ class MathSwordsman:
 # Math Archer (ranged)
 # ---------------------------
 class MathArcher:
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or MATH_ARCHER
         self.pos = pygame.Vector2(pos)
-        self.radius = 15
-        self.speed = MATH_ARCHER["move_speed"]
-        self.max_hp = MATH_ARCHER["max_hp"]
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = MATH_ARCHER["base_damage"]
-        self.aggro_range = MATH_ARCHER["aggro_range"]
-        self.keep_distance = MATH_ARCHER["keep_distance"]
-        self.shoot_cd = MATH_ARCHER["shoot_cooldown"]
-        self.proj_speed = MATH_ARCHER["projectile_speed"]
-        self.proj_radius = MATH_ARCHER["projectile_radius"]
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.keep_distance = stats["keep_distance"]
+        self.shoot_cd = stats["shoot_cooldown"]
+        self.proj_speed = stats["projectile_speed"]
+        self.proj_radius = stats["projectile_radius"]
         self._shoot_timer = 0.0
 
         self.shield_active = False
         self.shield_timer = 0.0
         self.shield_cd = 0.0
-        self.shield_dur = MATH_ARCHER["close_shield_duration"]
-        self.shield_cooldown_total = MATH_ARCHER["close_shield_cooldown"]
-        self.shield_trigger = MATH_ARCHER["close_shield_trigger"]
+        self.shield_dur = stats["close_shield_duration"]
+        self.shield_cooldown_total = stats["close_shield_cooldown"]
+        self.shield_trigger = stats["close_shield_trigger"]
         
         self.projectiles = []
         self.flash_timer = 0.0
@@ -230,8 +234,8 @@ class MathArcher:
             self.shield_active = True
             self.shield_timer = self.shield_dur
 
-        # shoot at player
-        if dist <= self.aggro_range and self._shoot_timer <= 0.0:
+        # shoot at player, if a wall isn't in the way
+        if dist <= self.aggro_range and self._shoot_timer <= 0.0 and line_of_sight(self.pos, player.pos):
             dir = (player.pos - self.pos)
             if dir.length_squared() > 0:
                 v = dir.normalize() * self.proj_speed
@@ -269,20 +273,14 @@ class MathArcher:
             pygame.draw.circle(surf, (160, 255, 220), (int(self.pos.x), int(self.pos.y)), self.radius + 8, 3)
         
         # Flash effect when hit
-        if self.flash_timer > 0:
-            flash_surf = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
+        if self.flash_timer > 0 and lod_level() < LOD_MINIMAL:
+            flash_surf = new_surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
             alpha = int(150 * (self.flash_timer / 0.12))
             pygame.draw.circle(flash_surf, (255, 255, 255, alpha), (self.radius * 2, self.radius * 2), self.radius * 2)
             surf.blit(flash_surf, (int(self.pos.x) - self.radius * 2, int(self.pos.y) - self.radius * 2))
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 40
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 24
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 40, 4, self.radius + 24)
         
         # Draw projectiles
         for p in self.projectiles:
@@ -295,19 +293,21 @@ class MathArcher:
 # ---------------------------
 class ExamBoss(MathSwordsman):
     """Boss version of Math Swordsman — faster, tougher, and stronger."""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
         super().__init__(pos)
-        self.max_hp = EXAM_BOSS["max_hp"]
+        stats = stats or EXAM_BOSS
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = EXAM_BOSS["base_damage"]
-        self.speed = EXAM_BOSS["move_speed"]
-        self.attack_cooldown = EXAM_BOSS["attack_cooldown"]
-        self.attack_windup = EXAM_BOSS["attack_windup"]
-        self.radius = 28
+        self.base_damage = stats["base_damage"]
+        self.speed = stats["move_speed"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
+        self.radius = stats["radius"]
         
         # NEW: Phase system for boss
         self.phase = 1  # Phase 1: 100-67%, Phase 2: 67-34%, Phase 3: 34-0%
-        self.projectiles = []  # NEW: Boss can shoot projectiles in phase 3
+        self.batches = []  # phase 3 bullet patterns (patterns.BulletBatch)
+        self.rng = random  # archetypes.spawn_batch swaps in the room's generator
 
     def update(self, dt, player):
         # Update phase based on HP
@@ -329,27 +329,19 @@ class ExamBoss(MathSwordsman):
             self._shoot_timer = max(0.0, self._shoot_timer - dt)
             
             dist = self.pos.distance_to(player.pos)
-            if dist <= self.aggro_range * 1.2 and self._shoot_timer <= 0.0:
-                # Fire 3 projectiles in a spread
-                for angle_offset in [-0.4, 0, 0.4]:
-                    dir = (player.pos - self.pos).normalize()
-                    vel_x = dir.x * 200 * math.cos(angle_offset) - dir.y * 200 * math.sin(angle_offset)
-                    vel_y = dir.x * 200 * math.sin(angle_offset) + dir.y * 200 * math.cos(angle_offset)
-                    proj = Projectile(self.pos.copy(), pygame.Vector2(vel_x, vel_y), 8, self.base_damage - 3)
-                    self.projectiles.append(proj)
+            if dist <= self.aggro_range * 1.2 and self._shoot_timer <= 0.0 and dist > 0:
+                self.batches.append(patterns.fire("exam_boss_spread", self.pos, player.pos, self.base_damage, self.rng))
                 self._shoot_timer = 1.5
-        
-        # Update projectiles
-        for p in self.projectiles:
-            p.update(dt)
+
+        self.batches = patterns.advance(self.batches, dt)
 
     def draw(self, surf):
         # Draw boss sprite (larger math enemy)
         draw_enemy_sprite(surf, self.pos, self.radius, 'math', self.state, self.animation_time)
         
         # Flash effect when hit
-        if self.flash_timer > 0:
-            flash_surf = pygame.Surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
+        if self.flash_timer > 0 and lod_level() < LOD_MINIMAL:
+            flash_surf = new_surface((self.radius * 4, self.radius * 4), pygame.SRCALPHA)
             alpha = int(150 * (self.flash_timer / 0.12))
             pygame.draw.circle(flash_surf, (255, 255, 255, alpha), (self.radius * 2, self.radius * 2), self.radius * 2)
             surf.blit(flash_surf, (int(self.pos.x) - self.radius * 2, int(self.pos.y) - self.radius * 2))
@@ -358,20 +350,13 @@ class ExamBoss(MathSwordsman):
         phase_color = (255, 255, 100) if self.phase == 3 else (255, 200, 100) if self.phase == 2 else (255, 150, 100)
         pygame.draw.circle(surf, phase_color, (int(self.pos.x), int(self.pos.y)), self.radius + 14, 3)
         
-        # NEW: Phase text
-        phase_text = pygame.font.SysFont("arial", 14, bold=True).render(f"Phase {self.phase}", True, phase_color)
-        surf.blit(phase_text, (self.pos.x - phase_text.get_width()//2, self.pos.y - 45))
+        # NEW: Phase text (the ring already shows the phase in crowded rooms)
+        if lod_level() < LOD_MINIMAL:
+            phase_text = get_font("arial", 14, bold=True).render(f"Phase {self.phase}", True, phase_color)
+            surf.blit(phase_text, (self.pos.x - phase_text.get_width()//2, self.pos.y - 45))
         
-        # NEW: HP bar (larger for boss)
-        hp_pct = self.hp / self.max_hp
-        bar_w = 70
-        bar_h = 6
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 60
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
-        
-        # Draw projectiles
-        for p in self.projectiles:
-            if p.alive_flag:
-                p.draw(surf)
\ No newline at end of file
+        # HP bar (larger for boss)
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 70, 6, self.radius + 60)
+
+        for b in self.batches:
+            b.draw(surf)
\ No newline at end of file
@@ -0,0 +1,387 @@
+"""
+Headless step/reset environments for training and evaluating agents.
+
+StudyTimeEnv wraps one World and steps it at a fixed tick. VectorEnv runs many
+of them in worker processes; observations, rewards and actions live in one
+shared-memory block so the driver reads NumPy views without any pickling.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT, ENV
+from world import World, trigger_area_attack
+from raster import rasterize, raster_shape
+
+# Action vector layout: move direction (0 = none, 1..8 = N, NE, E, SE, S, SW, W, NW)
+# followed by one flag per ability.
+ACT_MOVE, ACT_ATTACK, ACT_DASH, ACT_PARRY, ACT_AREA, ACT_ULTIMATE = range(6)
+ACTION_SIZE = 6
+
+# (up, down, left, right) held for each move direction
+MOVE_KEYS = [
+    (0, 0, 0, 0),
+    (1, 0, 0, 0), (1, 0, 0, 1), (0, 0, 0, 1), (0, 1, 0, 1),
+    (0, 1, 0, 0), (0, 1, 1, 0), (0, 0, 1, 0), (1, 0, 1, 0),
+]
+
+PLAYER_FEATURES = 12
+ENEMY_FEATURES = 7
+PROJECTILE_FEATURES = 5
+
+ENEMY_KINDS = {
+    "MathSwordsman": 1, "MathArcher": 2, "ExamBoss": 3,
+    "BinaryBlade": 4, "BugSwarm": 5,
+    "KineticBrute": 6, "GravityManipulator": 7,
+    "AcidicAlchemist": 8,
+    "PoisonMite": 9, "BioEngineer": 10,
+    "AncientWarrior": 11, "ArtilleryCommander": 12,
+}
+ENEMY_STATES = {"idle": 0, "windup": 1, "swing": 2, "bash": 3}
+
+
+class ActionKeys:
+    """Stands in for pygame.key.get_pressed() so Player.update can read an action"""
+    def __init__(self):
+        self.held = {}
+
+    def set_move(self, move):
+        up, down, left, right = MOVE_KEYS[move]
+        self.held = {pygame.K_w: up, pygame.K_s: down, pygame.K_a: left, pygame.K_d: right}
+
+    def __getitem__(self, key):
+        return self.held.get(key, 0)
+
+
+def observation_spec(max_enemies=None, max_projectiles=None, raster=None):
+    """Shapes of the observation arrays for one environment"""
+    max_enemies = max_enemies or ENV["max_enemies"]
+    max_projectiles = max_projectiles or ENV["max_projectiles"]
+    spec = {
+        "player": (PLAYER_FEATURES,),
+        "enemies": (max_enemies, ENEMY_FEATURES),
+        "projectiles": (max_projectiles, PROJECTILE_FEATURES),
+    }
+    if ENV["raster"] if raster is None else raster:
+        spec["raster"] = raster_shape()
+    return spec
+
+
+def write_observation(world, player_out, enemies_out, projectiles_out):
+    """Fill preallocated observation arrays from the world state.
+
+    Positions are normalised by the screen size; padding rows are zero.
+    """
+    p = world.player
+    player_out[:] = (
+        p.pos.x / WIDTH, p.pos.y / HEIGHT,
+        p.hp / p.max_hp,
+        p._atk_timer, p._dash_timer, p._parry_timer, p._area_attack_timer,
+        float(p.is_dashing), float(p.parrying), float(p.berserk_active),
+        p.ultimate_charge / p.ultimate_max_charge,
+        p.combo_count,
+    )
+
+    enemies_out.fill(0.0)
+    projectiles_out.fill(0.0)
+    max_e = enemies_out.shape[0]
+    max_p = projectiles_out.shape[0]
+    ne = npj = 0
+    for e in world.map_manager.current_room.enemies:
+        if e.alive() and ne < max_e:
+            enemies_out[ne] = (
+                1.0, e.pos.x / WIDTH, e.pos.y / HEIGHT, e.hp / e.max_hp, e.radius,
+                ENEMY_KINDS.get(type(e).__name__, 0),
+                ENEMY_STATES.get(getattr(e, "state", "idle"), 0),
+            )
+            ne += 1
+        for proj in getattr(e, "projectiles", ()):
+            if proj.alive_flag and npj < max_p:
+                projectiles_out[npj] = (proj.pos.x / WIDTH, proj.pos.y / HEIGHT,
+                                        proj.vel.x / WIDTH, proj.vel.y / HEIGHT, proj.radius)
+                npj += 1
+        for b in getattr(e, "batches", ()):
+            rows = b.live()[:max_p - npj]
+            if len(rows):
+                out = projectiles_out[npj:npj + len(rows)]
+                out[:, 0:2] = b.positions(rows=rows) / (WIDTH, HEIGHT)
+                out[:, 2:4] = b.velocities(rows=rows) / (WIDTH, HEIGHT)
+                out[:, 4] = b.radius[rows]
+                npj += len(rows)
+
+
+class StudyTimeEnv:
+    """Single headless game instance with a reset/step interface.
+
+    step() takes an action vector (see ACT_*) and returns (obs, reward, done, info),
+    where obs is a dict of NumPy arrays that are reused between steps.
+    """
+    def __init__(self, selected_classes=None, difficulty_year="Freshman",
+                 tick_rate=None, frame_skip=None, max_steps=None, obs=None, endless=False):
+        self.selected_classes = selected_classes or ["Math", "Computer Science"]
+        self.difficulty_year = difficulty_year
+        self.endless = endless
+        self.dt = 1.0 / (tick_rate or ENV["tick_rate"])
+        self.frame_skip = frame_skip or ENV["frame_skip"]
+        self.max_steps = max_steps or ENV["max_steps"]
+        if obs is None:
+            spec = observation_spec()
+            obs = {name: np.zeros(shape, dtype=np.float32) for name, shape in spec.items()}
+        self.obs = obs
+        self.keys = ActionKeys()
+        self.world = None
+        self.steps = 0
+        if not pygame.font.get_init():
+            pygame.font.init()
+
+    def reset(self, seed=None):
+        """Start a new episode; the same seed replays the same run whatever else shares the process"""
+        self.world = World(self.selected_classes, self.difficulty_year, headless=True, endless=self.endless,
+                           seed=seed)
+        self.steps = 0
+        self._observe()
+        return self.obs
+
+    def step(self, action):
+        world = self.world
+        player = world.player
+        self.keys.set_move(int(action[ACT_MOVE]))
+
+        if action[ACT_ATTACK]:
+            player.try_attack()
+        if action[ACT_AREA]:
+            trigger_area_attack(player)
+        if action[ACT_DASH]:
+            direction = pygame.Vector2(self.keys[pygame.K_d] - self.keys[pygame.K_a],
+                                       self.keys[pygame.K_s] - self.keys[pygame.K_w])
+            player.try_dash(direction if direction.length_squared() > 0 else pygame.Vector2(1, 0))
+        if action[ACT_PARRY]:
+            player.try_parry()
+        if action[ACT_ULTIMATE]:
+            player.try_ultimate()
+
+        hp_before = player.hp
+        kills_before = player.total_kills
+        room_before = world.map_manager.room_index
+        enemy_hp_before = self._enemy_hp()
+
+        for _ in range(self.frame_skip):
+            world.update(self.dt, self.keys)
+            if world.is_over():
+                break
+        self.steps += 1
+
+        room_changed = world.map_manager.room_index != room_before
+        damage_dealt = 0.0 if room_changed else max(0.0, enemy_hp_before - self._enemy_hp())
+        reward = (ENV["reward_damage_dealt"] * damage_dealt
+                  - ENV["reward_damage_taken"] * max(0.0, hp_before - player.hp)
+                  + ENV["reward_kill"] * (player.total_kills - kills_before)
+                  + ENV["reward_room"] * (world.map_manager.room_index - room_before))
+        if not player.alive():
+            reward -= ENV["reward_death"]
+
+        done = world.is_over() or self.steps >= self.max_steps
+        self._observe()
+        info = {"room_index": world.map_manager.room_index, "won": player.alive() and world.is_over()}
+        return self.obs, reward, done, info
+
+    def _enemy_hp(self):
+        return sum(e.hp for e in self.world.map_manager.current_room.enemies)
+
+    def _observe(self):
+        write_observation(self.world, self.obs["player"], self.obs["enemies"], self.obs["projectiles"])
+        if "raster" in self.obs:
+            rasterize(self.world, out=self.obs["raster"])
+
+
+# ---------------------------
+# Vectorized environments
+# ---------------------------
+_CMD_RESET, _CMD_STEP, _CMD_CLOSE = 0, 1, 2
+
+
+def _layout(num_envs):
+    """Byte offsets of every array inside the shared block"""
+    fields = [(name, (num_envs,) + shape, np.float32) for name, shape in observation_spec().items()]
+    fields += [
+        ("reward", (num_envs,), np.float32),
+        ("done", (num_envs,), np.uint8),
+        ("room_index", (num_envs,), np.int32),
+        ("action", (num_envs, ACTION_SIZE), np.int32),
+    ]
+    layout = {}
+    offset = 0
+    for name, shape, dtype in fields:
+        layout[name] = (offset, shape, dtype)
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        offset += (nbytes + 63) // 64 * 64  # keep every array cache-line aligned
+    return layout, offset
+
+
+def _views(buf, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            for name, (offset, shape, dtype) in layout.items()}
+
+
+def _worker(conn, shm_name, num_envs, env_ids, env_kwargs, base_seed):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    layout, _ = _layout(num_envs)
+    views = _views(shm.buf, layout)
+    envs = {}
+    for i in env_ids:
+        obs = {name: views[name][i] for name in observation_spec()}
+        envs[i] = StudyTimeEnv(obs=obs, **env_kwargs)
+    episodes = dict.fromkeys(env_ids, 0)
+
+    def reset(i):
+        envs[i].reset(None if base_seed is None else base_seed + 1000003 * i + episodes[i])
+        episodes[i] += 1
+
+    try:
+        while True:
+            cmd = conn.recv()
+            if cmd == _CMD_STEP:
+                actions = views["action"]
+                for i in env_ids:
+                    _, reward, done, info = envs[i].step(actions[i])
+                    views["reward"][i] = reward
+                    views["done"][i] = done
+                    views["room_index"][i] = info["room_index"]
+                    if done:
+                        # Auto-reset so the driver never waits on a finished env;
+                        # the observation is the first one of the new episode.
+                        reset(i)
+            elif cmd == _CMD_RESET:
+                for i in env_ids:
+                    reset(i)
+                    views["reward"][i] = 0.0
+                    views["done"][i] = 0
+            elif cmd == _CMD_CLOSE:
+                break
+            conn.send(True)
+    finally:
+        del views
+        shm.close()
+
+
+class VectorEnv:
+    """Many StudyTimeEnv instances stepped in parallel worker processes.
+
+    Each worker owns a contiguous slice of environments and writes straight into
+    the shared arrays returned by reset()/step(); only a one-byte command crosses
+    the pipe per step. Returned arrays are views that are overwritten on the next
+    call, so copy them if they need to be kept.
+    """
+    def __init__(self, num_envs, num_workers=None, seed=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.num_workers = num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_envs))
+        layout, size = _layout(num_envs)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self._views = _views(self._shm.buf, layout)
+        self.observations = {name: self._views[name] for name in observation_spec()}
+        self.actions = self._views["action"]
+        self.rewards = self._views["reward"]
+        self.dones = self._views["done"]
+
+        ctx = mp.get_context("spawn")
+        self._conns = []
+        self._procs = []
+        for w in range(num_workers):
+            env_ids = list(range(w, num_envs, num_workers))
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(child, self._shm.name, num_envs, env_ids, env_kwargs, seed))
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self.closed = False
+
+    def _broadcast(self, cmd):
+        for conn in self._conns:
+            conn.send(cmd)
+        for conn in self._conns:
+            conn.recv()
+
+    def reset(self):
+        self._broadcast(_CMD_RESET)
+        return self.observations
+
+    def step(self, actions=None):
+        """Step every environment; actions may also be written into self.actions beforehand"""
+        if actions is not None:
+            self.actions[:] = actions
+        self._broadcast(_CMD_STEP)
+        return self.observations, self.rewards, self.dones
+
+    def close(self):
+        if self.closed:
+            return
+        for conn in self._conns:
+            conn.send(_CMD_CLOSE)
+        for proc in self._procs:
+            proc.join(timeout=5)
+        self._views = self.observations = self.actions = self.rewards = self.dones = None
+        self._shm.close()
+        self._shm.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _random_actions(rng, actions):
+    actions[:, ACT_MOVE] = rng.integers(0, 9, len(actions))
+    actions[:, 1:] = rng.random((len(actions), ACTION_SIZE - 1)) < 0.1
+
+
+def benchmark(num_envs=64, steps=500, num_workers=None, warmup=20):
+    """Aggregate steps per second with random actions, next to one env stepped in-process.
+
+    Every env is seeded, so reruns step the same episodes. The first warmup
+    steps (imports, first rooms, caches) aren't timed.
+    """
+    import time
+    rng = np.random.default_rng(0)
+    actions = np.zeros((1, ACTION_SIZE), dtype=np.int32)
+    env = StudyTimeEnv()
+    env.reset(0)
+    for i in range(warmup + steps):
+        if i == warmup:
+            start = time.perf_counter()
+        _random_actions(rng, actions)
+        if env.step(actions[0])[2]:
+            env.reset(i)
+    single = steps / (time.perf_counter() - start)
+    print(f"1 env in-process x {steps} steps: {single:,.0f} steps/s")
+
+    with VectorEnv(num_envs, num_workers=num_workers, seed=0) as venv:
+        venv.reset()
+        episodes = 0
+        for i in range(warmup + steps):
+            if i == warmup:
+                start = time.perf_counter()
+                episodes = 0
+            _random_actions(rng, venv.actions)
+            episodes += int(venv.step()[2].sum())
+        elapsed = time.perf_counter() - start
+        workers = venv.num_workers
+    rate = num_envs * steps / elapsed
+    print(f"{num_envs} envs x {steps} steps on {workers} worker(s): {rate:,.0f} steps/s "
+          f"({rate / workers:,.0f} per worker, {rate / workers / single:.0%} of in-process), "
+          f"{episodes} episodes finished")
+    return rate
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:]))
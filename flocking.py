@@ -0,0 +1,114 @@
+"""
+Boids for bug swarms.
+
+step() advances every swarm in a room in one vectorized pass: the live bugs
+of all swarms are stacked into one array and each bug steers by its nearest
+FLOCK["neighbours"] bugs within perception range, found through the crowd
+module's spatial hash. Separation applies between any bugs; alignment and
+cohesion only between bugs of the same swarm; each swarm as a whole heads for
+a point keep_distance from the player. The cost is a fixed number of NumPy
+calls per tick plus a little bookkeeping per swarm, however many bugs there are.
+
+A swarm needs unit_pos and unit_vel arrays (n, 2), unit_hp (n,), unit_radius,
+speed, aggro_range and keep_distance; step() updates the arrays and the
+swarm's pos (centroid) and radius (spread).
+"""
+import math
+
+import numpy as np
+
+from config import WIDTH, HEIGHT, ARENA, FLOCK
+from crowd import candidate_pairs
+
+
+def step(swarms, dt, player, geometry=None):
+    """Move every swarm's bugs one tick; geometry (a room's RoomGeometry) keeps them out of walls"""
+    w = FLOCK
+    lives, parts_pos, parts_vel = [], [], []
+    for s in swarms:
+        live = np.flatnonzero(s.unit_hp > 0.0)
+        if len(live):
+            lives.append((s, live))
+            parts_pos.append(s.unit_pos[live])
+            parts_vel.append(s.unit_vel[live])
+    if not lives:
+        return
+    m = len(lives)
+    counts = np.array([len(live) for _, live in lives])
+    owner = np.repeat(np.arange(m), counts)
+    pos = np.concatenate(parts_pos)
+    vel = np.concatenate(parts_vel)
+    n = len(pos)
+    speed = np.array([s.speed for s, _ in lives])[owner][:, None]
+
+    # Each bug's nearest flockmates within perception range, capped per bug
+    a, b = candidate_pairs(pos[:, 0], pos[:, 1], w["perception"])
+    src = np.concatenate((a, b))
+    dst = np.concatenate((b, a))
+    d = pos[dst] - pos[src]
+    d2 = (d * d).sum(axis=1)
+    near = (d2 < w["perception"] ** 2) & (d2 > 0.0)
+    src, dst, d, d2 = src[near], dst[near], d[near], d2[near]
+    # Sort by bug, then by distance (d2 is below perception**2, so it only orders within a bug)
+    order = np.argsort(src + d2 / (w["perception"] ** 2 + 1.0))
+    src, dst, d, d2 = src[order], dst[order], d[order], d2[order]
+    count = np.bincount(src, minlength=n)
+    rank = np.arange(len(src)) - (np.cumsum(count) - count)[src]
+    keep = rank < w["neighbours"]
+    src, dst, d, d2 = src[keep], dst[keep], d[keep], d2[keep]
+
+    # Separation from any bug, harder the closer it is
+    dist = np.sqrt(d2)
+    close = np.maximum(w["separation"] - dist, 0.0) / (w["separation"] * dist)
+    away = -np.column_stack([np.bincount(src, d[:, k] * close, n) for k in (0, 1)])
+
+    # Cohesion and alignment within the bug's own swarm
+    own = owner[src] == owner[dst]
+    src, dst = src[own], dst[own]
+    count = np.bincount(src, minlength=n)
+    has = (count > 0)[:, None]
+    denom = np.maximum(count, 1)[:, None]
+    centre = np.column_stack([np.bincount(src, pos[dst, k], n) for k in (0, 1)]) / denom
+    heading = np.column_stack([np.bincount(src, vel[dst, k], n) for k in (0, 1)]) / denom
+
+    # Attraction: each swarm heads for a point keep_distance from the player
+    centroids = np.column_stack([np.bincount(owner, pos[:, k], m) for k in (0, 1)]) / counts[:, None]
+    px, py = player.pos
+    seek = np.zeros((m, 2))
+    for i, (s, _) in enumerate(lives):
+        cx, cy = centroids[i]
+        tx, ty = cx - px, cy - py
+        reach = math.hypot(tx, ty)
+        if 0.0 < reach <= s.aggro_range:
+            ox = px + tx / reach * s.keep_distance - cx
+            oy = py + ty / reach * s.keep_distance - cy
+            off = math.hypot(ox, oy)
+            if off > w["arrive"]:
+                seek[i] = (ox / off, oy / off)
+
+    desired = (w["attraction"] * speed * seek[owner]
+               + w["separation_weight"] * speed * away
+               + w["cohesion"] * np.where(has, centre - pos, 0.0)
+               + w["alignment"] * np.where(has, heading, 0.0))
+    vel += (desired - vel) * min(1.0, w["responsiveness"] * dt)
+    vlen = np.sqrt((vel * vel).sum(axis=1))[:, None]
+    vel *= np.minimum(1.0, speed * w["max_speed"] / np.maximum(vlen, 1e-9))
+    pos += vel * dt
+    margin = ARENA["margin"]
+    np.clip(pos[:, 0], margin, WIDTH - margin, out=pos[:, 0])
+    np.clip(pos[:, 1], margin, HEIGHT - margin, out=pos[:, 1])
+    if geometry is not None and geometry.rects:
+        geometry.resolve_points(pos, lives[0][0].unit_radius)
+
+    # Write back, with each swarm's new centroid and spread
+    centroids = np.column_stack([np.bincount(owner, pos[:, k], m) for k in (0, 1)]) / counts[:, None]
+    rel = pos - centroids[owner]
+    starts = np.cumsum(counts) - counts
+    spread = np.maximum.reduceat(np.sqrt((rel * rel).sum(axis=1)), starts)
+    for i, (s, live) in enumerate(lives):
+        lo, hi = starts[i], starts[i] + counts[i]
+        s.unit_pos[live] = pos[lo:hi]
+        s.unit_vel[live] = vel[lo:hi]
+        s.pos.update(centroids[i, 0], centroids[i, 1])
+        s.radius = int(max(s.min_radius, spread[i] + s.unit_radius))
+        s.flocked = True
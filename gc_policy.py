@@ -0,0 +1,101 @@
+"""
+Garbage collector scheduling.
+
+Combat allocates constantly (vector temporaries, damage numbers, particles,
+rebuilt lists), so a full generation-2 collection can land mid-fight and hitch
+a frame. With GC["policy"] set to "scheduled":
+
+- everything alive once a run is loaded is frozen out of the collector
+- automatic gen-2 collections are held back while a room is being fought
+- full collections run at safe points instead: room cleared, door
+  transition, rest stop and the end screen
+
+Collector pauses are timed either way (telemetry.GCWatch), split into combat
+and calm, so the two policies can be compared.
+"""
+import gc
+from collections import deque
+from time import perf_counter
+
+from config import GC
+from telemetry import GCWatch, gc_summary, merge_pauses
+
+
+class GCPolicy:
+    def __init__(self, policy=None):
+        self.scheduled = (policy or GC["policy"]) == "scheduled"
+        self.default_threshold = gc.get_threshold()
+        self.watch = GCWatch()
+        self.in_combat = False
+        self.pauses = {"combat": {}, "calm": {}}  # automatic collections, as GCWatch.drain() totals
+        # Safe-point collections: reason -> (count, seconds, longest), plus the last few
+        # as (reason, seconds, objects collected); endless runs hit these every room
+        self.safe_points = {}
+        self.recent_safe_points = deque(maxlen=GC["recent_safe_points"])
+
+    def loaded(self):
+        """The run is built: collect once and freeze what survives"""
+        if self.scheduled:
+            gc.collect()
+            gc.freeze()
+        self.watch.drain()
+
+    def update(self, room):
+        """Call once a frame with the current room"""
+        self._drain()
+        combat = not room.cleared and room.room_type != "shop"
+        if combat == self.in_combat:
+            return
+        self.in_combat = combat
+        if self.scheduled:
+            t0, t1, t2 = self.default_threshold
+            gc.set_threshold(t0, t1, GC["combat_threshold2"] if combat else t2)
+
+    def safe_point(self, reason):
+        """Nothing time critical is happening; run the full collection now"""
+        self._drain()
+        if not self.scheduled:
+            return
+        t = perf_counter()
+        collected = gc.collect()
+        t = perf_counter() - t
+        count, total, worst = self.safe_points.get(reason, (0, 0.0, 0.0))
+        self.safe_points[reason] = (count + 1, total + t, max(worst, t))
+        self.recent_safe_points.append((reason, t, collected))
+        self.watch.drain()  # that pause was chosen, not a hitch
+
+    def finish(self):
+        """Run over: hand the collector back in its default state"""
+        self._drain()
+        if self.scheduled:
+            gc.set_threshold(*self.default_threshold)
+            gc.unfreeze()
+        self.in_combat = False
+        self.watch.close()
+
+    def _drain(self):
+        pauses = self.watch.drain()
+        if pauses:
+            merge_pauses(self.pauses["combat" if self.in_combat else "calm"], pauses)
+
+    def report(self):
+        lines = [f"gc policy: {'scheduled' if self.scheduled else 'default'}"]
+        for phase, pauses in self.pauses.items():
+            summary = gc_summary(pauses)
+            lines.append(f"  {phase:6s} " + (", ".join(
+                f"{gen} x{s['count']} max {s['max_ms']:.2f} ms" for gen, s in summary.items()) or "no collections"))
+        if self.safe_points:
+            reason, (_, _, worst) = max(self.safe_points.items(), key=lambda s: s[1][2])
+            lines.append(f"  {sum(s[0] for s in self.safe_points.values())} safe-point collections, "
+                         f"longest {worst * 1000:.2f} ms ({reason})")
+        return "\n".join(lines)
+
+    def summary(self):
+        """For telemetry"""
+        return {"policy": "scheduled" if self.scheduled else "default",
+                "combat": gc_summary(self.pauses["combat"]), "calm": gc_summary(self.pauses["calm"]),
+                "safe_points": {reason: {"count": c, "total_ms": round(total * 1000, 3),
+                                         "max_ms": round(worst * 1000, 3)}
+                                for reason, (c, total, worst) in self.safe_points.items()},
+                "recent_safe_points": [(reason, round(t * 1000, 3), n)
+                                       for reason, t, n in self.recent_safe_points]}
@@ -0,0 +1,110 @@
+"""
+Static room geometry.
+
+A room's obstacles (walls, pillars, desks) are plain rects taken from its
+layout in GEOMETRY. They are bucketed once into a uniform grid, so a
+circle-vs-world query only looks at the few rects that share its cells,
+however many obstacles the room has.
+"""
+import math
+
+import numpy as np
+import pygame
+
+from config import GEOMETRY
+
+
+def room_obstacles(room_type, class_type):
+    """Obstacle rects for a new room, from its subject's layout"""
+    if room_type not in GEOMETRY["room_types"]:
+        return []
+    layout = GEOMETRY["layouts"].get(GEOMETRY["templates"].get(class_type), ())
+    return [pygame.Rect(r) for r in layout]
+
+
+class RoomGeometry:
+    def __init__(self, obstacles, cell=None):
+        self.rects = list(obstacles)
+        self.cell = cell = cell or GEOMETRY["cell"]
+        self.grid = {}  # (cx, cy) -> rects touching that cell
+        for r in self.rects:
+            for cy in range(r.top // cell, (r.bottom - 1) // cell + 1):
+                for cx in range(r.left // cell, (r.right - 1) // cell + 1):
+                    self.grid.setdefault((cx, cy), []).append(r)
+
+    def nearby(self, x, y, radius):
+        """Rects that might touch a circle at (x, y)"""
+        cell, grid = self.cell, self.grid
+        x0, x1 = int(x - radius) // cell, int(x + radius) // cell
+        y0, y1 = int(y - radius) // cell, int(y + radius) // cell
+        if x0 == x1 and y0 == y1:
+            return grid.get((x0, y0), ())
+        found = []
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                for r in grid.get((cx, cy), ()):
+                    if r not in found:
+                        found.append(r)
+        return found
+
+    def blocks(self, pos, radius):
+        """True if a circle at pos overlaps any obstacle"""
+        x, y = pos
+        r2 = radius * radius
+        for r in self.nearby(x, y, radius):
+            dx = x - max(r.left, min(r.right, x))
+            dy = y - max(r.top, min(r.bottom, y))
+            if dx * dx + dy * dy < r2:
+                return True
+        return False
+
+    def resolve(self, pos, radius):
+        """Push a circle out of any obstacle it overlaps; pos is moved in place.
+
+        Returns True if it had to be moved.
+        """
+        x, y = pos
+        moved = False
+        for r in self.nearby(x, y, radius):
+            dx = x - max(r.left, min(r.right, x))
+            dy = y - max(r.top, min(r.bottom, y))
+            d2 = dx * dx + dy * dy
+            if d2 >= radius * radius:
+                continue
+            if d2 > 0.0:
+                d = math.sqrt(d2)
+                push = (radius - d) / d
+                x += dx * push
+                y += dy * push
+            else:
+                # Centre inside the rect: leave through the nearest side
+                exits = ((x - r.left + radius, -1, 0), (r.right - x + radius, 1, 0),
+                         (y - r.top + radius, 0, -1), (r.bottom - y + radius, 0, 1))
+                depth, ex, ey = min(exits)
+                x += ex * depth
+                y += ey * depth
+            moved = True
+        if moved:
+            pos.x, pos.y = x, y
+        return moved
+
+    def resolve_points(self, pos, radius):
+        """resolve() for an (n, 2) array of circle centres sharing one radius, in place"""
+        for r in self.rects:
+            cx = np.clip(pos[:, 0], r.left, r.right)
+            cy = np.clip(pos[:, 1], r.top, r.bottom)
+            dx = pos[:, 0] - cx
+            dy = pos[:, 1] - cy
+            d2 = dx * dx + dy * dy
+            hit = d2 < radius * radius
+            if not hit.any():
+                continue
+            outside = hit & (d2 > 0.0)
+            d = np.sqrt(d2[outside])
+            push = (radius - d) / d
+            pos[outside, 0] += dx[outside] * push
+            pos[outside, 1] += dy[outside] * push
+            for i in np.flatnonzero(hit & (d2 == 0.0)).tolist():
+                v = pygame.Vector2(pos[i, 0], pos[i, 1])
+                self.resolve(v, radius)
+                pos[i] = v
@@ -0,0 +1,194 @@
+"""
+Ground hazards: puddles, splatters and fields that linger on the floor.
+
+Each room has a HazardLayer, a coarse grid (HAZARDS["cell"] pixels) holding
+the seconds left of every hazard kind in every cell. Stamping a zone writes a
+disc into that grid and forgets the zone, so a body standing in the room costs
+one cell lookup per tick however many zones overlap. The grid counts down with
+a few NumPy calls per tick while anything is left on it.
+
+Drawing works off the same grid. Each cell is reduced to a code (its strongest
+kind and a fade step) and a cached overlay only refills the cells whose code
+changed since the last frame, then goes on screen in one blit.
+
+Bodies don't hold a reference to their room. A source of hazards queues
+them on its own spills list of (kind, pos, radius), and World.update drains
+that list into the layer of the room the body is in that tick.
+"""
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT, HAZARDS
+from utils import new_surface
+
+PLAYER = 0  # hazards that hurt the player
+ENEMIES = 1  # hazards that hurt enemies
+
+KINDS = list(HAZARDS["kinds"])
+_SIDE = np.array([PLAYER if HAZARDS["kinds"][k]["target"] == "player" else ENEMIES for k in KINDS])
+_DPS = np.array([HAZARDS["kinds"][k]["dps"] for k in KINDS], dtype=np.float32)
+_SLOW = np.array([HAZARDS["kinds"][k]["slow"] for k in KINDS], dtype=np.float32)
+
+COLS = -(-WIDTH // HAZARDS["cell"])
+ROWS = -(-HEIGHT // HAZARDS["cell"])
+_EMPTY = np.zeros(COLS * ROWS, dtype=np.int16)
+
+
+class HazardLayer:
+    def __init__(self):
+        self.cell = HAZARDS["cell"]
+        self.active = False
+        self.hurts = [False, False]  # per side, anything on the grid for it
+        self.ttl = None  # (kinds, rows, cols) seconds left, allocated on the first stamp
+        self.dps = None  # (sides, rows, cols) combined damage per second
+        self.slow = None  # (sides, rows, cols) strongest slow
+        self._codes = _EMPTY
+
+    def stamp(self, kind, pos, radius, duration=None):
+        """Lay a disc of hazard kind at pos; where it overlaps the same kind the longer time is kept"""
+        if self.ttl is None:
+            self.ttl = np.zeros((len(KINDS), ROWS, COLS), dtype=np.float32)
+            self.dps = np.zeros((2, ROWS, COLS), dtype=np.float32)
+            self.slow = np.zeros((2, ROWS, COLS), dtype=np.float32)
+        cell = self.cell
+        x, y = pos
+        x0, x1 = max(0, int((x - radius) // cell)), min(COLS, int((x + radius) // cell) + 1)
+        y0, y1 = max(0, int((y - radius) // cell)), min(ROWS, int((y + radius) // cell) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        cx = (np.arange(x0, x1) + 0.5) * cell - x
+        cy = (np.arange(y0, y1) + 0.5) * cell - y
+        inside = cy[:, None] ** 2 + cx[None, :] ** 2 <= radius * radius
+        if duration is None:
+            duration = HAZARDS["kinds"][kind]["duration"]
+        block = self.ttl[KINDS.index(kind), y0:y1, x0:x1]
+        np.maximum(block, np.where(inside, np.float32(duration), np.float32(0.0)), out=block)
+        self.active = True
+        self._combine()
+
+    def update(self, dt):
+        """Count every zone down by dt"""
+        if not self.active:
+            return
+        self.ttl -= dt
+        np.maximum(self.ttl, 0.0, out=self.ttl)
+        self._combine()
+
+    def _combine(self):
+        on = self.ttl > 0.0
+        self.active = bool(on.any())
+        for side in (PLAYER, ENEMIES):
+            kinds = np.flatnonzero((_SIDE == side) & on.any(axis=(1, 2)))
+            self.hurts[side] = bool(len(kinds))
+            if self.hurts[side]:
+                lit = on[kinds]
+                self.dps[side] = np.tensordot(_DPS[kinds], lit, 1)
+                self.slow[side] = (lit * _SLOW[kinds][:, None, None]).max(axis=0)
+        self._codes = None
+
+    def drain(self, spills):
+        """Stamp a body's queued (kind, pos, radius) spills and empty the list"""
+        for kind, pos, radius in spills:
+            self.stamp(kind, pos, radius)
+        spills.clear()
+
+    def sample(self, pos, side):
+        """(damage per second, slow) for a body of side standing at pos"""
+        if not self.hurts[side]:
+            return 0.0, 0.0
+        cx = min(COLS - 1, max(0, int(pos[0]) // self.cell))
+        cy = min(ROWS - 1, max(0, int(pos[1]) // self.cell))
+        return float(self.dps[side, cy, cx]), float(self.slow[side, cy, cx])
+
+    def sweep(self, start, end, side):
+        """Strongest damage per second in any cell the segment start -> end passes through"""
+        if not self.hurts[side]:
+            return 0.0
+        cell = self.cell
+        (x0, y0), (x1, y1) = start, end
+        if abs(x1 - x0) < cell and abs(y1 - y0) < cell:
+            # A walking step: the cell it started in was checked the tick before
+            return self.sample(end, side)[0]
+        # Split the segment where it crosses grid lines; each piece lies in one cell
+        t = [0.0, 1.0]
+        for a, b in ((x0, x1), (y0, y1)):
+            if a != b:
+                lines = np.arange(min(a, b) // cell + 1, max(a, b) // cell + 1) * cell
+                t.extend((lines - a) / (b - a))
+        t = np.unique(np.clip(t, 0.0, 1.0))
+        mid = (t[:-1] + t[1:]) * 0.5
+        cx = np.clip(((x0 + (x1 - x0) * mid) // cell).astype(int), 0, COLS - 1)
+        cy = np.clip(((y0 + (y1 - y0) * mid) // cell).astype(int), 0, ROWS - 1)
+        return float(self.dps[side, cy, cx].max())
+
+    def hinder(self, body, start, side):
+        """Slow body's step from start by where it ended up; returns the strongest dps along the step"""
+        dps = self.sweep(start, body.pos, side)
+        slow = self.sample(body.pos, side)[1]
+        if slow:
+            sx, sy = start
+            keep = 1.0 - slow
+            body.pos.update(sx + (body.pos.x - sx) * keep, sy + (body.pos.y - sy) * keep)
+        return dps
+
+    def codes(self):
+        """Per-cell draw code: 0 for bare floor, else kind * alpha_levels + fade step"""
+        if self._codes is None:
+            if not self.active:
+                self._codes = _EMPTY
+            else:
+                levels = HAZARDS["alpha_levels"]
+                strongest = self.ttl.argmax(axis=0)
+                left = self.ttl.max(axis=0)
+                step = np.ceil(np.minimum(1.0, left / HAZARDS["fade"]) * levels).astype(np.int16)
+                self._codes = np.where(step > 0, strongest * levels + step, 0).astype(np.int16).ravel()
+        return self._codes
+
+
+class HazardOverlay:
+    """Screen-sized overlay of a hazard grid that redraws only the cells that changed"""
+    def __init__(self):
+        levels = HAZARDS["alpha_levels"]
+        self.palette = [(0, 0, 0, 0)] + [
+            HAZARDS["kinds"][k]["color"] + (HAZARDS["alpha"] * step // levels,)
+            for k in KINDS for step in range(1, levels + 1)]
+        self.shown = _EMPTY.copy()
+        self.surface = None
+        self.area = None  # bounding rect of the lit cells, the only part that gets blitted
+        self.cells_drawn = 0  # running total, for profiling
+
+    def show(self, codes):
+        """Bring the overlay up to date with codes; returns the lit area, or None when nothing is lit"""
+        changed = np.flatnonzero(codes != self.shown)
+        if len(changed):
+            if self.surface is None:
+                self.surface = new_surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            cell, fill, palette = HAZARDS["cell"], self.surface.fill, self.palette
+            for i, code in zip(changed.tolist(), codes[changed].tolist()):
+                fill(palette[code], ((i % COLS) * cell, (i // COLS) * cell, cell, cell))
+            self.shown[changed] = codes[changed]
+            self.cells_drawn += len(changed)
+            lit = np.flatnonzero(self.shown)
+            if len(lit):
+                rows, cols = lit // COLS, lit % COLS
+                x0, y0 = int(cols.min()), int(rows.min())
+                self.area = pygame.Rect(x0 * cell, y0 * cell, (int(cols.max()) + 1 - x0) * cell,
+                                        (int(rows.max()) + 1 - y0) * cell)
+            else:
+                self.area = None
+        return self.area
+
+
+_overlay = None
+
+
+def draw(screen, codes):
+    """Blit the hazard overlay for a grid's codes (HazardLayer.codes)"""
+    global _overlay
+    if _overlay is None:
+        if not codes.any():
+            return
+        _overlay = HazardOverlay()
+    area = _overlay.show(codes)
+    if area is not None:
+        screen.blit(_overlay.surface, area.topleft, area)
@@ -1,13 +1,17 @@
 import pygame
 import random
 import math
-from sprite_renderer import draw_enemy_sprite
-from config import WIDTH, HEIGHT, ARENA, COLORS
+from sprite_renderer import draw_enemy_sprite, draw_hp_bar
+from utils import swept_circle_hit
+from pathing import chase_direction
+from raycast import line_of_sight
+from config import WIDTH, HEIGHT, ARENA, COLORS, ANCIENT_WARRIOR, ARTILLERY_COMMANDER
 
 
 class Projectile:
     def __init__(self, pos, vel, radius, damage, lifetime=3.0):
         self.pos = pygame.Vector2(pos)
+        self.prev_pos = self.pos.copy()  # start of the last step, for swept hits
         self.vel = pygame.Vector2(vel)
         self.radius = radius
         self.damage = damage
@@ -15,6 +19,7 @@ class Projectile:
         self.alive_flag = True
 
     def update(self, dt):
+        self.prev_pos.update(self.pos)
         self.pos += self.vel * dt
         self.lifetime -= dt
         
@@ -30,8 +35,8 @@ class Projectile:
     def try_hit_player(self, player):
         if not self.alive_flag:
             return
-        dist = self.pos.distance_to(player.pos)
-        if dist <= (self.radius + player.radius):
+        if swept_circle_hit(self.prev_pos, self.pos, self.radius,
+                            player.prev_pos, player.pos, player.radius) is not None:
             player.take_damage(self.damage)
             self.alive_flag = False
 
@@ -41,24 +46,25 @@ class Projectile:
 
 class AncientWarrior:
     """History melee: Heavily armored with shield bash stun"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or ANCIENT_WARRIOR
         self.pos = pygame.Vector2(pos)
-        self.radius = 18
-        self.speed = 85.0
-        self.max_hp = 55
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 12
-        self.aggro_range = 400.0
-        self.attack_range = 45.0
-        self.attack_cooldown = 1.0
-        self.attack_windup = 0.4
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.attack_range = stats["attack_range"]
+        self.attack_cooldown = stats["attack_cooldown"]
+        self.attack_windup = stats["attack_windup"]
         self._atk_timer = 0.0
         self.state = "idle"  # idle, windup, swing
         self.state_timer = 0.0
         self.flash_timer = 0.0
         
         # Shield bash ability
-        self.bash_cooldown = 6.0
+        self.bash_cooldown = stats["bash_cooldown"]
         self._bash_timer = 0.0
     
     def update(self, dt, player):
@@ -72,9 +78,9 @@ class AncientWarrior:
         if self.state == "idle":
             # Move toward player slowly (heavily armored)
             if dist > self.attack_range * 0.9 and dist <= self.aggro_range:
-                direction = (player.pos - self.pos)
-                if direction.length_squared() > 0:
-                    self.pos += direction.normalize() * self.speed * dt
+                direction = chase_direction(self.pos, player.pos)
+                if direction is not None:
+                    self.pos += direction * self.speed * dt
             
             # Start attack if in range
             if dist <= self.attack_range and self._atk_timer <= 0.0:
@@ -137,28 +143,23 @@ class AncientWarrior:
                           self.radius // 2, 2)
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 50
-        bar_h = 5
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 10
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 50, 5, self.radius + 10)
 
 
 class ArtilleryCommander:
     """History ranged: Calls down cannon fire and summons foot soldiers"""
-    def __init__(self, pos):
+    def __init__(self, pos, stats=None):
+        stats = stats or ARTILLERY_COMMANDER
         self.pos = pygame.Vector2(pos)
-        self.radius = 14
-        self.speed = 95.0
-        self.max_hp = 40
+        self.radius = stats["radius"]
+        self.speed = stats["move_speed"]
+        self.max_hp = stats["max_hp"]
         self.hp = float(self.max_hp)
-        self.base_damage = 10
-        self.aggro_range = 550.0
-        self.keep_distance = 300.0
-        self.shoot_cd = 2.0
-        self.proj_speed = 200.0
+        self.base_damage = stats["base_damage"]
+        self.aggro_range = stats["aggro_range"]
+        self.keep_distance = stats["keep_distance"]
+        self.shoot_cd = stats["shoot_cooldown"]
+        self.proj_speed = stats["projectile_speed"]
         self._shoot_timer = 0.0
         self.projectiles = []
         self.flash_timer = 0.0
@@ -179,8 +180,8 @@ class ArtilleryCommander:
             if dir.length_squared() > 0:
                 self.pos += dir.normalize() * self.speed * dt
         
-        # Fire cannon shot (slow but powerful)
-        if dist <= self.aggro_range and self._shoot_timer <= 0.0:
+        # Fire cannon shot (slow but powerful) when there's a clear line to the player
+        if dist <= self.aggro_range and self._shoot_timer <= 0.0 and line_of_sight(self.pos, player.pos):
             # Predict player position slightly for better aim
             dir = (player.pos - self.pos)
             if dir.length_squared() > 0:
@@ -218,13 +219,7 @@ class ArtilleryCommander:
                         (self.pos.x + self.radius, self.pos.y - 5), 3)
         
         # HP bar
-        hp_pct = self.hp / self.max_hp
-        bar_w = 45
-        bar_h = 4
-        bar_x = self.pos.x - bar_w/2
-        bar_y = self.pos.y - self.radius - 8
-        pygame.draw.rect(surf, COLORS["ui_hp_back"], (bar_x, bar_y, bar_w, bar_h))
-        pygame.draw.rect(surf, COLORS["ui_hp"], (bar_x, bar_y, bar_w * hp_pct, bar_h))
+        draw_hp_bar(surf, self.pos, self.hp, self.max_hp, 45, 4, self.radius + 8)
         
         # Draw projectiles
         for p in self.projectiles:
@@ -0,0 +1,141 @@
+"""
+Horde survival: a single arena that keeps spawning the selected subjects'
+enemies at a rising rate, up to HORDE["max_live"] on the field at once.
+
+It doubles as the scaling benchmark for the simulation and the renderer:
+
+    python horde.py [seconds] [rate multiplier]
+
+ramps a headless run up to the cap and reports which subsystem breaks the
+60 FPS frame budget first.
+"""
+import os
+import random
+import sys
+from collections import Counter
+
+from archetypes import pick_kinds, spawn_batch
+from config import WIDTH, HEIGHT, ARENA, HORDE
+from map_system import Room
+
+
+def edge_positions(n, rng=random):
+    """n points just inside the arena border, so enemies walk in from the sides"""
+    lo = ARENA["margin"] + HORDE["edge_inset"]
+    xs, ys = WIDTH - lo, HEIGHT - lo
+    positions = []
+    for _ in range(n):
+        side = rng.randrange(4)
+        if side == 0:
+            positions.append((rng.uniform(lo, xs), lo))
+        elif side == 1:
+            positions.append((rng.uniform(lo, xs), ys))
+        elif side == 2:
+            positions.append((lo, rng.uniform(lo, ys)))
+        else:
+            positions.append((xs, rng.uniform(lo, ys)))
+    return positions
+
+
+class HordeRoom(Room):
+    """Never-cleared room that spawns continuously and sweeps out the dead"""
+    def __init__(self, class_types, difficulty_mult=1.0, rng=None):
+        super().__init__("Horde Survival", None, "horde", "Survive as long as you can",
+                         class_types[0], difficulty_mult, rng)
+        self.class_types = class_types
+        self.base_mult = difficulty_mult
+        self.elapsed = 0.0
+        self.rate_scale = 1.0  # the benchmark speeds up the ramp with this
+        self.spawned = 0
+        self.peak = 0
+        self._spawn_budget = 0.0
+        self._compact_timer = 0.0
+
+    def spawn_rate(self):
+        rate = HORDE["start_rate"] + HORDE["rate_growth"] * self.elapsed
+        return min(HORDE["max_rate"], rate) * self.rate_scale
+
+    def current_mult(self):
+        # Stepped so the scaled stat cache only ever holds a handful of entries
+        minutes = int(self.elapsed // 60)
+        return round(self.base_mult * (1.0 + HORDE["difficulty_growth"] * minutes), 2)
+
+    def spawn_enemies(self):
+        pass  # the horde arrives over time in update()
+
+    def check_cleared(self):
+        return False
+
+    def update(self, dt):
+        self.elapsed += dt
+        self._compact_timer -= dt
+        if self._compact_timer <= 0.0:
+            self._compact_timer = HORDE["compact_interval"]
+            self.compact()
+
+        self._spawn_budget += self.spawn_rate() * dt
+        n = min(int(self._spawn_budget), HORDE["max_live"] - len(self.enemies))
+        if n <= 0:
+            # Don't bank spawns while the field is full
+            self._spawn_budget = min(self._spawn_budget, 1.0)
+            return
+        self._spawn_budget -= n
+        self.spawn(n)
+
+    def spawn(self, n):
+        subject = self.rng.choice(self.class_types)
+        mult = self.current_mult()
+        for kind, count in Counter(pick_kinds(subject, n, self.rng)).items():
+            self.enemies.extend(spawn_batch(kind, count, mult, self.rng,
+                                            positions=edge_positions(count, self.rng)))
+        self.spawned += n
+        self.peak = max(self.peak, len(self.enemies))
+
+    def compact(self):
+        """Drop dead enemies (and whatever projectiles they still carried) in place"""
+        self.enemies[:] = [e for e in self.enemies if e.alive()]
+
+
+def benchmark(seconds=120.0, rate_scale=4.0, classes=("Math", "Computer Science", "Physics")):
+    """Fixed-step horde ramp, rendered off-screen, with a per-subsystem budget report"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from env import ActionKeys
+    from profiler import FrameProfiler
+    import quality
+    from world import World, count_projectiles
+    from config import FPS
+
+    pygame.init()
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    world = World(list(classes), "Freshman", horde=True)
+    room = world.map_manager.current_room
+    room.rate_scale = rate_scale
+    player = world.player
+    # Measure the simulation at full quality rather than whatever the governor picks
+    quality.governor.pin(0)
+    prof = FrameProfiler()
+    world.profiler = prof
+    keys = ActionKeys()
+    dt = 1.0 / FPS
+    next_print = 100
+    for _ in range(int(seconds * FPS)):
+        prof.begin()
+        player.hp = player.max_hp  # the benchmark measures load, not survival
+        player.try_attack()
+        world.update(dt, keys)
+        world.draw(screen)
+        live = len(room.enemies)
+        prof.end(enemies=live, projectiles=count_projectiles(room.enemies))
+        if live >= next_print and prof.history:
+            counts, total, _ = prof.history[-1]
+            print(f"{counts['enemies']:5d} enemies {counts['projectiles']:5d} projectiles "
+                  f"{total * 1000:7.2f} ms/frame")
+            next_print += 100
+    print(prof.report())
+    return prof
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    benchmark(float(args[0]) if args else 120.0, float(args[1]) if len(args) > 1 else 4.0)
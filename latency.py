@@ -0,0 +1,124 @@
+"""
+Input-to-display latency.
+
+With STUDYTIME_LATENCY set, game_loop stamps every key press as it comes out
+of pygame.event.get, notes when the press changes the player's state (attack,
+dash, parry, ultimate) and when the frame showing that change is flipped to
+the display, then prints the latency distribution when the run ends.
+
+It also runs headless as a harness, pressing keys on timers:
+
+    python latency.py [seconds] [--threaded]
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+
+import pygame
+
+from telemetry import percentiles
+
+
+class LatencyProbe:
+    def __init__(self):
+        self.samples = {}  # action -> [(press to state change, press to flip)] in seconds
+        self.ignored = Counter()  # presses that changed nothing (on cooldown)
+        self._pending = []  # [action, pressed, changed, tag]
+        self._lock = threading.Lock()  # presented() runs on the render thread when threaded
+
+    def stamp(self, events):
+        """Call with the list pygame.event.get just returned"""
+        now = perf_counter()
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                event.stamp = now
+
+    def changed(self, action, event, took_effect):
+        """The press event triggered action; took_effect is what the player's try_* returned"""
+        if not took_effect:
+            self.ignored[action] += 1
+            return
+        with self._lock:
+            self._pending.append([action, event.stamp, perf_counter(), None])
+
+    def tag(self, elapsed):
+        """Changes made so far will be visible in the frame for game time elapsed"""
+        with self._lock:
+            for p in self._pending:
+                if p[3] is None:
+                    p[3] = elapsed
+
+    def presented(self, elapsed):
+        """The frame for game time elapsed has just been flipped"""
+        now = perf_counter()
+        with self._lock:
+            waiting = []
+            for p in self._pending:
+                if p[3] is not None and p[3] <= elapsed:
+                    action, pressed, changed, _ = p
+                    self.samples.setdefault(action, []).append((changed - pressed, now - pressed))
+                else:
+                    waiting.append(p)
+            self._pending = waiting
+
+    def report(self):
+        lines = ["input latency, ms          n    p50    p90    p99    max"]
+        for action, samples in sorted(self.samples.items()):
+            for label, values in (("state", [s[0] for s in samples]), ("display", [s[1] for s in samples])):
+                p = percentiles(values)
+                lines.append(f"  {action:8s} {label:8s} {len(values):5d} {p['p50']:6.2f} {p['p90']:6.2f} "
+                             f"{p['p99']:6.2f} {p['max']:6.2f}")
+        if self.ignored:
+            lines.append("  ignored (cooldown): " + ", ".join(f"{n} {a}" for a, n in sorted(self.ignored.items())))
+        if len(lines) == 1:
+            lines.append("  no presses changed the player's state")
+        return "\n".join(lines)
+
+    def summary(self):
+        """Percentiles per action, for telemetry"""
+        return {action: {"n": len(s), "state": percentiles([x[0] for x in s]),
+                         "display": percentiles([x[1] for x in s])}
+                for action, s in self.samples.items()}
+
+
+def harness(seconds=20.0, threaded=False, classes=("Math", "Computer Science")):
+    """Play a real-time headless run with timed key presses and report latency"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ["STUDYTIME_LATENCY"] = "1"
+    import main
+    from config import WIDTH, HEIGHT, RENDER
+
+    RENDER["threaded"] = threaded
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    done = threading.Event()
+
+    def press_keys():
+        # SDL keeps one timer per event type, so post the presses from a thread.
+        # Periods are chosen not to line up with each other or the frame rate.
+        periods = {pygame.K_SPACE: 0.137, pygame.K_LSHIFT: 0.411, pygame.K_c: 0.907}
+        start = perf_counter()
+        due = dict.fromkeys(periods, start)
+        while not done.wait(0.001):
+            now = perf_counter()
+            if now - start >= seconds:
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
+                return
+            for key, t in due.items():
+                if now >= t:
+                    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+                    due[key] = t + periods[key]
+
+    presser = threading.Thread(target=press_keys, daemon=True)
+    presser.start()
+    try:
+        main.game_loop(screen, pygame.time.Clock(), list(classes), "Freshman")
+    finally:
+        done.set()
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    harness(float(args[0]) if args else 20.0, threaded="--threaded" in sys.argv)
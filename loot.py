@@ -34,17 +34,23 @@ class Loot:
             player.damage_buff = min(2.0, player.damage_buff + self.value * 0.01)
         self.alive_flag = False
     
+    def view(self):
+        """(loot_type, (x, y), size) as drawn this frame, for draw_loot"""
+        # Pulse effect
+        pulse = 0.5 + 0.5 * math.sin(self.pulse_timer * 4.0)
+        return self.loot_type, (int(self.pos.x), int(self.pos.y)), int(self.radius * (0.8 + pulse * 0.4))
+
     def draw(self, surf):
         if not self.alive_flag:
             return
-        
-        # Pulse effect
-        pulse = 0.5 + 0.5 * math.sin(self.pulse_timer * 4.0)
-        size = int(self.radius * (0.8 + pulse * 0.4))
-        
-        if self.loot_type == "health":
-            pygame.draw.circle(surf, (100, 255, 100), (int(self.pos.x), int(self.pos.y)), size)
-            pygame.draw.circle(surf, (150, 255, 150), (int(self.pos.x), int(self.pos.y)), size, 2)
-        else:
-            pygame.draw.circle(surf, (255, 150, 100), (int(self.pos.x), int(self.pos.y)), size)
-            pygame.draw.circle(surf, (255, 200, 150), (int(self.pos.x), int(self.pos.y)), size, 2)
\ No newline at end of file
+        draw_loot(surf, self.view())
+
+
+def draw_loot(surf, view):
+    loot_type, pos, size = view
+    if loot_type == "health":
+        pygame.draw.circle(surf, (100, 255, 100), pos, size)
+        pygame.draw.circle(surf, (150, 255, 150), pos, size, 2)
+    else:
+        pygame.draw.circle(surf, (255, 150, 100), pos, size)
+        pygame.draw.circle(surf, (255, 200, 150), pos, size, 2)
\ No newline at end of file
@@ -1,16 +1,35 @@
+import time
+LAUNCHED = time.time()  # before pygame, so startup telemetry includes its import
 import pygame, sys, random
 import math
-from config import WIDTH, HEIGHT, FPS, COLORS, ARENA
-from player import Player
+import os
+from config import WIDTH, HEIGHT, FPS, COLORS, ARENA, RENDER, REWIND
 from systems import HUD
-from map_system import MapManager
-from enemy import MathSwordsman, MathArcher
-from computer_science_enemies import BinaryBlade, BugSwarm
-from physics_enemies import KineticBrute, GravityManipulator
-from chemistry_enemies import AcidicAlchemist
-from loot import Loot
-from visual_effects import DamageNumber, HitParticle, LevelUpEffect
-from utils import vec2_from_keys
+import snapshot
+import quality
+import telemetry
+from gc_policy import GCPolicy
+from utils import vec2_from_keys, get_font, new_surface
+# The world (player, map, enemy modules, renderer) is imported by game_loop, so
+# the menu comes up without paying for any of it
+
+# Set by startup_benchmark.py: comma separated classes to start a run with straight from the menu
+STARTUP_BENCH = os.environ.get("STUDYTIME_STARTUP_BENCH")
+# Set to measure input-to-display latency (see latency.py)
+LATENCY = os.environ.get("STUDYTIME_LATENCY")
+_marked = set()
+
+def startup_mark(name):
+    """Log the time since launch the first time name is reached (printed for the benchmark)"""
+    if name in _marked:
+        return
+    _marked.add(name)
+    now = time.time()
+    if STARTUP_BENCH:
+        print(f"startup {name} {now:.6f}", flush=True)
+    session = telemetry.current()
+    if session:
+        session.emit("startup", mark=name, ms=round((now - LAUNCHED) * 1000, 1))
 
 # UI Constants
 BUTTON_HIGHLIGHT_ALPHA = 40
@@ -43,7 +62,7 @@ class Button:
         # Draw highlight on top for 3D effect
         if self.hovered:
             highlight_rect = pygame.Rect(self.rect.x, self.rect.y, self.rect.width, self.rect.height // 3)
-            highlight_surface = pygame.Surface((highlight_rect.width, highlight_rect.height), pygame.SRCALPHA)
+            highlight_surface = new_surface((highlight_rect.width, highlight_rect.height), pygame.SRCALPHA)
             pygame.draw.rect(highlight_surface, (255, 255, 255, BUTTON_HIGHLIGHT_ALPHA), 
                            highlight_surface.get_rect(), border_radius=10)
             screen.blit(highlight_surface, highlight_rect.topleft)
@@ -71,97 +90,121 @@ class Button:
             e.type == pygame.MOUSEBUTTONDOWN and e.button == 1 for e in event_list
         )
 
-def handle_player_attack(player, enemies, loot_items, damage_numbers, particles):
-    hits = 0
-    if not player.attacking:
-        return hits
-    for e in enemies:
-        if not e.alive():
-            continue
-        was_alive = e.hp > 0
-        if player.pos.distance_to(e.pos) <= (player.attack_range + e.radius):
-            dmg = player.get_damage()
-            e.take_damage(dmg)
-            hits += 1
-            
-            # Show damage number
-            is_crit = player.crit_timer > 0
-            damage_numbers.append(DamageNumber(e.pos.copy(), dmg, is_crit))
-            
-            # Create hit particles
-            for _ in range(5):
-                particles.append(HitParticle(e.pos.copy()))
-            
-            # Check if enemy just died
-            if was_alive and not e.alive():
-                # Grant XP based on enemy HP
-                xp_reward = int(e.max_hp * 2)
-                player.gain_xp(xp_reward)
-                player.add_kill()
-                
-                # Create more particles on death
-                for _ in range(10):
-                    particles.append(HitParticle(e.pos.copy(), (200, 100, 100)))
-                
-                # Drop loot (30% chance)
-                if random.random() < 0.3:
-                    loot_type = random.choice(["health", "damage"])
-                    loot_items.append(Loot(e.pos.copy(), loot_type))
-    return hits
-
-def update_enemy_projectiles(enemies, player):
-    for e in enemies:
-        if hasattr(e, "projectiles"):
-            for p in e.projectiles:
-                if p.alive_flag:
-                    p.try_hit_player(player)
-
-def game_loop(screen, clock, selected_classes, difficulty_year):
+def draw_ui(screen, font, hud, map_manager, player, enemies, floor, elapsed, room=None):
+    """Everything drawn over the world layer: death text, HUD, room overlay and hints"""
+    if not player.alive():
+        text = get_font("arial", 42).render(
+            "You fell asleep... again.", True, (255, 180, 180)
+        )
+        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 24))
+
+    hud.draw(screen, player, enemies, floor, elapsed)
+    map_manager.draw_overlay(screen, room)
+
+    # UPDATED: Added special attacks to hint
+    hint1 = font.render("[WASD] Move [Space] Attack (hold=charge) [R] Area Attack [Shift] Dash", True, (200, 200, 220))
+    hint2 = font.render("[C] Parry [Q] Ultimate [E] Interact", True, (200, 200, 220))
+    screen.blit(hint1, (WIDTH - hint1.get_width() - 12, HEIGHT - 52))
+    screen.blit(hint2, (WIDTH - hint2.get_width() - 12, HEIGHT - 28))
+
+def game_loop(screen, clock, selected_classes, difficulty_year, endless=False, world=None, horde=False,
+              practice=False):
+    from world import World, trigger_area_attack
     font = pygame.font.SysFont("arial", 18)
     hud = HUD(font)
-    player = Player((WIDTH / 2, HEIGHT / 2))
-    map_manager = MapManager(selected_classes, difficulty_year)
-    map_manager.load_map()
-    elapsed = 0.0
-    loot_items = []  # Track loot drops
-    damage_numbers = []  # Track damage numbers
-    particles = []  # Track visual particles
-    level_up_effects = []  # Track level up effects
+    if world is None:
+        world = World(selected_classes, difficulty_year, endless=endless, horde=horde, practice=practice)
+    player = world.player
+    map_manager = world.map_manager
+    saver = snapshot.SnapshotWriter()
+    prof = None
+    if map_manager.horde:
+        # Horde mode is the scaling test: profile every frame and report on exit
+        from profiler import FrameProfiler
+        from world import count_projectiles
+        prof = world.profiler = FrameProfiler()
+    probe = None
+    if LATENCY:
+        from latency import LatencyProbe
+        probe = LatencyProbe()
+    renderer = None
+    if RENDER["threaded"]:
+        import render_thread
+        renderer = render_thread.RenderThread(screen, lambda surf, snap: draw_ui(
+            surf, font, hud, map_manager, snap.player, snap.enemies + snap.swarms, snap.floor, snap.elapsed,
+            snap.room))
+        if probe:
+            renderer.on_present = lambda snap: probe.presented(snap.elapsed)
+        map_manager.warm = renderer.call_soon
+    session = telemetry.current()
+    if session:
+        session.start_run(world, "horde" if horde else "endless" if map_manager.endless else "campaign")
+    gc_policy = GCPolicy()
+    gc_policy.loaded()
+    gc_room = map_manager.current_room
+
+    def end_run(reason):
+        saver.close()
+        if renderer:
+            renderer.close()
+            map_manager.warm = None
+        gc_policy.finish()
+        if prof:
+            print(prof.report())
+            print(gc_policy.report())
+        if probe:
+            print(probe.report())
+        if session:
+            if probe:
+                session.emit("latency", actions=probe.summary())
+            session.emit("gc", **gc_policy.summary())
+            session.end_run(world, reason)
+
     running = True
 
     while running:
         dt = clock.tick(FPS) / 1000.0
-        elapsed += dt
+        if prof:
+            prof.begin()
         event_list = pygame.event.get()
+        if probe:
+            probe.stamp(event_list)
 
         for event in event_list:
             if event.type == pygame.QUIT:
+                end_run("quit")
                 return False
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 if event.key == pygame.K_SPACE:
-                    player.try_attack()
+                    attacked = player.try_attack()
+                    if probe:
+                        probe.changed("attack", event, attacked)
                 # NEW: Hold space for charged attack
                 if event.key == pygame.K_r:
                     # Area attack
-                    if player.try_area_attack():
-                        # Mark for area attack processing
-                        player.attacking = True
-                        player.attack_visual_timer = 0.2
-                        player.attack_range_temp = player.attack_range * 2
+                    trigger_area_attack(player)
                 if event.key == pygame.K_LSHIFT:
                     keys = pygame.key.get_pressed()
                     dir = vec2_from_keys(keys, pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d)
                     if dir.length_squared() > 0:
-                        player.try_dash(dir)
+                        dashed = player.try_dash(dir)
                     else:
-                        player.try_dash(pygame.Vector2(1, 0))
+                        dashed = player.try_dash(pygame.Vector2(1, 0))
+                    if probe:
+                        probe.changed("dash", event, dashed)
                 if event.key == pygame.K_c:
-                    player.try_parry()
+                    parried = player.try_parry()
+                    if probe:
+                        probe.changed("parry", event, parried)
                 # NEW: Ultimate ability
                 if event.key == pygame.K_q:
-                    player.try_ultimate()
+                    berserk = player.try_ultimate()
+                    if probe:
+                        probe.changed("ultimate", event, berserk)
+                if event.key == pygame.K_BACKSPACE:
+                    world.rewind(REWIND["step"])
             
             # Track space key hold for charged attack
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
@@ -174,109 +217,66 @@ def game_loop(screen, clock, selected_classes, difficulty_year):
         current_room = map_manager.current_room
         enemies = current_room.enemies
 
-        if player.alive():
-            # Track level before update
-            old_level = player.level
-            
-            # Track space key hold for charged attack (only when not on cooldown)
-            if keys[pygame.K_SPACE] and player._atk_timer <= 0.0:
-                player.charged_attack_time += dt
-            
-            player.update(dt, keys)
-            
-            # Handle area attack with larger range
-            if hasattr(player, 'attack_range_temp'):
-                old_range = player.attack_range
-                player.attack_range = player.attack_range_temp
-                handle_player_attack(player, enemies, loot_items, damage_numbers, particles)
-                player.attack_range = old_range
-                del player.attack_range_temp
-            else:
-                handle_player_attack(player, enemies, loot_items, damage_numbers, particles)
-            
-            # Check if leveled up
-            if player.level > old_level:
-                level_up_effects.append(LevelUpEffect(player.pos.copy()))
-
-            for e in enemies:
-                if e.alive():
-                    e.update(dt, player)
-
-            update_enemy_projectiles(enemies, player)
-            
-            # Update loot items
-            for loot in loot_items:
-                if loot.alive_flag:
-                    loot.update(dt, player)
-            # Remove collected/expired loot
-            loot_items = [l for l in loot_items if l.alive_flag]
-            
-            # Update visual effects
-            for dn in damage_numbers:
-                dn.update(dt)
-            damage_numbers = [dn for dn in damage_numbers if dn.alive]
-            
-            for p in particles:
-                p.update(dt)
-            particles = [p for p in particles if p.alive]
-            
-            for effect in level_up_effects:
-                effect.update(dt)
-            level_up_effects = [e for e in level_up_effects if e.alive]
-
-            pressed_e = any(e.type == pygame.KEYDOWN and e.key == pygame.K_e for e in event_list)
-            map_manager.update_logic(player, dt, pressed_e)
-
-        screen.fill(COLORS["bg"])
-        pygame.draw.rect(screen, COLORS["arena"],
-                         (ARENA["margin"], ARENA["margin"],
-                          WIDTH - 2 * ARENA["margin"], HEIGHT - 2 * ARENA["margin"]), 2)
-
-        for e in enemies:
-            if e.alive():
-                e.draw(screen)
-        
-        # Draw loot items
-        for loot in loot_items:
-            if loot.alive_flag:
-                loot.draw(screen)
-
-        if player.alive():
-            player.draw(screen)
+        pressed_e = any(e.type == pygame.KEYDOWN and e.key == pygame.K_e for e in event_list)
+        if prof:
+            prof.lap("input")
+        t_update = time.perf_counter()
+        world.update(dt, keys, pressed_e)
+        t_draw = time.perf_counter()
+        room = map_manager.current_room
+        if room is not gc_room:
+            gc_room = room
+            gc_policy.safe_point("rest stop" if room.room_type == "shop" else "door")
+        elif world.checkpoint:
+            gc_policy.safe_point("room cleared")
+        gc_policy.update(room)
+        if world.checkpoint:
+            world.checkpoint = False
+            saver.save(world)
+
+        if probe:
+            probe.tag(world.elapsed)
+        if renderer:
+            # The render thread draws the previous tick while the next one is simulated
+            renderer.submit(render_thread.snapshot(world))
+            quality.governor.record(t_draw - t_update, renderer.frame_time)
+            if prof:
+                prof.lap("snapshot")
         else:
-            text = pygame.font.SysFont("arial", 42).render(
-                "You fell asleep... again.", True, (255, 180, 180)
-            )
-            screen.blit(text, (WIDTH // 2 - text.get_width() // 2, HEIGHT // 2 - 24))
-        
-        # Draw visual effects
-        for p in particles:
-            p.draw(screen)
-        
-        for dn in damage_numbers:
-            dn.draw(screen)
-        
-        for effect in level_up_effects:
-            effect.draw(screen)
-
-        hud.draw(screen, player, enemies, map_manager.room_index + 1, elapsed)
-        map_manager.draw_overlay(screen)
-
-        # UPDATED: Added special attacks to hint
-        hint1 = font.render("[WASD] Move [Space] Attack (hold=charge) [R] Area Attack [Shift] Dash", True, (200, 200, 220))
-        hint2 = font.render("[C] Parry [Q] Ultimate [E] Interact", True, (200, 200, 220))
-        screen.blit(hint1, (WIDTH - hint1.get_width() - 12, HEIGHT - 52))
-        screen.blit(hint2, (WIDTH - hint2.get_width() - 12, HEIGHT - 28))
-
-        pygame.display.flip()
-        
-        if not player.alive() or (map_manager.room_index >= len(map_manager.rooms) - 1 and current_room.cleared):
-            show_end_screen(screen, clock, player.alive() and current_room.cleared, elapsed, player)
+            world.draw(screen)
+            draw_ui(screen, font, hud, map_manager, player.view(), enemies, map_manager.room_index + 1, world.elapsed)
+            quality.governor.record(t_draw - t_update, time.perf_counter() - t_draw)
+            if prof:
+                prof.lap("hud")
+
+            pygame.display.flip()
+            if probe:
+                probe.presented(world.elapsed)
+            if prof:
+                prof.lap("flip")
+        if prof:
+            room = map_manager.current_room
+            prof.end(enemies=len(room.enemies), projectiles=count_projectiles(room.enemies))
+        if session:
+            session.frame(world, dt)
+        startup_mark("gameplay")
+        if STARTUP_BENCH:
+            end_run("startup bench")
+            return False
+        
+        if world.is_over():
+            # The run is finished either way; there is nothing left to resume
+            saver.discard()
+            gc_policy.safe_point("end screen")
+            end_run("cleared" if player.alive() else "died")
+            show_end_screen(screen, clock, player.alive() and map_manager.current_room.cleared, world.elapsed, player,
+                            floor=map_manager.room_index + 1)
             return True
     
+    end_run("menu")
     return True
 
-def show_end_screen(screen, clock, won, elapsed_time, player):
+def show_end_screen(screen, clock, won, elapsed_time, player, floor=None):
     font_title = pygame.font.SysFont("arial", 48, bold=True)
     font_sub = pygame.font.SysFont("arial", 24)
     font_stats = pygame.font.SysFont("arial", 18)
@@ -308,6 +308,8 @@ def show_end_screen(screen, clock, won, elapsed_time, player):
             f"Max Combo: {player.max_combo}",
             f"Time: {int(elapsed_time)}s",
         ]
+        if floor is not None:
+            stats_lines.append(f"Floor Reached: {floor}")
         
         title_rect = title.get_rect(center=(WIDTH//2, HEIGHT//2 - 120))
         subtitle_rect = subtitle.get_rect(center=(WIDTH//2, HEIGHT//2 - 60))
@@ -376,7 +378,7 @@ def class_selection_screen(screen, clock, font_small, font_button):
         for i in range(10):
             alpha = 20
             y = i * 70
-            surface = pygame.Surface((WIDTH, 70), pygame.SRCALPHA)
+            surface = new_surface((WIDTH, 70), pygame.SRCALPHA)
             pygame.draw.rect(surface, (*COLORS["bg_accent"], alpha), surface.get_rect())
             screen.blit(surface, (0, y))
         
@@ -467,6 +469,7 @@ def main_menu():
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Study Time — College Dream RPG")
+    telemetry.start()
     clock = pygame.time.Clock()
     font_big = pygame.font.SysFont("arial", 64, bold=True)
     font_small = pygame.font.SysFont("arial", 28)
@@ -474,8 +477,18 @@ def main_menu():
 
     play_btn = Button("PLAY", (WIDTH // 2 - 100, HEIGHT // 2 - 40), (200, 60),
                       font_small, COLORS["menu_accent"], COLORS["menu_hover"])
-    quit_btn = Button("QUIT", (WIDTH // 2 - 100, HEIGHT // 2 + 40), (200, 60),
+    endless_btn = Button("ENDLESS", (WIDTH // 2 - 100, HEIGHT // 2 + 40), (200, 60),
+                         font_small, COLORS["menu_accent"], COLORS["menu_hover"])
+    horde_btn = Button("HORDE", (WIDTH // 2 - 100, HEIGHT // 2 + 120), (200, 60),
+                       font_small, COLORS["menu_accent"], COLORS["menu_hover"])
+    quit_btn = Button("QUIT", (WIDTH // 2 - 100, HEIGHT // 2 + 200), (200, 60),
                       font_small, (180, 70, 70), (230, 100, 100))
+    continue_btn = Button("CONTINUE", (WIDTH // 2 - 100, HEIGHT // 2 - 110), (200, 60),
+                          font_small, (70, 150, 90), (100, 190, 120))
+    # Practice runs can rewind with Backspace; regular runs never can
+    practice = False
+    practice_btn = Button("PRACTICE: OFF", (WIDTH // 2 + 130, HEIGHT // 2 - 40), (200, 60),
+                          font_tiny, (70, 75, 95), COLORS["menu_hover"])
 
     running = True
     pulse_time = 0.0
@@ -491,28 +504,51 @@ def main_menu():
                 running = False
 
         play_btn.is_hovered(mouse_pos)
+        endless_btn.is_hovered(mouse_pos)
+        horde_btn.is_hovered(mouse_pos)
         quit_btn.is_hovered(mouse_pos)
-
-        if play_btn.is_clicked(mouse_pos, event_list):
-            selected_classes, selected_year = class_selection_screen(screen, clock, font_tiny, font_small)
-            if selected_classes:
-                result = game_loop(screen, clock, selected_classes, selected_year)
-                if not result:
+        continue_btn.is_hovered(mouse_pos)
+        practice_btn.is_hovered(mouse_pos)
+        has_save = snapshot.exists()
+
+        if has_save and continue_btn.is_clicked(mouse_pos, event_list):
+            try:
+                world = snapshot.load()
+            except snapshot.SnapshotError:
+                snapshot.delete()
+            else:
+                if not game_loop(screen, clock, None, None, world=world):
                     running = False
+
+        if practice_btn.is_clicked(mouse_pos, event_list):
+            practice = not practice
+            practice_btn.text = "PRACTICE: ON" if practice else "PRACTICE: OFF"
+            practice_btn.color_idle = COLORS["menu_accent"] if practice else (70, 75, 95)
+
+        for btn, endless, horde in ((play_btn, False, False), (endless_btn, True, False),
+                                    (horde_btn, False, True)):
+            if btn.is_clicked(mouse_pos, event_list):
+                selected_classes, selected_year = class_selection_screen(screen, clock, font_tiny, font_small)
+                if selected_classes:
+                    result = game_loop(screen, clock, selected_classes, selected_year, endless, horde=horde,
+                                       practice=practice)
+                    if not result:
+                        running = False
         
         if quit_btn.is_clicked(mouse_pos, event_list):
             running = False
 
         # Draw background with gradient effect
+        t_draw = time.perf_counter()
         screen.fill(COLORS["bg"])
         
-        # Add decorative background elements
-        for i in range(5):
+        # Add decorative background elements (trimmed by the quality governor)
+        for i in range(quality.current["menu_effects"]):
             alpha = int(30 + 10 * math.sin(pulse_time * 2 + i))
             size = 150 + i * 40
             x = WIDTH // 2 + int(100 * math.cos(pulse_time * 0.5 + i * 1.2))
             y = HEIGHT // 3 + int(50 * math.sin(pulse_time * 0.5 + i * 1.2))
-            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            surface = new_surface((size, size), pygame.SRCALPHA)
             pygame.draw.circle(surface, (*COLORS["menu_accent"], alpha), (size//2, size//2), size//2)
             screen.blit(surface, (x - size//2, y - size//2))
         
@@ -533,10 +569,19 @@ def main_menu():
         subtitle = font_tiny.render("A College Student's Final Exam Dream", True, COLORS["ui_gold"])
         screen.blit(subtitle, (WIDTH // 2 - subtitle.get_width() // 2, HEIGHT // 3 - 20))
         
+        if has_save:
+            continue_btn.draw(screen)
         play_btn.draw(screen)
+        endless_btn.draw(screen)
+        horde_btn.draw(screen)
+        practice_btn.draw(screen)
         quit_btn.draw(screen)
+        quality.governor.record(0.0, time.perf_counter() - t_draw)
 
         pygame.display.flip()
+        startup_mark("menu")
+        if STARTUP_BENCH and not game_loop(screen, clock, STARTUP_BENCH.split(","), "Freshman"):
+            running = False
 
     pygame.quit()
     sys.exit()
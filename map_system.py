@@ -1,15 +1,56 @@
 import pygame, random
-from enemy import MathSwordsman, MathArcher, ExamBoss
-from computer_science_enemies import BinaryBlade, BugSwarm
-from physics_enemies import KineticBrute, GravityManipulator
-from chemistry_enemies import AcidicAlchemist
-from biology_enemies import PoisonMite, BioEngineer
-from history_enemies import AncientWarrior, ArtilleryCommander
-from config import WIDTH, HEIGHT, ARENA, DOOR, REST_STOP, COLORS
+from collections import deque, namedtuple
+from archetypes import spawn_wave, spawn_batch, load_subjects, BOSS_KIND
+from config import WIDTH, HEIGHT, ARENA, DOOR, REST_STOP, COLORS, ENDLESS
+from utils import get_font, new_surface
+from sprite_renderer import warm_enemy_sprites
+from geometry import room_obstacles, RoomGeometry
+from hazards import HazardLayer
+from pathing import FlowField
+
+# What an endless run remembers about a room once it has been released
+RoomSummary = namedtuple("RoomSummary", "index room_type class_type enemies kills cleared")
+
+# What MapManager.draw_overlay reads, copied out of a Room for the render thread
+RoomView = namedtuple("RoomView", "id room_type door_open door_rect used_heal used_upgrade")
+
+# Room layout of one 10-floor cycle, mirroring the standard dungeon
+ENDLESS_CYCLE = ["hall", "hall", "hall", "hall", "boss",
+                 "shop", "classroom", "classroom", "classroom", "boss"]
+
+# Sprite family drawn for each room class_type
+SPRITE_TYPES = {
+    "math": "math",
+    "computer science": "cs",
+    "physics": "physics",
+    "chemistry": "chemistry",
+    "biology": "biology",
+    "history": "history",
+}
+
+CLASS_MAP = {
+    "Math": "math",
+    "Computer Science": "computer science",
+    "Physics": "physics",
+    "Chemistry": "chemistry",
+    "Biology": "biology",
+    "History": "history",
+    "Astronomy": "astronomy",
+    "Business": "business",
+    "Geology": "geology",
+    "Music": "music",
+    "Health": "health",
+    "Psychology": "psychology",
+    "Engineering": "engineering",
+    "Art": "art",
+    "Communication": "communication",
+}
 
 class Room:
-    def __init__(self, id, enemies=None, room_type="hall", description="", class_type="math", difficulty_mult=1.0):
+    def __init__(self, id, enemies=None, room_type="hall", description="", class_type="math", difficulty_mult=1.0,
+                 rng=None):
         self.id = id
+        self.rng = rng or random.Random()  # each map room gets its own seeded generator
         self.room_type = room_type
         self.description = description
         self.class_type = class_type
@@ -26,6 +67,63 @@ class Room:
 
         self.used_heal = False
         self.used_upgrade = False
+        self.obstacles = room_obstacles(room_type, class_type)
+        self._geometry = None
+        self._hazards = None
+        self._flow = None
+        self._background = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_background"] = None  # surfaces are rebuilt on demand
+        state["_geometry"] = None
+        state["_flow"] = None
+        state["_hazards"] = None  # ground hazards are short-lived; a resumed room starts clean
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def view(self):
+        return RoomView(self.id, self.room_type, self.door_open, self.door_rect.copy(),
+                        self.used_heal, self.used_upgrade)
+
+    @property
+    def geometry(self):
+        """Collision index over the obstacles, built on first use"""
+        if self._geometry is None:
+            self._geometry = RoomGeometry(self.obstacles)
+        return self._geometry
+
+    @property
+    def flow_field(self):
+        """Chasers' flow field over the obstacles, built on first use"""
+        if self._flow is None:
+            self._flow = FlowField(self.obstacles)
+        return self._flow
+
+    @property
+    def hazards(self):
+        """Ground hazard grid, created on first use"""
+        if self._hazards is None:
+            self._hazards = HazardLayer()
+        return self._hazards
+
+    def get_background(self):
+        """Static floor layer (background and arena border), built once per room"""
+        if self._background is None:
+            bg = new_surface((WIDTH, HEIGHT))
+            bg.fill(COLORS["bg"])
+            pygame.draw.rect(bg, COLORS["arena"],
+                             (ARENA["margin"], ARENA["margin"],
+                              WIDTH - 2 * ARENA["margin"], HEIGHT - 2 * ARENA["margin"]), 2)
+            for rect in self.obstacles:
+                pygame.draw.rect(bg, COLORS["wall"], rect)
+                pygame.draw.rect(bg, COLORS["arena"], rect, 2)
+            if pygame.display.get_surface() is not None:
+                bg = bg.convert()
+            self._background = bg
+        return self._background
 
     def spawn_enemies(self):
         """Spawn enemies for this room"""
@@ -36,92 +134,25 @@ class Room:
             return
 
         if self.room_type == "hall":
-            n = random.randint(2, 4)  # Increased variety
-            for i in range(n):
-                self._spawn_class_enemy()
+            n = self.rng.randint(2, 4)  # Increased variety
+            self.enemies.extend(spawn_wave(self.class_type, n, self.difficulty_mult, self.rng))
         
         elif self.room_type == "classroom":
-            n = random.randint(4, 6)  # More enemies for harder rooms
-            for i in range(n):
-                self._spawn_class_enemy()
+            n = self.rng.randint(4, 6)  # More enemies for harder rooms
+            self.enemies.extend(spawn_wave(self.class_type, n, self.difficulty_mult, self.rng))
         
         elif self.room_type == "boss":
             # Spawn boss with some minions
-            self.enemies.append(self._spawn_boss())
+            self.enemies.extend(spawn_batch(BOSS_KIND, 1, self.difficulty_mult, self.rng,
+                                            positions=[(WIDTH/2, HEIGHT/2 - 40)]))
             # Add 2 minions
-            for _ in range(2):
-                self._spawn_class_enemy()
+            self.enemies.extend(spawn_wave(self.class_type, 2, self.difficulty_mult, self.rng))
         
         elif self.room_type == "shop":
             # Rest stop has no enemies - mark as cleared immediately
             self.cleared = True
             self.door_open = True
 
-    def _spawn_class_enemy(self):
-        """Spawn enemy based on class type"""
-        x = random.randint(ARENA["margin"]+80, WIDTH-ARENA["margin"]-80)
-        y = random.randint(ARENA["margin"]+80, HEIGHT-ARENA["margin"]-80)
-        
-        enemy = None
-        
-        if self.class_type == "math":
-            if random.random() < 0.4:
-                enemy = MathArcher((x, y))
-            else:
-                enemy = MathSwordsman((x, y))
-        
-        elif self.class_type == "computer science":
-            if random.random() < 0.5:
-                enemy = BugSwarm((x, y))
-            else:
-                enemy = BinaryBlade((x, y))
-        
-        elif self.class_type == "physics":
-            if random.random() < 0.4:
-                enemy = GravityManipulator((x, y))
-            else:
-                enemy = KineticBrute((x, y))
-        
-        elif self.class_type == "chemistry":
-            enemy = AcidicAlchemist((x, y))
-        
-        elif self.class_type == "biology":
-            if random.random() < 0.4:
-                enemy = BioEngineer((x, y))
-            else:
-                enemy = PoisonMite((x, y))
-        
-        elif self.class_type == "history":
-            if random.random() < 0.5:
-                enemy = ArtilleryCommander((x, y))
-            else:
-                enemy = AncientWarrior((x, y))
-        
-        else:
-            # Fallback for unimplemented classes
-            if random.random() < 0.4:
-                enemy = MathArcher((x, y))
-            else:
-                enemy = MathSwordsman((x, y))
-        
-        # Apply difficulty multiplier to enemy stats
-        if enemy and self.difficulty_mult != 1.0:
-            enemy.max_hp = int(enemy.max_hp * self.difficulty_mult)
-            enemy.hp = float(enemy.max_hp)
-            enemy.base_damage = int(enemy.base_damage * self.difficulty_mult)
-        
-        self.enemies.append(enemy)
-
-    def _spawn_boss(self):
-        """Spawn boss with difficulty scaling"""
-        boss = ExamBoss((WIDTH/2, HEIGHT/2 - 40))
-        # Apply difficulty multiplier to boss stats
-        if self.difficulty_mult != 1.0:
-            boss.max_hp = int(boss.max_hp * self.difficulty_mult)
-            boss.hp = float(boss.max_hp)
-            boss.base_damage = int(boss.base_damage * self.difficulty_mult)
-        return boss
-
     def check_cleared(self):
         if len(self.enemies) == 0:
             if self.room_type == "shop":
@@ -138,14 +169,42 @@ class Room:
 
 
 class MapManager:
-    def __init__(self, selected_classes=None, difficulty_year="Freshman"):
+    def __init__(self, selected_classes=None, difficulty_year="Freshman", endless=False, seed=None,
+                 prewarm=True, horde=False, rng=None):
         self.selected_classes = selected_classes or ["Math", "Computer Science"]
         self.difficulty_year = difficulty_year
+        self.endless = endless
+        self.horde = horde
+        self.rng = rng or random.Random(seed)  # the world's generator; only draws the run seed
+        self.seed = self.rng.randrange(1 << 30) if seed is None else seed
         self.rooms = []
         self.current_room = None
         self.room_index = 0
-        self.font = pygame.font.SysFont("arial", 22)
+        # Endless runs only keep the live room plus a bounded log of past rooms
+        self.history = deque(maxlen=ENDLESS["history_len"])
+        # Next room being prepared a slice per frame while this one is played
+        self.prewarm = prewarm
+        self._prepare_job = None
+        self._prepared = None  # (room_index, room) once ready
+        self._scratch = None
+        # Set by the game loop to RenderThread.call_soon when rendering is threaded,
+        # so sprite warm-up happens on the thread that owns the sprite cache
+        self.warm = None
+        self.font = get_font("arial", 22)
         self.difficulty_multiplier = self._get_difficulty_multiplier()
+        # Only the chosen subjects' enemy modules get imported
+        load_subjects([CLASS_MAP.get(c, "math") for c in self.selected_classes])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Fonts, scratch surfaces and the in-progress preparation are rebuilt after load
+        for key in ("font", "_scratch", "_prepare_job", "_prepared", "warm"):
+            state[key] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.font = get_font("arial", 22)
 
     def _get_difficulty_multiplier(self):
         multipliers = {
@@ -159,14 +218,7 @@ class MapManager:
 
     def load_map(self):
         """Generate 10-floor dungeon"""
-        class_map = {
-            "Math": "math",
-            "Computer Science": "computer science",
-            "Physics": "physics",
-            "Chemistry": "chemistry",
-            "Biology": "biology",
-            "History": "history",
-        }
+        class_map = CLASS_MAP
         
         # Filter to only implemented classes
         valid_classes = [c for c in self.selected_classes if c in class_map]
@@ -174,6 +226,19 @@ class MapManager:
             valid_classes = ["Math", "Computer Science"]
         self.selected_classes = valid_classes
         
+        if self.horde:
+            from horde import HordeRoom  # horde.py builds on Room
+            subjects = [class_map[c] for c in self.selected_classes]
+            self.current_room = HordeRoom(subjects, self.difficulty_multiplier, random.Random(self.seed))
+            self.rooms = [self.current_room]
+            return
+
+        if self.endless:
+            self.current_room = self._generate_room(0)
+            self.rooms = [self.current_room]
+            self.current_room.spawn_enemies()
+            return
+        
         room_count = 0
         
         # FLOORS 1-4: Early waves (2 waves per class)
@@ -181,7 +246,8 @@ class MapManager:
             class_key = class_map.get(class_name, "math")
             for wave in range(1, 3):
                 room_id = f"Floor {room_count + 1}: {class_name} Wave {wave}"
-                room = Room(room_id, None, "hall", f"{class_name} wave {wave}", class_key, self.difficulty_multiplier)
+                room = Room(room_id, None, "hall", f"{class_name} wave {wave}", class_key, self.difficulty_multiplier,
+                            self._room_rng(room_count))
                 self.rooms.append(room)
                 room_count += 1
         
@@ -189,13 +255,15 @@ class MapManager:
         for class_name in self.selected_classes:
             class_key = class_map.get(class_name, "math")
             room_id = f"Floor {room_count + 1}: {class_name} Mini-Boss"
-            room = Room(room_id, None, "boss", f"{class_name} mini-boss", class_key, self.difficulty_multiplier)
+            room = Room(room_id, None, "boss", f"{class_name} mini-boss", class_key, self.difficulty_multiplier,
+                        self._room_rng(room_count))
             self.rooms.append(room)
             room_count += 1
         
         # FLOOR 6: Rest Stop
         rest_stop_room = Room(f"Floor {room_count + 1}: Rest Stop", None, "shop", 
-                             "Midterm break - heal and upgrade", "math", self.difficulty_multiplier)
+                             "Midterm break - heal and upgrade", "math", self.difficulty_multiplier,
+                             self._room_rng(room_count))
         self.rooms.append(rest_stop_room)
         room_count += 1
         
@@ -206,7 +274,8 @@ class MapManager:
                 room_id = f"Floor {room_count + 1}: {class_name} Hard Wave {wave}"
                 # Apply additional 1.5x multiplier to hard floors
                 hard_mult = self.difficulty_multiplier * 1.5
-                room = Room(room_id, None, "classroom", f"Advanced {class_name} wave", class_key, hard_mult)
+                room = Room(room_id, None, "classroom", f"Advanced {class_name} wave", class_key, hard_mult,
+                            self._room_rng(room_count))
                 self.rooms.append(room)
                 room_count += 1
         
@@ -216,16 +285,119 @@ class MapManager:
         room_id = f"Floor {room_count + 1}: FINAL EXAM"
         # Apply 2x multiplier to final boss
         boss_mult = self.difficulty_multiplier * 2.0
-        final_room = Room(room_id, None, "boss", "The ultimate test", class_key, boss_mult)
+        final_room = Room(room_id, None, "boss", "The ultimate test", class_key, boss_mult,
+                          self._room_rng(room_count))
         self.rooms.append(final_room)
         
         self.current_room = self.rooms[0]
         self.current_room.spawn_enemies()
 
+    def _room_rng(self, index):
+        """Room index's own generator, so when a room spawns doesn't shift any other roll in the run"""
+        return random.Random(f"{self.seed}:{index}")
+
+    def _generate_room(self, index):
+        """Build endless room number index from the run seed alone.
+
+        Only the room's own generator is seeded, so the cost does not depend
+        on how deep the run is and revisiting an index rebuilds the same room.
+        """
+        rng = self._room_rng(index)
+        cycle, slot = divmod(index, len(ENDLESS_CYCLE))
+        room_type = ENDLESS_CYCLE[slot]
+        class_name = rng.choice(self.selected_classes)
+        class_key = CLASS_MAP.get(class_name, "math")
+        floor_mult = self.difficulty_multiplier * (1.0 + ENDLESS["floor_scaling"] * index)
+        if room_type == "classroom":
+            floor_mult *= 1.5
+        elif room_type == "boss" and slot == len(ENDLESS_CYCLE) - 1:
+            floor_mult *= 2.0
+
+        if room_type == "shop":
+            room_id = f"Floor {index + 1}: Rest Stop"
+            return Room(room_id, None, "shop", "Midterm break - heal and upgrade",
+                        "math", floor_mult, rng)
+        label = {"hall": "Wave", "classroom": "Hard Wave", "boss": "Boss"}[room_type]
+        room_id = f"Floor {index + 1}: {class_name} {label} (Semester {cycle + 1})"
+        return Room(room_id, None, room_type, f"{class_name} {label.lower()}", class_key, floor_mult, rng)
+
+    def _summarize(self, room):
+        return RoomSummary(self.room_index, room.room_type, room.class_type, len(room.enemies),
+                           sum(1 for e in room.enemies if not e.alive()), room.cleared)
+
+    def is_final_room(self):
+        return not (self.endless or self.horde) and self.room_index >= len(self.rooms) - 1
+
+    def _prepare_next_room(self):
+        """Build the next room in small steps; each yield hands the frame back.
+
+        Enemies are constructed and positioned, the room's sprites are baked,
+        each enemy is drawn once off-screen so fonts and surfaces it uses exist,
+        and the background layer is built. next_room then just swaps it in.
+        With a threaded renderer (self.warm set) the sprites are baked on the
+        render thread instead and no enemy is drawn here: that renderer draws
+        enemies from the baked icons only. The background is still built here,
+        on a surface nothing else holds yet, as snapshot() would build it.
+        """
+        index = self.room_index + 1
+        if self.endless:
+            room = self._generate_room(index)
+        elif index < len(self.rooms):
+            room = self.rooms[index]
+        else:
+            return
+        yield
+        room.spawn_enemies()
+        yield
+        sprite_type = SPRITE_TYPES.get(room.class_type, room.class_type)
+        if self.warm is not None:
+            for radius in {e.radius for e in room.enemies}:
+                self.warm(warm_enemy_sprites, sprite_type, radius)
+        else:
+            if self._scratch is None:
+                self._scratch = new_surface((64, 64), pygame.SRCALPHA)
+            for e in room.enemies:
+                warm_enemy_sprites(sprite_type, e.radius)
+                e.draw(self._scratch)
+                yield
+        room.get_background()
+        self._prepared = (index, room)
+
+    def _advance_prepare(self):
+        if self._prepared is not None:
+            return
+        if self._prepare_job is None:
+            self._prepare_job = self._prepare_next_room()
+        if next(self._prepare_job, StopIteration) is StopIteration:
+            self._prepare_job = None
+            if self._prepared is None:
+                # Nothing left to prepare (final room); mark done
+                self._prepared = (self.room_index + 1, None)
+
+    def _take_prepared(self, index):
+        prepared, self._prepared, self._prepare_job = self._prepared, None, None
+        if prepared is not None and prepared[0] == index:
+            return prepared[1]
+        return None
+
     def next_room(self, player):
+        if self.endless:
+            self.history.append(self._summarize(self.current_room))
+            self.room_index += 1
+            room = self._take_prepared(self.room_index)
+            # Drop the cleared room (and its dead enemies) before building the next one
+            self.current_room = self.rooms[0] = None
+            if room is None:
+                room = self._generate_room(self.room_index)
+            self.current_room = self.rooms[0] = room
+            self.current_room.spawn_enemies()
+            player.pos.x = WIDTH / 2
+            player.pos.y = HEIGHT - 100
+            return
         self.room_index += 1
         if self.room_index >= len(self.rooms):
             self.room_index = len(self.rooms) - 1
+        self._take_prepared(self.room_index)
         self.current_room = self.rooms[self.room_index]
         self.current_room.spawn_enemies()
         player.pos.x = WIDTH / 2
@@ -233,6 +405,9 @@ class MapManager:
 
     def update_logic(self, player, dt, player_pressed_e):
         room = self.current_room
+        if self.horde:
+            room.update(dt)
+            return
         room.check_cleared()
 
         if room.room_type == "shop":
@@ -252,9 +427,14 @@ class MapManager:
         if room.door_open:
             if room.door_rect.collidepoint(int(player.pos.x), int(player.pos.y - player.radius)):
                 self.next_room(player)
+                return
 
-    def draw_overlay(self, screen):
-        room = self.current_room
+        if self.prewarm:
+            self._advance_prepare()
+
+    def draw_overlay(self, screen, room=None):
+        """Room name, door and rest-stop stations; room may be a Room or a RoomView"""
+        room = room or self.current_room
         name = self.font.render(room.id, True, (220, 220, 240))
         screen.blit(name, (WIDTH // 2 - name.get_width() // 2, 8))
 
@@ -269,9 +449,9 @@ class MapManager:
             hint = self.font.render("Rest Stop: [E] to Heal or Upgrade", True, COLORS["interact"])
             screen.blit(hint, (WIDTH // 2 - hint.get_width() // 2, HEIGHT - 36))
             
-            if self.current_room.used_heal:
+            if room.used_heal:
                 used = self.font.render("Heal used", True, (200, 160, 160))
                 screen.blit(used, (hx - used.get_width() // 2, hy - 40))
-            if self.current_room.used_upgrade:
+            if room.used_upgrade:
                 used2 = self.font.render("Upgrade used", True, (200, 160, 160))
                 screen.blit(used2, (ux - used2.get_width() // 2, uy - 40))
\ No newline at end of file
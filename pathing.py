@@ -0,0 +1,131 @@
+"""
+Flow-field steering for enemies that chase the player.
+
+Each room keeps one field (Room.flow_field) on a coarse grid (PATHING["cell"]
+pixels). A breadth-first sweep out from the player's cell over the walkable
+cells gives every cell the direction of its next step toward the player.
+Every chaser reads the same field, so the pathing cost does not depend on how
+many enemies use it.
+
+The sweep is vectorized: each cell's walkable neighbours are tabulated once
+per room, and the sweep expands a whole frontier per NumPy step. It only runs
+when the player has moved into another cell and a chaser actually asks for a
+direction, so rooms whose chasers are dead or out of aggro range never pay for
+it.
+
+In a room without obstacles the field is never built and chasers head
+straight for the player.
+"""
+import numpy as np
+import pygame
+
+from config import WIDTH, HEIGHT, PATHING
+
+# 8-connected neighbours as (dx, dy), with the unit step toward each
+_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+_UNIT = [pygame.Vector2(dx, dy).normalize() for dx, dy in _STEPS]
+
+
+class FlowField:
+    def __init__(self, obstacles=()):
+        self.cell = cell = PATHING["cell"]
+        self.cols = -(-WIDTH // cell)
+        self.rows = -(-HEIGHT // cell)
+        blocked = np.zeros((self.rows, self.cols), dtype=bool)
+        pad = PATHING["clearance"]
+        for rect in obstacles:
+            r = pygame.Rect(rect).inflate(2 * pad, 2 * pad)
+            blocked[max(0, r.top // cell):max(0, (r.bottom - 1) // cell + 1),
+                    max(0, r.left // cell):max(0, (r.right - 1) // cell + 1)] = True
+        self.blocked = blocked.ravel()
+        self.open = not self.blocked.any()
+        self.links = None if self.open else self._links()
+        self.flow = None  # per cell, index into _UNIT of the step toward the target (-1: none)
+        self.target = None
+        self.stale = False
+        self.rebuilds = 0
+
+    def _links(self):
+        """(cells, 8) index of the neighbour one step each way, -1 where it is blocked"""
+        cols, rows, blocked = self.cols, self.rows, self.blocked
+        cy, cx = np.divmod(np.arange(cols * rows), cols)
+        links = np.full((cols * rows, len(_STEPS)), -1, dtype=np.intp)
+        for k, (dx, dy) in enumerate(_STEPS):
+            nx, ny = cx + dx, cy + dy
+            ok = (nx >= 0) & (nx < cols) & (ny >= 0) & (ny < rows)
+            nx, ny = np.clip(nx, 0, cols - 1), np.clip(ny, 0, rows - 1)
+            n = ny * cols + nx
+            ok &= ~blocked[n]
+            if dx and dy:
+                # No cutting corners past a blocked cell
+                ok &= ~blocked[cy * cols + nx] & ~blocked[ny * cols + cx]
+            links[ok, k] = n[ok]
+        return links
+
+    def cell_index(self, pos):
+        cx = min(self.cols - 1, max(0, int(pos[0]) // self.cell))
+        cy = min(self.rows - 1, max(0, int(pos[1]) // self.cell))
+        return cy * self.cols + cx
+
+    def track(self, pos):
+        """Point the field at pos; it is swept again on the next read if pos is in a new cell"""
+        if self.open:
+            return
+        target = self.cell_index(pos)
+        if target != self.target:
+            self.target = target
+            self.stale = True
+
+    def _rebuild(self):
+        links = self.links
+        n = len(links)
+        # Steps from the target per cell; slot n stands in for the -1 links and is never reached
+        dist = np.full(n + 1, n, dtype=np.int32)
+        dist[self.target] = 0
+        frontier = np.array([self.target])
+        d = 0
+        while len(frontier):
+            d += 1
+            nb = links[frontier].ravel()
+            nb = nb[(nb >= 0) & (dist[nb] > d)]
+            dist[nb] = d
+            frontier = np.flatnonzero(dist[:n] == d)
+        # Each cell steps toward its nearest neighbour, if that is nearer than the cell itself
+        near = dist[links]
+        step = near.argmin(axis=1)
+        flow = np.where(near[np.arange(n), step] < dist[:n], step, -1)
+        flow[self.blocked] = -1
+        self.flow = flow.tolist()
+        self.stale = False
+        self.rebuilds += 1
+
+    def direction(self, pos, goal):
+        """Unit vector to move along from pos toward goal, or None when already there"""
+        if not self.open:
+            if self.stale:
+                self._rebuild()
+            k = self.flow[self.cell_index(pos)]
+            if k >= 0:
+                return _UNIT[k]
+        d = goal - pos
+        if d.length_squared() == 0:
+            return None
+        return d.normalize()
+
+
+_field = None
+
+
+def track(room, player_pos):
+    """Call once per tick before enemies update: chasers steer by this room's field"""
+    global _field
+    _field = room.flow_field
+    _field.track(player_pos)
+
+
+def chase_direction(pos, goal):
+    """Direction a chaser at pos should move to reach the player at goal (None if there)"""
+    if _field is None:
+        d = goal - pos
+        return d.normalize() if d.length_squared() > 0 else None
+    return _field.direction(pos, goal)
@@ -0,0 +1,253 @@
+"""
+Bullet patterns: declarative volleys compiled into batches with closed-form motion.
+
+A pattern (see PATTERNS in config.py) is a list of volley specs:
+
+    shape    "ring" (count bullets evenly round a circle), "spread" (count
+             bullets across arc radians) or "aimed" (count bullets straight on)
+    count    bullets per volley (1)
+    arc      width of a spread, radians (0.5)
+    offset   rotation of the whole volley, radians (0)
+    jitter   random rotation of each volley, up to +- this many radians (0)
+    speed    px/s (200); radius (6); ttl seconds (3.0); damage, added to the
+             shooter's base damage (0); color (COLORS["proj"])
+    at       delay before the first volley, seconds (0)
+    repeat   volleys (1), every seconds apart (0), each turned by turn
+             radians more than the last (0); a ring with repeat and turn is a spiral
+    orbit    optional {"radius", "spin", "hold", "collapse"}: the bullets
+             circle the target point at radius px, spin rad/s, for hold
+             seconds, then the orbit shrinks at collapse px/s until it closes
+
+Shapes are aimed at the target: angle 0 points from the origin to it.
+
+compile_pattern() turns a pattern into one BulletBatch. Every bullet's position is a
+function of the batch's clock (p0 + v * t, or the orbit formula), and its
+expiry time is worked out up front, against the room's walls as well for
+straight shots (raycast.cast_many). Advancing a batch only moves its clock, so
+its cost per tick doesn't depend on how many bullets it holds, and
+positions(t) gives the exact picture at any time.
+"""
+import math
+import random
+
+import numpy as np
+import pygame
+
+from config import COLORS, PATTERNS
+import raycast
+
+
+class BulletBatch:
+    def __init__(self, fire, end, p0, vel, radius, damage, style, colors, orbit=None):
+        self.t = 0.0  # batch clock, seconds since it was compiled
+        self.prev_t = 0.0
+        self.fire = fire  # (n,) when each bullet appears
+        self.end = end  # (n,) when it expires on its own
+        self.p0 = p0  # (n, 2) launch point (orbit centre for orbiters)
+        self.vel = vel  # (n, 2)
+        self.radius = radius  # (n,)
+        self.damage = damage  # (n,)
+        self.style = style  # (n,) index into colors
+        self.colors = colors
+        self.alive = np.ones(len(fire), dtype=bool)  # cleared when a bullet hits
+        # Orbiters: (n,) mask and per-bullet start angle, radius, spin, hold, collapse
+        self.orbit = orbit
+        self.done = False
+
+    def __len__(self):
+        return len(self.fire)
+
+    def advance(self, dt):
+        """Move the clock on; the batch is done once every bullet has expired or hit"""
+        self.prev_t = self.t
+        self.t += dt
+        self.done = not (self.alive & (self.end > self.t)).any()
+
+    def live(self, t=None):
+        """Indices of the bullets in flight at time t (default: now)"""
+        t = self.t if t is None else t
+        return np.flatnonzero(self.alive & (self.fire <= t) & (t < self.end))
+
+    def positions(self, t=None, rows=None):
+        """(len(rows), 2) positions at time t; t may also be one time per row"""
+        t = self.t if t is None else t
+        if rows is None:
+            rows = np.arange(len(self.fire))
+        age = np.broadcast_to(np.asarray(t, dtype=float), rows.shape) - self.fire[rows]
+        pos = self.p0[rows] + self.vel[rows] * age[:, None]
+        if self.orbit is not None:
+            on = self.orbit["mask"][rows]
+            if on.any():
+                o = {k: v[rows][on] for k, v in self.orbit.items() if k != "mask"}
+                a = age[on]
+                r = np.maximum(0.0, o["radius"] - o["collapse"] * np.maximum(0.0, a - o["hold"]))
+                angle = o["angle"] + o["spin"] * a
+                pos[on] = self.p0[rows][on] + r[:, None] * np.column_stack((np.cos(angle), np.sin(angle)))
+        return pos
+
+    def velocities(self, t=None, rows=None):
+        """(len(rows), 2) velocities at time t"""
+        t = self.t if t is None else t
+        if rows is None:
+            rows = np.arange(len(self.fire))
+        vel = self.vel[rows].copy()
+        if self.orbit is not None:
+            on = self.orbit["mask"][rows]
+            if on.any():
+                o = {k: v[rows][on] for k, v in self.orbit.items() if k != "mask"}
+                a = np.asarray(t, dtype=float) - self.fire[rows][on]
+                closing = a > o["hold"]
+                r = np.maximum(0.0, o["radius"] - o["collapse"] * np.maximum(0.0, a - o["hold"]))
+                angle = o["angle"] + o["spin"] * a
+                c, s = np.cos(angle), np.sin(angle)
+                dr = np.where(closing, -o["collapse"], 0.0)
+                vel[on] = np.column_stack((dr * c - r * o["spin"] * s, dr * s + r * o["spin"] * c))
+        return vel
+
+    def hit_player(self, player):
+        """Swept test of every bullet's last step against the player's; hits are spent"""
+        t0, t1 = self.prev_t, self.t
+        rows = np.flatnonzero(self.alive & (self.fire <= t1) & (self.end > t0))
+        if not len(rows):
+            return 0
+        # Each bullet over the part of the tick it existed for
+        a = self.positions(np.maximum(t0, self.fire[rows]), rows)
+        b = self.positions(np.minimum(t1, self.end[rows]), rows)
+        # Relative to the player, who also moved prev_pos -> pos in that time
+        r0 = a - (player.prev_pos.x, player.prev_pos.y)
+        d = (b - (player.pos.x, player.pos.y)) - r0
+        dd = (d * d).sum(axis=1)
+        s = np.clip(-(r0 * d).sum(axis=1) / np.maximum(dd, 1e-12), 0.0, 1.0)
+        close = r0 + d * s[:, None]
+        reach = self.radius[rows] + player.radius
+        hit = rows[(close * close).sum(axis=1) < reach * reach]
+        for i in hit.tolist():
+            player.take_damage(self.damage[i])
+        self.alive[hit] = False
+        return len(hit)
+
+    def draw(self, surf):
+        rows = self.live()
+        if not len(rows):
+            return
+        colors, orbit = self.colors, self.orbit
+        for i, (x, y) in zip(rows.tolist(), self.positions(rows=rows).astype(int).tolist()):
+            color = colors[self.style[i]]
+            r = int(self.radius[i])
+            pygame.draw.circle(surf, color, (x, y), r)
+            if orbit is not None and orbit["mask"][i]:
+                pygame.draw.circle(surf, color, (x, y), r + 2, 1)
+
+
+def compile_pattern(pattern, origin, target, base_damage=0, rng=random):
+    """Build a BulletBatch firing pattern from origin at target (both (x, y))"""
+    ox, oy = origin
+    aim = math.atan2(target[1] - oy, target[0] - ox)
+    fire, angle, speed, radius, ttl, damage, style, colors = [], [], [], [], [], [], [], []
+    orbiting, orbit_cols = [], []
+    for spec in pattern:
+        count = spec.get("count", 1)
+        shape = spec.get("shape", "aimed")
+        if shape == "ring":
+            shape_angles = np.arange(count) * (2.0 * math.pi / count)
+        elif shape == "spread" and count > 1:
+            arc = spec.get("arc", 0.5)
+            shape_angles = np.linspace(-arc / 2.0, arc / 2.0, count)
+        else:
+            shape_angles = np.zeros(count)
+        colors.append(spec.get("color", COLORS["proj"]))
+        orbit = spec.get("orbit")
+        jitter = spec.get("jitter", 0.0)
+        for v in range(spec.get("repeat", 1)):
+            turn = aim + spec.get("offset", 0.0) + v * spec.get("turn", 0.0)
+            if jitter:
+                turn += rng.uniform(-jitter, jitter)
+            fire.append(np.full(count, spec.get("at", 0.0) + v * spec.get("every", 0.0)))
+            angle.append(shape_angles + turn)
+            speed.append(np.full(count, 0.0 if orbit else spec.get("speed", 200.0)))
+            radius.append(np.full(count, float(spec.get("radius", 6))))
+            life = spec.get("ttl", 3.0)
+            if orbit:
+                life = min(life, orbit["hold"] + orbit["radius"] / orbit["collapse"])
+            ttl.append(np.full(count, life))
+            damage.append(np.full(count, float(base_damage + spec.get("damage", 0))))
+            style.append(np.full(count, len(colors) - 1))
+            orbiting.append(np.full(count, bool(orbit)))
+            if orbit:
+                orbit_cols.append(np.array([(orbit["radius"], orbit["spin"], orbit["hold"], orbit["collapse"])] * count))
+            else:
+                orbit_cols.append(np.zeros((count, 4)))
+    fire, angle, speed, ttl = (np.concatenate(x) for x in (fire, angle, speed, ttl))
+    n = len(fire)
+    direction = np.column_stack((np.cos(angle), np.sin(angle)))
+    vel = direction * speed[:, None]
+    p0 = np.tile((float(ox), float(oy)), (n, 1))
+    orbiting = np.concatenate(orbiting)
+    end = fire + ttl
+    straight = ~orbiting & (speed > 0.0)
+    if straight.any():
+        # Straight shots end where they meet a wall, known now rather than found each tick
+        casts = raycast.cast_many(p0[straight], direction[straight], speed[straight] * ttl[straight])
+        end[straight] = fire[straight] + np.where(casts.blocked, casts.distances / speed[straight], ttl[straight])
+    orbit = None
+    if orbiting.any():
+        cols = np.concatenate(orbit_cols)
+        orbit = {"mask": orbiting, "angle": angle, "radius": cols[:, 0], "spin": cols[:, 1],
+                 "hold": cols[:, 2], "collapse": cols[:, 3]}
+        p0[orbiting] = target
+    return BulletBatch(fire, end, p0, vel, np.concatenate(radius), np.concatenate(damage),
+                       np.concatenate(style), colors, orbit)
+
+
+def fire(name, origin, target, base_damage=0, rng=random):
+    """compile_pattern() for a pattern named in PATTERNS"""
+    return compile_pattern(PATTERNS[name], origin, target, base_damage, rng)
+
+
+def advance(batches, dt):
+    """Advance a shooter's batches and drop the finished ones; returns the new list"""
+    for b in batches:
+        b.advance(dt)
+    return [b for b in batches if not b.done]
+
+
+def count_live(batches):
+    return sum(len(b.live()) for b in batches)
+
+
+if __name__ == "__main__":
+    # python patterns.py [bullets]: cost per tick of a dense spiral vs. one Projectile per bullet
+    import sys
+    import os
+    from time import perf_counter
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from enemy import Projectile
+
+    class Dummy:
+        radius = 16
+        prev_pos = pygame.Vector2(100, 100)
+        pos = pygame.Vector2(100, 100)
+
+        def take_damage(self, dmg):
+            pass
+
+    bullets = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    spiral = [{"shape": "ring", "count": 20, "speed": 60.0, "radius": 5, "ttl": 30.0,
+               "repeat": bullets // 20, "every": 0.0, "turn": 0.1}]
+    batch = compile_pattern(spiral, (500, 350), (500, 0))
+    shots = [Projectile((500, 350), v, 5, 1, ttl=30.0) for v in batch.vel.tolist()]
+    player = Dummy()
+    ticks = 120
+    t = perf_counter()
+    for _ in range(ticks):
+        batch.advance(1 / 60)
+        batch.hit_player(player)
+    batched = (perf_counter() - t) / ticks
+    t = perf_counter()
+    for _ in range(ticks):
+        for p in shots:
+            p.update(1 / 60)
+            p.try_hit_player(player)
+    single = (perf_counter() - t) / ticks
+    print(f"{len(batch)} bullets: batch {batched * 1000:.3f} ms/tick, "
+          f"Projectile objects {single * 1000:.3f} ms/tick")
@@ -1,25 +1,37 @@
 import pygame
 import random
 import math
-from config import PLAYER, COLORS, ARENA, WIDTH, HEIGHT
-from utils import vec2_from_keys, clamp
+from collections import namedtuple
+from config import PLAYER, COLORS, ARENA, WIDTH, HEIGHT, HAZARDS
+from utils import vec2_from_keys, clamp, get_font, new_surface
 from sprite_renderer import draw_player_sprite, draw_slash_effect
+import quality
+from stats import StatBlock
 
 class Player:
-    def __init__(self, pos):
+    def __init__(self, pos, rng=None):
         self.pos = pygame.Vector2(pos)
+        self.rng = rng or random.Random()  # the world's generator, for crit rolls
+        # Where this step started; hits are swept along prev_pos -> pos so a
+        # dash can't skip past projectiles, enemies or hazards between ticks
+        self.prev_pos = self.pos.copy()
         self.radius = 16
-        self.speed = PLAYER["move_speed"]
+        self.mass = PLAYER["mass"]
+        # Derived stats: base values (melee_damage, speed, attack_range below)
+        # with buffs, combo and berserk stacked on as modifiers
+        self.stats = StatBlock(melee_damage=PLAYER["melee_damage"], speed=PLAYER["move_speed"],
+                               attack_range=PLAYER["attack_range"], crit_chance=0.15, crit_multiplier=2.0)
         self.max_hp = PLAYER["max_hp"]
         self.hp = float(self.max_hp)
-        self.melee_damage = PLAYER["melee_damage"]
         self.attack_cooldown = PLAYER["attack_cooldown"]
-        self.attack_range = PLAYER["attack_range"]
         self.i_frames = PLAYER["i_frames"]
         self._atk_timer = 0.0
         self._ifr_timer = 0.0
         self.attacking = False
         self.attack_visual_timer = 0.0
+        # Bumped by every swing; a swing hits each enemy at most once however many frames it lasts
+        self.swing_id = 0
+        self.spills = []  # hazards.py: (kind, pos, radius) for the world to stamp
         
         # Poison debuff system
         self.poison_timer = 0.0
@@ -36,9 +48,7 @@ class Player:
         self._dash_duration_timer = 0.0
         self.dash_damage_reduction = 0.4
         
-        # Crit system
-        self.crit_chance = 0.15
-        self.crit_multiplier = 2.0
+        # Crit system (chance and multiplier are in stats)
         self.crit_timer = 0.0
         
         # Combo system
@@ -57,9 +67,7 @@ class Player:
         # NEW: Ultimate ability (Berserk Mode)
         self.ultimate_cooldown = 8.0
         self._ultimate_timer = 0.0
-        self.berserk_active = False
         self.berserk_duration = 5.0
-        self._berserk_timer = 0.0
         self.berserk_damage_mult = 2.5
         self.berserk_speed_mult = 1.5
         
@@ -92,11 +100,71 @@ class Player:
         self.slash_angle = 0.0
         self.last_movement = pygame.Vector2(1, 0)  # Track last movement for facing
         self._area_attack_timer = 0.0
-        
-        # Cache fonts for performance
-        self.combo_font = pygame.font.SysFont("arial", 16, bold=True)
         self.level_up_timer = 0.0  # For level up animation
 
+    # World.rewind captures a player and restores it in place through these
+    def __getstate__(self):
+        return self.__dict__.copy()
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    # Base values, as raised by levels, the shop and the rest stop; modifiers
+    # apply on top, so read self.stats[...] for the value in effect
+
+    melee_damage = property(lambda self: self.stats.base["melee_damage"],
+                            lambda self, v: self.stats.set_base("melee_damage", v))
+    speed = property(lambda self: self.stats.base["speed"],
+                     lambda self, v: self.stats.set_base("speed", v))
+    attack_range = property(lambda self: self.stats.base["attack_range"],
+                            lambda self, v: self.stats.set_base("attack_range", v))
+
+    def _buff(self, stat):
+        mod = self.stats.modifier("loot", stat)
+        return mod[1] if mod else 1.0
+
+    def _set_buff(self, stat, value):
+        if value != self._buff(stat):
+            self.stats.add("loot", stat, mul=value)
+
+    damage_buff = property(lambda self: self._buff("melee_damage"),
+                           lambda self, v: self._set_buff("melee_damage", v))
+    speed_buff = property(lambda self: self._buff("speed"),
+                          lambda self, v: self._set_buff("speed", v))
+
+    @property
+    def combo_count(self):
+        return self._combo_count
+
+    @combo_count.setter
+    def combo_count(self, count):
+        if count != getattr(self, "_combo_count", None):
+            self._combo_count = count
+            self.stats.add("combo", "melee_damage", add=(count - 1) * 2)
+
+    @property
+    def charged_attack_ready(self):
+        return self.stats.modifier("charged", "melee_damage") is not None
+
+    @charged_attack_ready.setter
+    def charged_attack_ready(self, ready):
+        if ready and not self.charged_attack_ready:
+            self.stats.add("charged", "melee_damage", mul=self.charged_attack_damage_mult)
+        elif not ready:
+            self.stats.remove("charged", "melee_damage")
+
+    @property
+    def berserk_active(self):
+        return self.stats.modifier("berserk", "melee_damage") is not None
+
+    @property
+    def _berserk_timer(self):
+        return self.stats.remaining("berserk")
+
+    def _berserk(self, duration):
+        self.stats.add("berserk", "melee_damage", mul=self.berserk_damage_mult, duration=duration)
+        self.stats.add("berserk", "speed", mul=self.berserk_speed_mult, duration=duration)
+
     def apply_poison(self, duration, dps):
         self.poison_timer = max(self.poison_timer, duration)
         self.poison_damage_per_tick = dps
@@ -123,13 +191,14 @@ class Player:
     def try_ultimate(self):
         """Activate Berserk Mode - increased damage & speed"""
         if self.ultimate_charge >= self.ultimate_max_charge:
-            self.berserk_active = True
-            self._berserk_timer = self.berserk_duration
+            self._berserk(self.berserk_duration)
             self.ultimate_charge = 0.0
             return True
         return False
 
     def update(self, dt, keys):
+        self.prev_pos.update(self.pos)
+        self.stats.update(dt)  # berserk and other timed modifiers run out here
         # Update animation time
         self.animation_time += dt
         
@@ -147,9 +216,8 @@ class Player:
             if self._dash_duration_timer <= 0:
                 self.is_dashing = False
         else:
-            # NEW: Apply berserk speed mult
-            speed_mult = self.berserk_speed_mult if self.berserk_active else self.speed_buff
-            self.pos += dir * self.speed * speed_mult * dt
+            # Speed buff and berserk are modifiers on stats["speed"]
+            self.pos += dir * self.stats["speed"] * dt
         
         # Clamp to arena
         margin = ARENA["margin"]
@@ -171,12 +239,6 @@ class Player:
         self.level_up_timer = max(0.0, self.level_up_timer - dt)
         self._area_attack_timer = max(0.0, self._area_attack_timer - dt)
         
-        # NEW: Berserk mode
-        if self.berserk_active:
-            self._berserk_timer -= dt
-            if self._berserk_timer <= 0:
-                self.berserk_active = False
-        
         # Parry duration
         if self.parrying:
             self._parry_duration_timer -= dt
@@ -203,6 +265,7 @@ class Player:
             self._atk_timer = self.attack_cooldown
             self.attacking = True
             self.attack_visual_timer = 0.12
+            self.swing_id += 1
             self.combo_timer = self.combo_timeout
             self.combo_count += 1
             self.max_combo = max(self.max_combo, self.combo_count)
@@ -210,6 +273,11 @@ class Player:
             # Set slash animation
             self.slash_timer = 0.3  # Duration of slash animation
             self.slash_angle = self.facing_angle
+
+            # Combo finisher splatters ink in front of the player, slowing enemies
+            if self.combo_count % HAZARDS["ink_combo"] == 0:
+                ink = self.pos + self.last_movement * self.stats["attack_range"]
+                self.spills.append(("ink", (ink.x, ink.y), HAZARDS["ink_radius"]))
             
             # Check for charged attack
             if self.charged_attack_ready:
@@ -225,24 +293,17 @@ class Player:
         """Area attack - hits all enemies in larger radius"""
         if self._area_attack_timer <= 0.0:
             self._area_attack_timer = self.area_attack_cooldown
+            self.swing_id += 1
             return True
         return False
 
     def get_damage(self):
-        base_dmg = (self.melee_damage + (self.combo_count - 1) * 2) * self.damage_buff
-        
-        # Apply charged attack multiplier
-        if self.charged_attack_ready:
-            base_dmg *= self.charged_attack_damage_mult
-        
-        # NEW: Apply berserk multiplier
-        if self.berserk_active:
-            base_dmg *= self.berserk_damage_mult
-        
-        if random.random() < self.crit_chance:
+        # Combo bonus, damage buff, charged attack and berserk are all modifiers
+        stats = self.stats
+        if self.rng.random() < stats["crit_chance"]:
             self.crit_timer = 0.15
-            return int(base_dmg * self.crit_multiplier)
-        return int(base_dmg)
+            return int(stats["melee_damage"] * stats["crit_multiplier"])
+        return int(stats["melee_damage"])
 
     def take_damage(self, dmg):
         if self._ifr_timer > 0.0:
@@ -262,6 +323,16 @@ class Player:
         self.ultimate_charge = min(self.ultimate_max_charge, self.ultimate_charge + 5)
         return True
 
+    def take_ground_damage(self, dmg):
+        """Damage over time from standing in (or dashing through) a hazard.
+
+        Applied every tick, so unlike take_damage it ignores i-frames and
+        parries and doesn't charge the ultimate; a dash still softens it.
+        """
+        if self.is_dashing:
+            dmg *= 1.0 - self.dash_damage_reduction
+        self.hp = max(0.0, self.hp - dmg)
+
     def alive(self):
         return self.hp > 0
     
@@ -295,8 +366,12 @@ class Player:
         """Track kills for stats"""
         self.total_kills += 1
 
-    def draw(self, surf):
-        # Determine state for sprite rendering
+    def view(self):
+        """Plain-value copy of what draw_player and the HUD read.
+
+        The render thread draws from this and never from the live Player:
+        reading stats fills the StatBlock cache the simulation is changing.
+        """
         if self.is_dashing:
             sprite_state = 'dashing'
         elif self.parrying:
@@ -305,59 +380,90 @@ class Player:
             sprite_state = 'attacking'
         else:
             sprite_state = 'normal'
-        
-        # NEW: Berserk glow with pulsing effect
-        if self.berserk_active:
-            for radius in [self.radius + 15, self.radius + 12, self.radius + 9]:
-                alpha = 100 if radius == self.radius + 9 else 50
-                glow_surf = pygame.Surface((radius * 2 + 10, radius * 2 + 10), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surf, (255, 50, 50, alpha), (radius + 5, radius + 5), radius)
-                surf.blit(glow_surf, (int(self.pos.x) - radius - 5, int(self.pos.y) - radius - 5))
-        
-        # Draw dash trail if dashing
-        if self.is_dashing:
-            glow_surf = pygame.Surface((self.radius * 3, self.radius * 3), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surf, (100, 255, 200, 80), (self.radius * 1.5, self.radius * 1.5), self.radius + 5)
-            surf.blit(glow_surf, (int(self.pos.x) - self.radius * 1.5, int(self.pos.y) - self.radius * 1.5))
-        
-        # Draw player sprite
-        draw_player_sprite(surf, self.pos, self.radius, sprite_state, self.facing_angle, self.animation_time)
-        
-        # Draw slash effect when attacking
-        if self.slash_timer > 0:
-            progress = 1.0 - (self.slash_timer / 0.3)
-            slash_color = (255, 100, 100) if self.crit_timer > 0 else (255, 200, 100)
-            draw_slash_effect(surf, self.pos, self.slash_angle, self.attack_range, progress, slash_color)
-        
-        # Draw parry shield with glow
-        if self.parrying:
-            shield_surf = pygame.Surface((self.radius * 3, self.radius * 3), pygame.SRCALPHA)
-            pygame.draw.circle(shield_surf, (255, 200, 100, 80), (self.radius * 1.5, self.radius * 1.5), self.radius + 10)
-            surf.blit(shield_surf, (int(self.pos.x) - self.radius * 1.5, int(self.pos.y) - self.radius * 1.5))
-            pygame.draw.circle(surf, (255, 200, 100), (int(self.pos.x), int(self.pos.y)), self.radius + 8, 3)
-        
-        # Draw poison indicator
-        if self.poison_timer > 0:
-            pygame.draw.circle(surf, COLORS["poison"], (int(self.pos.x), int(self.pos.y)), self.radius + 4, 2)
-        
-        # Draw combo counter
-        if self.combo_count > 1:
-            combo_color = (255, 255, 100) if self.crit_timer == 0 else (255, 100, 100)
-            combo_text = self.combo_font.render(f"x{self.combo_count}", True, combo_color)
-            surf.blit(combo_text, (self.pos.x + 18, self.pos.y - 22))
-        
-        # Draw dash cooldown
-        if self._dash_timer > 0:
-            cooldown_pct = 1.0 - (self._dash_timer / self.dash_cooldown)
-            arc_radius = self.radius + 8
-            pygame.draw.arc(surf, (150, 200, 255), 
-                           (self.pos.x - arc_radius, self.pos.y - arc_radius, arc_radius * 2, arc_radius * 2),
-                           0, cooldown_pct * 6.28, 2)
-        
-        # Draw parry cooldown
-        if self._parry_timer > 0:
-            cooldown_pct = 1.0 - (self._parry_timer / self.parry_cooldown)
-            arc_radius = self.radius + 14
-            pygame.draw.arc(surf, (255, 180, 100), 
-                           (self.pos.x - arc_radius, self.pos.y - arc_radius, arc_radius * 2, arc_radius * 2),
-                           0, cooldown_pct * 6.28, 2)
\ No newline at end of file
+        return PlayerView(
+            self.pos.copy(), self.radius, sprite_state, self.facing_angle, self.animation_time,
+            self.berserk_active, self._berserk_timer, self.is_dashing, self.parrying,
+            self.slash_timer, self.slash_angle, self.crit_timer, self.stats["attack_range"],
+            self.poison_timer, self.combo_count, self.max_combo,
+            self._dash_timer, self.dash_cooldown, self._parry_timer, self.parry_cooldown,
+            self._area_attack_timer, self.charged_attack_time, self.ultimate_charge, self.ultimate_max_charge,
+            self.damage_buff, self.speed_buff, self.hp, self.max_hp, self.level, self.xp,
+            self.xp_to_next_level, self.total_kills, self.score, self.level_up_timer)
+
+    def draw(self, surf):
+        draw_player(surf, self.view())
+
+
+class PlayerView(namedtuple("PlayerView", "pos radius sprite_state facing_angle animation_time "
+                                          "berserk_active berserk_timer is_dashing parrying "
+                                          "slash_timer slash_angle crit_timer attack_range "
+                                          "poison_timer combo_count max_combo "
+                                          "dash_timer dash_cooldown parry_timer parry_cooldown "
+                                          "area_attack_timer charged_attack_time ultimate_charge ultimate_max_charge "
+                                          "damage_buff speed_buff hp max_hp level xp "
+                                          "xp_to_next_level total_kills score level_up_timer")):
+    __slots__ = ()
+
+    def alive(self):
+        return self.hp > 0
+
+
+def draw_player(surf, p):
+    """Draw a PlayerView"""
+    # NEW: Berserk glow with pulsing effect
+    if p.berserk_active:
+        # Outer layers go first when the quality governor trims glow
+        layers = [p.radius + 15, p.radius + 12, p.radius + 9]
+        for radius in layers[len(layers) - quality.current["glow_layers"]:]:
+            alpha = 100 if radius == p.radius + 9 else 50
+            glow_surf = new_surface((radius * 2 + 10, radius * 2 + 10), pygame.SRCALPHA)
+            pygame.draw.circle(glow_surf, (255, 50, 50, alpha), (radius + 5, radius + 5), radius)
+            surf.blit(glow_surf, (int(p.pos.x) - radius - 5, int(p.pos.y) - radius - 5))
+    
+    # Draw dash trail if dashing
+    if p.is_dashing and quality.current["glow_layers"]:
+        glow_surf = new_surface((p.radius * 3, p.radius * 3), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surf, (100, 255, 200, 80), (p.radius * 1.5, p.radius * 1.5), p.radius + 5)
+        surf.blit(glow_surf, (int(p.pos.x) - p.radius * 1.5, int(p.pos.y) - p.radius * 1.5))
+    
+    # Draw player sprite
+    draw_player_sprite(surf, p.pos, p.radius, p.sprite_state, p.facing_angle, p.animation_time)
+    
+    # Draw slash effect when attacking
+    if p.slash_timer > 0:
+        progress = 1.0 - (p.slash_timer / 0.3)
+        slash_color = (255, 100, 100) if p.crit_timer > 0 else (255, 200, 100)
+        draw_slash_effect(surf, p.pos, p.slash_angle, p.attack_range, progress, slash_color)
+    
+    # Draw parry shield with glow
+    if p.parrying:
+        shield_surf = new_surface((p.radius * 3, p.radius * 3), pygame.SRCALPHA)
+        pygame.draw.circle(shield_surf, (255, 200, 100, 80), (p.radius * 1.5, p.radius * 1.5), p.radius + 10)
+        surf.blit(shield_surf, (int(p.pos.x) - p.radius * 1.5, int(p.pos.y) - p.radius * 1.5))
+        pygame.draw.circle(surf, (255, 200, 100), (int(p.pos.x), int(p.pos.y)), p.radius + 8, 3)
+    
+    # Draw poison indicator
+    if p.poison_timer > 0:
+        pygame.draw.circle(surf, COLORS["poison"], (int(p.pos.x), int(p.pos.y)), p.radius + 4, 2)
+    
+    # Draw combo counter
+    if p.combo_count > 1:
+        combo_color = (255, 255, 100) if p.crit_timer == 0 else (255, 100, 100)
+        combo_text = get_font("arial", 16, bold=True).render(f"x{p.combo_count}", True, combo_color)
+        surf.blit(combo_text, (p.pos.x + 18, p.pos.y - 22))
+    
+    # Draw dash cooldown
+    if p.dash_timer > 0:
+        cooldown_pct = 1.0 - (p.dash_timer / p.dash_cooldown)
+        arc_radius = p.radius + 8
+        pygame.draw.arc(surf, (150, 200, 255), 
+                       (p.pos.x - arc_radius, p.pos.y - arc_radius, arc_radius * 2, arc_radius * 2),
+                       0, cooldown_pct * 6.28, 2)
+    
+    # Draw parry cooldown
+    if p.parry_timer > 0:
+        cooldown_pct = 1.0 - (p.parry_timer / p.parry_cooldown)
+        arc_radius = p.radius + 14
+        pygame.draw.arc(surf, (255, 180, 100), 
+                       (p.pos.x - arc_radius, p.pos.y - arc_radius, arc_radius * 2, arc_radius * 2),
+                       0, cooldown_pct * 6.28, 2)
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Per-subsystem frame timing.
+
+Call begin() at the top of a frame, lap(name) after each subsystem and
+end(**counts) once the frame is done. Timings are averaged over short windows
+so a single hitch doesn't count as the budget breaking; the first window whose
+average goes over budget is remembered together with the live counts (enemies,
+projectiles, ...) and the subsystem that took the most time.
+"""
+from collections import deque
+from time import perf_counter
+
+from config import FPS
+
+
+class FrameProfiler:
+    def __init__(self, budget_ms=1000.0 / FPS, window=30, history=120):
+        self.budget = budget_ms / 1000.0
+        self.window = window
+        self.history = deque(maxlen=history)  # (counts, total, {subsystem: seconds}) per window
+        self.first_over = None  # (counts, total, culprit) of the first window over budget
+        self.subsystem_over = {}  # subsystem -> counts when it alone first took the whole budget
+        self.frames = 0
+        self._t0 = self._last = 0.0
+        self._sections = {}
+        self._acc = {}
+        self._acc_total = 0.0
+        self._acc_frames = 0
+
+    def begin(self):
+        self._t0 = self._last = perf_counter()
+        self._sections.clear()
+
+    def lap(self, name):
+        """Charge the time since the previous lap (or begin) to name"""
+        now = perf_counter()
+        self._sections[name] = self._sections.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def end(self, **counts):
+        now = perf_counter()
+        if now > self._last:
+            self.lap("other")
+        self.frames += 1
+        self._acc_total += now - self._t0
+        for name, t in self._sections.items():
+            self._acc[name] = self._acc.get(name, 0.0) + t
+        self._acc_frames += 1
+        if self._acc_frames >= self.window:
+            self._close_window(counts)
+
+    def _close_window(self, counts):
+        n = self._acc_frames
+        total = self._acc_total / n
+        sections = {name: t / n for name, t in self._acc.items()}
+        self.history.append((counts, total, sections))
+        if total > self.budget and self.first_over is None:
+            culprit = max(sections, key=sections.get)
+            self.first_over = (counts, total, culprit)
+        for name, t in sections.items():
+            if t > self.budget and name not in self.subsystem_over:
+                self.subsystem_over[name] = counts
+        self._acc = {}
+        self._acc_total = 0.0
+        self._acc_frames = 0
+
+    def report(self):
+        """Human readable summary of where the frame budget went"""
+        lines = [f"frame budget {self.budget * 1000:.1f} ms, {self.frames} frames profiled"]
+        if self.history:
+            counts, total, sections = self.history[-1]
+            lines.append(f"last window ({_fmt_counts(counts)}): {total * 1000:.2f} ms")
+            for name, t in sorted(sections.items(), key=lambda kv: kv[1], reverse=True):
+                lines.append(f"  {name:12s} {t * 1000:7.2f} ms  {100 * t / total:5.1f}%")
+        if self.first_over is None:
+            lines.append("budget held for the whole run")
+        else:
+            counts, total, culprit = self.first_over
+            lines.append(f"budget first broken at {_fmt_counts(counts)} "
+                         f"({total * 1000:.2f} ms); largest subsystem: {culprit}")
+        for name, counts in self.subsystem_over.items():
+            lines.append(f"  {name} alone exceeded the budget at {_fmt_counts(counts)}")
+        return "\n".join(lines)
+
+
+def _fmt_counts(counts):
+    return ", ".join(f"{v} {k}" for k, v in counts.items()) or "no counts"
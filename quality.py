@@ -0,0 +1,83 @@
+"""
+Adaptive quality governor.
+
+Each frame the game loop reports how long the update and the draw took. When
+the rolling average falls behind the FPS budget the governor steps down a
+quality level, trimming optional visual work (particles, trails, slash arcs,
+glow layers, menu effects); once there is headroom again it steps back up.
+
+Drawing code reads the knobs from `current`, e.g.
+`quality.current["trail_steps"]`. The dict is updated in place, so it can be
+looked up once and kept.
+"""
+from collections import deque
+from time import monotonic
+
+from config import FPS, QUALITY
+
+LEVELS = QUALITY["levels"]
+current = dict(LEVELS[0])
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms=1000.0 / FPS):
+        self.budget = budget_ms / 1000.0
+        self.level = 0
+        self.pinned = False
+        self.frame_time = 0.0  # rolling average of update + draw, seconds
+        self.actions = deque(maxlen=64)  # (time, old level, new level, reason)
+        self._samples = deque(maxlen=QUALITY["window"])
+        self._total = 0.0
+        self._last_change = 0.0
+
+    def record(self, update_time, draw_time):
+        """Feed one frame's timings (seconds); may change the quality level"""
+        t = update_time + draw_time
+        if len(self._samples) == self._samples.maxlen:
+            self._total -= self._samples[0]
+        self._samples.append(t)
+        self._total += t
+        if self.pinned or len(self._samples) < self._samples.maxlen:
+            return
+        self.frame_time = self._total / len(self._samples)
+        now = monotonic()
+        since = now - self._last_change
+        if (self.frame_time > self.budget * QUALITY["degrade_above"] and self.level < len(LEVELS) - 1
+                and since >= QUALITY["degrade_cooldown"]):
+            self._set(self.level + 1, f"frame {self.frame_time * 1000:.1f} ms over budget", now)
+        elif (self.frame_time < self.budget * QUALITY["restore_below"] and self.level > 0
+              and since >= QUALITY["restore_cooldown"]):
+            self._set(self.level - 1, f"frame {self.frame_time * 1000:.1f} ms, headroom", now)
+
+    def pin(self, level=0):
+        """Hold a fixed quality level (benchmarks); unpin() hands control back"""
+        self.pinned = True
+        self._set(level, "pinned", monotonic())
+
+    def unpin(self):
+        self.pinned = False
+
+    def _set(self, level, reason, now):
+        level = max(0, min(len(LEVELS) - 1, level))
+        if level != self.level:
+            self.actions.append((now, self.level, level, reason))
+        self.level = level
+        current.update(LEVELS[level])
+        self._last_change = now
+        # Judge the new level on its own frames
+        self._samples.clear()
+        self._total = 0.0
+
+    def state(self):
+        """Current quality and recent actions, for telemetry and overlays"""
+        return {
+            "level": self.level,
+            "pinned": self.pinned,
+            "frame_ms": round(self.frame_time * 1000, 2),
+            "settings": dict(current),
+            "actions": [{"t": round(t, 3), "from": a, "to": b, "reason": r}
+                        for t, a, b, r in self.actions],
+        }
+
+
+governor = QualityGovernor()
@@ -0,0 +1,166 @@
+"""
+Low-resolution semantic raster of the arena for agents and analytics.
+
+Every channel is splatted straight from entity positions with NumPy; nothing
+here touches sprite_renderer or the display surface.
+"""
+import numpy as np
+from config import WIDTH, HEIGHT, ARENA, RASTER
+
+CH_WALLS = 0
+CH_PLAYER = 1
+CH_BOSS = 2
+CH_ENEMY = {
+    "math": 3,
+    "cs": 4,
+    "physics": 5,
+    "chemistry": 6,
+    "biology": 7,
+    "history": 8,
+}
+CH_PROJECTILES = 9
+CH_LOOT = 10
+CH_DOOR = 11
+NUM_CHANNELS = 12
+
+CHANNEL_NAMES = ["walls", "player", "boss", "enemy_math", "enemy_cs", "enemy_physics",
+                 "enemy_chemistry", "enemy_biology", "enemy_history",
+                 "projectiles", "loot", "door"]
+
+ENEMY_SUBJECTS = {
+    "MathSwordsman": "math", "MathArcher": "math",
+    "BinaryBlade": "cs", "BugSwarm": "cs",
+    "KineticBrute": "physics", "GravityManipulator": "physics",
+    "AcidicAlchemist": "chemistry",
+    "PoisonMite": "biology", "BioEngineer": "biology",
+    "AncientWarrior": "history", "ArtilleryCommander": "history",
+}
+
+_wall_cache = {}
+_stencil_cache = {}
+
+
+def raster_shape(width=None, height=None):
+    return (NUM_CHANNELS, height or RASTER["height"], width or RASTER["width"])
+
+
+def _walls(h, w):
+    """Arena border mask, computed once per resolution"""
+    key = (h, w)
+    if key not in _wall_cache:
+        ys = (np.arange(h) + 0.5) * (HEIGHT / h)
+        xs = (np.arange(w) + 0.5) * (WIDTH / w)
+        m = ARENA["margin"]
+        inside_y = (ys >= m) & (ys <= HEIGHT - m)
+        inside_x = (xs >= m) & (xs <= WIDTH - m)
+        _wall_cache[key] = (~(inside_y[:, None] & inside_x[None, :])).astype(np.float32)
+    return _wall_cache[key]
+
+
+def _walls_with_obstacles(obstacles, h, w):
+    """Border mask plus a room's obstacle rects, computed once per layout and resolution"""
+    key = (tuple(tuple(r) for r in obstacles), h, w)
+    if key not in _wall_cache:
+        mask = _walls(h, w).copy()
+        sx, sy = w / WIDTH, h / HEIGHT
+        for x, y, rw, rh in key[0]:
+            mask[int(y * sy):int(np.ceil((y + rh) * sy)), int(x * sx):int(np.ceil((x + rw) * sx))] = 1.0
+        _wall_cache[key] = mask
+    return _wall_cache[key]
+
+
+def _stencil(max_cells):
+    """Cell offsets (dy, dx, distance) of a disc covering max_cells"""
+    if max_cells not in _stencil_cache:
+        r = np.arange(-max_cells, max_cells + 1)
+        dy, dx = np.meshgrid(r, r, indexing="ij")
+        dist = np.sqrt(dy * dy + dx * dx).ravel()
+        keep = dist <= max_cells + 0.5
+        _stencil_cache[max_cells] = (dy.ravel()[keep], dx.ravel()[keep], dist[keep])
+    return _stencil_cache[max_cells]
+
+
+def splat(grid, xs, ys, radii, values=1.0):
+    """Stamp discs into a 2D grid (H, W) in one vectorized pass.
+
+    xs, ys and radii are in screen pixels. Overlapping discs keep the larger value.
+    """
+    xs = np.asarray(xs, dtype=np.float32)
+    if xs.size == 0:
+        return grid
+    h, w = grid.shape
+    sx = w / WIDTH
+    sy = h / HEIGHT
+    cx = (xs * sx).astype(np.int32)
+    cy = (np.asarray(ys, dtype=np.float32) * sy).astype(np.int32)
+    rc = np.asarray(radii, dtype=np.float32) * sx
+    dy, dx, dist = _stencil(max(0, int(np.ceil(rc.max()))))
+
+    py = cy[:, None] + dy[None, :]
+    px = cx[:, None] + dx[None, :]
+    mask = (dist[None, :] <= np.maximum(rc, 0.5)[:, None]) & \
+           (py >= 0) & (py < h) & (px >= 0) & (px < w)
+    vals = np.broadcast_to(np.asarray(values, dtype=np.float32).reshape(-1, 1), mask.shape)
+    np.maximum.at(grid.reshape(-1), (py * w + px)[mask], vals[mask])
+    return grid
+
+
+def rasterize(world, out=None, width=None, height=None):
+    """Build a (channels, H, W) float32 raster of the current room.
+
+    Pass out= to reuse a preallocated array each tick.
+    """
+    shape = raster_shape(width, height)
+    if out is None:
+        out = np.zeros(shape, dtype=np.float32)
+    else:
+        out.fill(0.0)
+    _, h, w = out.shape
+    room = world.map_manager.current_room
+    obstacles = getattr(room, "obstacles", None)
+    out[CH_WALLS] = _walls_with_obstacles(obstacles, h, w) if obstacles else _walls(h, w)
+
+    player = world.player
+    splat(out[CH_PLAYER], [player.pos.x], [player.pos.y], [player.radius])
+
+    # Gather per-channel coordinates, then splat each channel once
+    enemy_pts = {}
+    px, py, pr = [], [], []
+    for e in room.enemies:
+        if e.alive():
+            name = type(e).__name__
+            ch = CH_BOSS if name == "ExamBoss" else CH_ENEMY[ENEMY_SUBJECTS.get(name, "math")]
+            xs, ys, rs, hps = enemy_pts.setdefault(ch, ([], [], [], []))
+            xs.append(e.pos.x)
+            ys.append(e.pos.y)
+            rs.append(e.radius)
+            hps.append(e.hp / e.max_hp)
+        for p in getattr(e, "projectiles", ()):
+            if p.alive_flag:
+                px.append(p.pos.x)
+                py.append(p.pos.y)
+                pr.append(p.radius)
+        for b in getattr(e, "batches", ()):
+            rows = b.live()
+            if len(rows):
+                xy = b.positions(rows=rows)
+                px.extend(xy[:, 0].tolist())
+                py.extend(xy[:, 1].tolist())
+                pr.extend(b.radius[rows].tolist())
+    for ch, (xs, ys, rs, hps) in enemy_pts.items():
+        # Enemy cells carry the HP fraction so agents can see who is nearly dead
+        splat(out[ch], xs, ys, rs, hps)
+    splat(out[CH_PROJECTILES], px, py, pr)
+
+    loot = [l for l in world.loot_items if l.alive_flag]
+    if loot:
+        splat(out[CH_LOOT], [l.pos.x for l in loot], [l.pos.y for l in loot],
+              [l.radius for l in loot])
+
+    door = room.door_rect
+    x0 = int(door.left * w / WIDTH)
+    x1 = max(x0 + 1, int(np.ceil(door.right * w / WIDTH)))
+    y0 = max(0, int(door.top * h / HEIGHT))
+    y1 = max(y0 + 1, int(np.ceil(door.bottom * h / HEIGHT)))
+    out[CH_DOOR, y0:y1, x0:x1] = 1.0 if room.door_open else 0.5
+    return out
@@ -0,0 +1,194 @@
+"""
+Pipelined rendering: the simulation publishes an immutable RenderSnapshot each
+tick and a dedicated thread composes and presents it, so frame N is drawn
+while tick N+1 is simulated.
+
+Everything is captured as plain values; the render thread never reads a live
+object, since the simulation keeps changing them (and some, like the
+player's StatBlock, change when read). Enemies and projectiles become tuples
+drawn from the baked sprite icons (blits release the GIL, unlike per-enemy
+drawing code). The player and the room are read out through their view()
+methods, loot and visual effects through theirs, and drawn by the same
+functions the single-threaded path uses. Work that fills the shared sprite
+cache ahead of time (MapManager's next-room warm-up) is handed over with
+call_soon and runs here between frames. Enable with RENDER["threaded"] in
+config.py.
+"""
+import queue
+import threading
+from collections import namedtuple
+from time import perf_counter
+
+import pygame
+
+from config import COLORS
+from sprite_renderer import get_enemy_icon, draw_hp_bar, update_lod
+from player import draw_player
+from loot import draw_loot
+from visual_effects import draw_damage_number
+import hazards
+
+# Enemy class -> sprite_renderer type used for its icon
+ENEMY_SPRITES = {
+    "MathSwordsman": "math", "MathArcher": "math", "ExamBoss": "math",
+    "BinaryBlade": "cs", "BugSwarm": "cs",
+    "KineticBrute": "physics", "GravityManipulator": "physics",
+    "AcidicAlchemist": "chemistry",
+    "PoisonMite": "biology", "BioEngineer": "biology",
+    "AncientWarrior": "history", "ArtilleryCommander": "history",
+}
+
+# Projectile module -> colour, matching each module's Projectile.draw
+PROJECTILE_COLORS = {
+    "chemistry_enemies": (100, 255, 100),
+    "history_enemies": (60, 60, 60),
+}
+
+
+class EnemyView(namedtuple("EnemyView", "sprite radius state x y hp max_hp flash boss")):
+    __slots__ = ()
+
+    def alive(self):
+        return True  # only live enemies are captured; HUD counts them with alive()
+
+
+class SwarmView(namedtuple("SwarmView", "bugs bug_radius flash pos radius hp max_hp")):
+    __slots__ = ()
+
+    def alive(self):
+        return True  # counted by the HUD along with the EnemyViews
+
+
+RenderSnapshot = namedtuple("RenderSnapshot", "background hazards enemies swarms projectiles loot player particles "
+                                              "damage_numbers level_ups room floor elapsed")
+
+
+def snapshot(world):
+    """Capture everything needed to draw the current frame (call on the simulation thread)"""
+    mm = world.map_manager
+    room = mm.current_room
+    enemies = []
+    swarms = []
+    projectiles = []
+    for e in room.enemies:
+        if e.alive() and getattr(e, "flock", False):
+            # Bug swarms: one dot per live bug, plus the swarm's HP bar
+            swarms.append(SwarmView(tuple(map(tuple, e.unit_pos[e.unit_hp > 0.0].astype(int).tolist())),
+                                    e.unit_radius, e.flash_timer > 0, (int(e.pos.x), int(e.pos.y)),
+                                    e.radius, e.hp, e.max_hp))
+        elif e.alive():
+            name = type(e).__name__
+            state = getattr(e, "state", "idle")
+            enemies.append(EnemyView(ENEMY_SPRITES.get(name, name), e.radius,
+                                     state if state in ("windup", "swing") else "idle",
+                                     int(e.pos.x), int(e.pos.y), e.hp, e.max_hp,
+                                     getattr(e, "flash_timer", 0) > 0, name == "ExamBoss"))
+        for p in getattr(e, "projectiles", ()):
+            if p.alive_flag:
+                color = PROJECTILE_COLORS.get(type(p).__module__, COLORS["proj"])
+                projectiles.append((color, (int(p.pos.x), int(p.pos.y)), int(p.radius)))
+        for b in getattr(e, "batches", ()):
+            rows = b.live()
+            for i, pos in zip(rows.tolist(), b.positions(rows=rows).astype(int).tolist()):
+                projectiles.append((b.colors[b.style[i]], tuple(pos), int(b.radius[i])))
+    update_lod(len(enemies) + len(swarms) + len(projectiles))
+    return RenderSnapshot(
+        room.get_background(),
+        room.hazards.codes(),  # never modified in place, safe to share
+        tuple(enemies),
+        tuple(swarms),
+        tuple(projectiles),
+        tuple(l.view() for l in world.loot_items if l.alive_flag),
+        world.player.view(),
+        tuple(p.view() for p in world.particles if p.alive),
+        tuple(dn.view() for dn in world.damage_numbers if dn.alive),
+        tuple(dot for e in world.level_up_effects if e.alive for dot in e.view()),
+        room.view(),
+        mm.room_index + 1,
+        world.elapsed,
+    )
+
+
+def compose(screen, snap):
+    """Draw the world layer of a snapshot"""
+    screen.blit(snap.background, (0, 0))
+    hazards.draw(screen, snap.hazards)
+    for v in snap.enemies:
+        icon = get_enemy_icon(v.sprite, v.radius, v.state)
+        half = icon.get_width() // 2
+        screen.blit(icon, (v.x - half, v.y - half))
+        if v.flash:
+            pygame.draw.circle(screen, (255, 255, 255), (v.x, v.y), v.radius + 2, 2)
+        if v.boss:
+            draw_hp_bar(screen, (v.x, v.y), v.hp, v.max_hp, 70, 6, v.radius + 60)
+        else:
+            draw_hp_bar(screen, (v.x, v.y), v.hp, v.max_hp, 40, 4, v.radius + 24)
+    for bugs, bug_radius, flash, pos, radius, hp, max_hp in snap.swarms:
+        color = (255, 255, 255) if flash else COLORS["bug"]
+        for bug in bugs:
+            pygame.draw.circle(screen, color, bug, bug_radius)
+        draw_hp_bar(screen, pos, hp, max_hp, 40, 4, radius + 12)
+    for color, pos, radius in snap.projectiles:
+        pygame.draw.circle(screen, color, pos, radius)
+    for loot in snap.loot:
+        draw_loot(screen, loot)
+    if snap.player.alive():
+        draw_player(screen, snap.player)
+    for color, pos, size in snap.particles:
+        pygame.draw.circle(screen, color, pos, size)
+    for dn in snap.damage_numbers:
+        draw_damage_number(screen, dn)
+    for pos, size in snap.level_ups:
+        pygame.draw.circle(screen, (255, 215, 0), pos, size)
+
+
+class RenderThread:
+    """Composes and presents snapshots on its own thread.
+
+    Only the newest snapshot matters: one submitted while the previous is
+    still queued replaces it. draw_ui(screen, snap) draws the HUD on top.
+    The simulation thread must not touch the screen until close() returns.
+    """
+    def __init__(self, screen, draw_ui=None):
+        self.screen = screen
+        self.draw_ui = draw_ui
+        self.frames = 0
+        self.frame_time = 0.0  # seconds spent composing the last frame
+        self.on_present = None  # called with each snapshot right after it is flipped
+        self._queue = queue.Queue(maxsize=1)
+        self._jobs = queue.SimpleQueue()  # (fn, args) to run on this thread before the next frame
+        self._thread = threading.Thread(target=self._run, name="render", daemon=True)
+        self._thread.start()
+
+    def submit(self, snap):
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._queue.put(snap)
+
+    def call_soon(self, fn, *args):
+        """Run fn(*args) on the render thread before it composes the next frame; args must be plain values"""
+        self._jobs.put((fn, args))
+
+    def close(self):
+        self.submit(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            snap = self._queue.get()
+            if snap is None:
+                return
+            while not self._jobs.empty():
+                fn, args = self._jobs.get()
+                fn(*args)
+            t0 = perf_counter()
+            compose(self.screen, snap)
+            if self.draw_ui:
+                self.draw_ui(self.screen, snap)
+            self.frame_time = perf_counter() - t0
+            pygame.display.flip()
+            if self.on_present:
+                self.on_present(snap)
+            self.frames += 1
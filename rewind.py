@@ -0,0 +1,173 @@
+"""
+Practice rewind: a ring buffer of the last few seconds of the fight in the current room.
+
+Every REWIND["interval"] seconds of game time the parts of the world that a
+fight changes are captured: the player, the room's enemies (with their timers,
+states, projectiles and bullet batches), the loot on the floor and the room's
+cleared flags. They are pickled together, so references between them survive a
+restore. The random generators they hold (the world's, an endless room's) are
+kept by reference and only their states are pickled, so a restore rewinds the
+live generators rather than handing out copies.
+
+Captures are delta-encoded. Every keyframe_every-th one is compressed on its
+own and the rest are compressed with the last keyframe as zlib's preset
+dictionary, so they only pay for what changed since it. The deque holds
+seconds / interval captures, which bounds memory; a delta keeps its keyframe
+alive, so at most one keyframe beyond the window is held.
+
+Rewinding stays within one room: moving to another clears the buffer, since
+the map behind the door isn't captured. Ground hazards and visual effects
+aren't captured either and are cleared by a rewind.
+"""
+import io
+import pickle
+import random
+import zlib
+from collections import deque
+
+from config import REWIND
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, file):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.rngs = []
+
+    def persistent_id(self, obj):
+        if isinstance(obj, random.Random):
+            for i, rng in enumerate(self.rngs):
+                if rng is obj:
+                    return i
+            self.rngs.append(obj)
+            return len(self.rngs) - 1
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, file, rngs):
+        super().__init__(file)
+        self.rngs = rngs
+
+    def persistent_load(self, pid):
+        return self.rngs[pid]
+
+
+def _dumps(state):
+    """(payload, generators): state pickled with its generators' states after it"""
+    buf = io.BytesIO()
+    pickler = _Pickler(buf)
+    pickler.dump(state)
+    pickler.dump([rng.getstate() for rng in pickler.rngs])
+    return buf.getvalue(), pickler.rngs
+
+
+def _loads(raw, rngs):
+    unpickler = _Unpickler(io.BytesIO(raw), rngs)
+    state = unpickler.load()
+    for rng, rng_state in zip(rngs, unpickler.load()):
+        rng.setstate(rng_state)
+    return state
+
+
+class RewindBuffer:
+    def __init__(self):
+        # (elapsed, key, blob, generators the blob refers to)
+        self.frames = deque(maxlen=max(1, int(REWIND["seconds"] / REWIND["interval"])))
+        self.room = None
+        self.key = None  # raw payload of the newest keyframe
+        self.since_key = 0
+        self.next_capture = 0.0
+
+    def clear(self):
+        self.frames.clear()
+        self.key = None
+
+    def capture(self, world):
+        """Record the world if an interval has passed since the last capture; True if it did"""
+        room = world.current_room
+        if room is not self.room:
+            self.clear()
+            self.room = room
+            self.next_capture = world.elapsed
+        if world.elapsed < self.next_capture:
+            return False
+        self.next_capture = world.elapsed + REWIND["interval"]
+        state = (world.player.__getstate__(), room.enemies, world.loot_items,
+                 room.cleared, room.door_open)
+        raw, rngs = _dumps(state)
+        level = REWIND["compress_level"]
+        if self.key is None or self.since_key >= REWIND["keyframe_every"]:
+            self.key, self.since_key = raw, 0
+            self.frames.append((world.elapsed, None, zlib.compress(raw, level), rngs))
+        else:
+            packer = zlib.compressobj(level, zdict=self.key)
+            self.frames.append((world.elapsed, self.key, packer.compress(raw) + packer.flush(), rngs))
+        self.since_key += 1
+        return True
+
+    def rewind(self, room, to):
+        """(elapsed, state) of the newest capture of room taken at or before game time to.
+
+        Later captures are dropped. When every capture is newer than to the
+        oldest is returned; None when room has none. The generators the
+        capture refers to are set back to their captured states.
+        """
+        frames = self.frames
+        if room is not self.room or not frames:
+            return None
+        while len(frames) > 1 and frames[-1][0] > to:
+            frames.pop()
+        elapsed, key, blob, rngs = frames[-1]
+        if key is None:
+            raw = zlib.decompress(blob)
+        else:
+            unpacker = zlib.decompressobj(zdict=key)
+            raw = unpacker.decompress(blob) + unpacker.flush()
+        # Captures resume from here; the next one starts a fresh keyframe
+        self.key = None
+        self.next_capture = elapsed + REWIND["interval"]
+        return elapsed, _loads(raw, rngs)
+
+    def nbytes(self):
+        """Bytes held by the buffer: compressed captures plus the keyframes they refer to"""
+        keys = {id(key): len(key) for _, key, _, _ in self.frames if key is not None}
+        return sum(len(blob) for _, _, blob, _ in self.frames) + sum(keys.values())
+
+
+if __name__ == "__main__":
+    # python rewind.py [seconds]: capture cost and memory over a scripted fight
+    import os
+    import sys
+    from time import perf_counter
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from world import World
+
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    world = World(["Math", "Computer Science", "Physics", "History"], "Junior", headless=True, seed=1)
+    buffer = RewindBuffer()  # captured by hand here, headless worlds don't keep one
+    world.player.hp = world.player.max_hp = 1e9  # stay in the fight for the whole run
+    keys = pygame.key.get_pressed()
+    times, sizes = [], []
+    tick = 0
+    while world.elapsed < seconds:
+        if tick % 7 == 0:
+            world.player.try_attack()
+        world.update(1 / 60, keys)
+        tick += 1
+        t = perf_counter()
+        if buffer.capture(world):
+            times.append(perf_counter() - t)
+            sizes.append(len(buffer.frames[-1][2]))
+    fought = world.elapsed
+    world.rewinder = buffer
+    t = perf_counter()
+    world.rewind(REWIND["step"])
+    restore = perf_counter() - t
+    times.sort()
+    print(f"{len(times)} captures over {fought:.1f}s of {len(world.current_room.enemies)} enemies: "
+          f"median {times[len(times) // 2] * 1000:.3f} ms, p99 {times[len(times) * 99 // 100] * 1000:.3f} ms, max {times[-1] * 1000:.3f} ms, "
+          f"{sum(sizes) / len(sizes):.0f} bytes each")
+    print(f"buffer {buffer.nbytes() / 1024:.1f} KiB for {len(buffer.frames)} captures, restore {restore * 1000:.3f} ms")
@@ -0,0 +1,142 @@
+"""
+Run snapshots: save a World to disk and resume it later.
+
+File layout: 4-byte magic, u16 format version, u32 payload length, then a
+zlib-compressed pickle of the world. The world carries its own random
+generator (World.rng), so a resumed run rolls exactly as it would have.
+Serialising happens on the caller's thread (it must see a consistent world);
+compression and disk I/O run on a background writer thread so a save never
+stalls a frame.
+
+Saves are not migrated: a file from another format version is rejected, and
+the menu drops it.
+"""
+import os
+import pickle
+import queue
+import struct
+import threading
+import zlib
+
+from config import SAVE
+
+MAGIC = b"STSV"
+VERSION = 7  # bump whenever the pickled layout of anything in a World changes
+_HEADER = struct.Struct("<4sHI")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is missing, corrupt or from another version"""
+
+
+def dumps(world):
+    """Serialise the world to an uncompressed payload (call on the game thread)"""
+    state = {"world": world}
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def encode(payload):
+    body = zlib.compress(payload, SAVE["compress_level"])
+    return _HEADER.pack(MAGIC, VERSION, len(payload)) + body
+
+
+def decode(data):
+    if len(data) < _HEADER.size:
+        raise SnapshotError("snapshot truncated")
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("not a Study Time snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"snapshot version {version} is not supported (expected {VERSION})")
+    try:
+        payload = zlib.decompress(data[_HEADER.size:])
+    except zlib.error as exc:
+        raise SnapshotError(f"snapshot corrupt: {exc}") from None
+    if len(payload) != length:
+        raise SnapshotError("snapshot length mismatch")
+    return payload
+
+
+def write(path, payload):
+    """Write atomically so a crash mid-save never leaves a half-written file"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(encode(payload))
+    os.replace(tmp, path)
+
+
+def save(world, path=None):
+    """Synchronous save, for tools and tests"""
+    write(path or SAVE["path"], dumps(world))
+
+
+def load(path=None):
+    """Rebuild the world from a snapshot"""
+    path = path or SAVE["path"]
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as exc:
+        raise SnapshotError(f"cannot read snapshot: {exc}") from None
+    return pickle.loads(decode(data))["world"]
+
+
+def exists(path=None):
+    return os.path.exists(path or SAVE["path"])
+
+
+def delete(path=None):
+    try:
+        os.remove(path or SAVE["path"])
+    except FileNotFoundError:
+        pass
+
+
+class SnapshotWriter:
+    """Background thread that compresses and writes snapshots.
+
+    Only the newest pending snapshot matters, so a save requested while an
+    older one is still queued replaces it.
+    """
+    def __init__(self, path=None):
+        self.path = path or SAVE["path"]
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+        self.saves_written = 0
+        self.last_error = None
+
+    def save(self, world):
+        payload = dumps(world)
+        self._drop_pending()
+        self._queue.put(payload)
+
+    def discard(self):
+        """Forget pending saves and remove the file (run over)"""
+        self._drop_pending()
+        self._queue.join()
+        delete(self.path)
+
+    def _drop_pending(self):
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self._queue.task_done()
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                if payload is None:
+                    return
+                write(self.path, payload)
+                self.saves_written += 1
+            except OSError as exc:
+                self.last_error = exc
+            finally:
+                self._queue.task_done()
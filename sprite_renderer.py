@@ -4,7 +4,30 @@ instead of simple circles. Creates more polished, game-like visuals.
 """
 import pygame
 import math
-from config import COLORS
+from config import COLORS, LOD
+import quality
+from utils import new_surface
+
+# Level of detail, set once per frame from the live entity count
+LOD_FULL = 0  # animated sprites and every overlay
+LOD_REDUCED = 1  # cached icon blits, HP bars only on damaged enemies
+LOD_MINIMAL = 2  # also no projectile triangles, boss phase text or hit flashes
+_lod = LOD_FULL
+
+
+def update_lod(entity_count):
+    """Pick the detail level for this frame, with hysteresis between levels"""
+    global _lod
+    enter, exit_ = LOD["enter"], LOD["exit"]
+    while _lod < LOD_MINIMAL and entity_count >= enter[_lod]:
+        _lod += 1
+    while _lod > LOD_FULL and entity_count < exit_[_lod - 1]:
+        _lod -= 1
+    return _lod
+
+
+def lod_level():
+    return _lod
 
 
 def draw_player_sprite(surf, pos, radius, state, facing_angle=0, animation_time=0):
@@ -48,7 +71,7 @@ def draw_player_sprite(surf, pos, radius, state, facing_angle=0, animation_time=
         outline_color = (50, 150, 200)
     
     # Draw shadow
-    shadow_surf = pygame.Surface((radius * 3, radius // 2), pygame.SRCALPHA)
+    shadow_surf = new_surface((radius * 3, radius // 2), pygame.SRCALPHA)
     pygame.draw.ellipse(shadow_surf, (0, 0, 0, 80), shadow_surf.get_rect())
     surf.blit(shadow_surf, (x - radius * 1.5, y + radius * 1.5))
     
@@ -133,7 +156,17 @@ def draw_enemy_sprite(surf, pos, radius, enemy_type, state, animation_time=0):
         animation_time: Time for animations
     """
     x, y = int(pos[0]), int(pos[1])
-    
+
+    if _lod:
+        # Crowded room: a still frame blit instead of redrawing the sprite
+        icon = get_enemy_icon(enemy_type, radius, state)
+        half = icon.get_width() // 2
+        surf.blit(icon, (x - half, y - half))
+    else:
+        _draw_enemy_frame(surf, x, y, radius, enemy_type, state, animation_time)
+
+
+def _draw_enemy_frame(surf, x, y, radius, enemy_type, state, animation_time):
     if enemy_type == 'math':
         draw_math_enemy(surf, x, y, radius, state, animation_time)
     elif enemy_type == 'cs':
@@ -151,6 +184,48 @@ def draw_enemy_sprite(surf, pos, radius, enemy_type, state, animation_time=0):
         draw_default_enemy(surf, x, y, radius, state, animation_time)
 
 
+_icon_cache = {}
+
+
+def get_enemy_icon(enemy_type, radius, state='idle'):
+    """
+    Return a pre-rendered still frame of an enemy sprite, baking it on first use
+    
+    The icon is centred on its surface; blit it at pos - (size / 2).
+    """
+    key = (enemy_type, radius, state)
+    icon = _icon_cache.get(key)
+    if icon is None:
+        size = radius * 6
+        icon = new_surface((size, size), pygame.SRCALPHA)
+        _draw_enemy_frame(icon, size // 2, size // 2, radius, enemy_type, state, 0)
+        # Trim the empty margin (keeping the sprite centred) so crowds blit fewer pixels
+        used = icon.get_bounding_rect()
+        c = size // 2
+        half = max(c - used.left, used.right - c, c - used.top, used.bottom - c, 1)
+        icon = icon.subsurface((c - half, c - half, 2 * half, 2 * half)).copy()
+        if pygame.display.get_surface() is not None:
+            icon = icon.convert_alpha()
+        _icon_cache[key] = icon
+    return icon
+
+
+def draw_hp_bar(surf, pos, hp, max_hp, width, height, y_offset):
+    """HP bar centred above pos; below full detail only damaged enemies get one"""
+    if _lod and hp >= max_hp:
+        return
+    x = pos[0] - width / 2
+    y = pos[1] - y_offset
+    pygame.draw.rect(surf, COLORS["ui_hp_back"], (x, y, width, height))
+    pygame.draw.rect(surf, COLORS["ui_hp"], (x, y, width * hp / max_hp, height))
+
+
+def warm_enemy_sprites(enemy_type, radius, states=('idle', 'windup', 'swing')):
+    """Bake the icons for one enemy type ahead of time"""
+    for state in states:
+        get_enemy_icon(enemy_type, radius, state)
+
+
 def draw_math_enemy(surf, x, y, radius, state, animation_time):
     """Draw a scholar/student-like enemy for math"""
     # Body color based on state
@@ -239,7 +314,7 @@ def draw_physics_enemy(surf, x, y, radius, state, animation_time):
     
     # Energy core (glowing)
     core_radius = int(radius * pulse)
-    glow_surf = pygame.Surface((core_radius * 3, core_radius * 3), pygame.SRCALPHA)
+    glow_surf = new_surface((core_radius * 3, core_radius * 3), pygame.SRCALPHA)
     pygame.draw.circle(glow_surf, (*color, 80), (core_radius * 1.5, core_radius * 1.5), core_radius * 1.5)
     surf.blit(glow_surf, (x - core_radius * 1.5, y - core_radius * 1.5))
     
@@ -387,14 +462,14 @@ def draw_slash_effect(surf, pos, angle, size, progress, color=(255, 200, 100)):
         return
     
     alpha = int(255 * (1 - progress))
-    slash_surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    slash_surf = new_surface((size * 2, size * 2), pygame.SRCALPHA)
     
     # Draw arc slash
     start_angle = angle - math.pi / 4
     end_angle = angle + math.pi / 4
     
     # Create slash as a series of lines forming an arc
-    steps = 10
+    steps = quality.current["slash_steps"]
     for i in range(steps):
         t = i / steps
         current_angle = start_angle + (end_angle - start_angle) * t
@@ -416,7 +491,7 @@ def draw_slash_effect(surf, pos, angle, size, progress, color=(255, 200, 100)):
 def draw_projectile_trail(surf, start_pos, end_pos, color, thickness=2):
     """Draw a trail behind a projectile"""
     # Draw gradient trail
-    steps = 5
+    steps = quality.current["trail_steps"]
     for i in range(steps):
         t = i / steps
         alpha = int(150 * (1 - t))
@@ -426,6 +501,6 @@ def draw_projectile_trail(surf, start_pos, end_pos, color, thickness=2):
         
         trail_thickness = int(thickness * (1 - t * 0.5))
         if trail_thickness > 0:
-            trail_surf = pygame.Surface((trail_thickness * 2, trail_thickness * 2), pygame.SRCALPHA)
+            trail_surf = new_surface((trail_thickness * 2, trail_thickness * 2), pygame.SRCALPHA)
             pygame.draw.circle(trail_surf, (*color, alpha), (trail_thickness, trail_thickness), trail_thickness)
             surf.blit(trail_surf, (int(trail_x) - trail_thickness, int(trail_y) - trail_thickness))
@@ -0,0 +1,101 @@
+"""
+Cold-start benchmark.
+
+Launches the game in fresh processes and reports the time from process start
+to the first menu frame and to the first gameplay frame, then prints a
+per-module import-time report (python -X importtime) for the menu and for
+entering a run.
+
+    python startup_benchmark.py [--runs N] [--classes Math,Physics] [--top N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _env(classes):
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    env["STUDYTIME_STARTUP_BENCH"] = classes
+    return env
+
+
+def time_startup(classes):
+    """One cold start; returns {'menu': s, 'gameplay': s} measured from process launch"""
+    start = time.time()
+    out = subprocess.run([sys.executable, "main.py"], cwd=HERE, env=_env(classes),
+                         capture_output=True, text=True, check=False).stdout
+    marks = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0] == "startup":
+            marks[parts[1]] = float(parts[2]) - start
+    return marks
+
+
+def import_times(code, classes):
+    """Run code under -X importtime; returns [(module, self_us, cumulative_us)]"""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=HERE,
+                         env=_env(classes), capture_output=True, text=True, check=False).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def _is_local(module):
+    top = module.split(".")[0]
+    return os.path.exists(os.path.join(HERE, top + ".py"))
+
+
+def report_imports(title, rows, top):
+    local = [r for r in rows if _is_local(r[0])]
+    total = sum(r[1] for r in rows)
+    print(f"\n{title}: {len(rows)} modules, {total / 1000:.1f} ms "
+          f"({sum(r[1] for r in local) / 1000:.1f} ms in game modules)")
+    print(f"  {'self ms':>8} {'cum ms':>8}  module")
+    for name, self_us, cum_us in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        tag = "" if _is_local(name) else "  (external)"
+        print(f"  {self_us / 1000:8.2f} {cum_us / 1000:8.2f}  {name}{tag}")
+    print("  game modules: " + ", ".join(r[0] for r in local))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Study Time cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--classes", default="Math,Physics")
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    samples = [time_startup(args.classes) for _ in range(args.runs)]
+    print(f"cold start over {args.runs} runs (classes: {args.classes})")
+    for mark in ("menu", "gameplay"):
+        values = [s[mark] * 1000 for s in samples if mark in s]
+        if not values:
+            print(f"  {mark:9s} never reached")
+            continue
+        print(f"  {mark:9s} median {statistics.median(values):7.1f} ms  "
+              f"min {min(values):7.1f} ms  max {max(values):7.1f} ms")
+
+    menu = import_times("import main", args.classes)
+    report_imports("menu imports", menu, args.top)
+    seen = {r[0] for r in menu}
+    # Everything imported on top of the menu when a run with these classes starts
+    run = import_times("import main, world, archetypes, map_system; "
+                       f"archetypes.load_subjects([map_system.CLASS_MAP.get(c, 'math') "
+                       f"for c in {args.classes.split(',')!r}])", args.classes)
+    report_imports("run imports", [r for r in run if r[0] not in seen], args.top)
+
+
+if __name__ == "__main__":
+    main()
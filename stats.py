@@ -0,0 +1,85 @@
+"""
+Stat blocks: base values plus a stack of modifiers, with the derived values cached.
+
+A modifier comes from a source ("loot", "berserk", "combo"; later weapons,
+rarities and status effects) and touches one stat through an add layer and a
+mul layer:
+
+    value = (base + sum of adds) * product of muls
+
+Adding a modifier for a (source, stat) pair that already has one replaces it,
+so a source keeps one modifier up to date rather than stacking copies. A
+modifier given a duration expires on its own as the block's clock runs; the
+expiries sit in a heap, so a tick with nothing expiring costs one comparison.
+
+Derived values are worked out on first read and cached until a modifier or the
+base value of that stat changes, so hot paths (movement, damage rolls) read a
+number however long the chains get.
+"""
+import heapq
+
+
+class StatBlock:
+    def __init__(self, **base):
+        self.base = dict(base)
+        self.mods = {}  # stat -> {source: (add, mul, expires or None)}
+        self.clock = 0.0
+        self._expiry = []  # heap of (expires, stat, source)
+        self._cache = {}
+
+    def __getitem__(self, stat):
+        try:
+            return self._cache[stat]
+        except KeyError:
+            value = self._cache[stat] = self._derive(stat)
+            return value
+
+    def _derive(self, stat):
+        value, mul = self.base[stat], 1.0
+        for add, m, _ in self.mods.get(stat, {}).values():
+            value += add
+            mul *= m
+        return value * mul if mul != 1.0 else value
+
+    def set_base(self, stat, value):
+        if self.base.get(stat) != value:
+            self.base[stat] = value
+            self._cache.pop(stat, None)
+
+    def add(self, source, stat, add=0.0, mul=1.0, duration=None):
+        """Put source's modifier on stat, replacing any it already had there"""
+        expires = None if duration is None else self.clock + duration
+        self.mods.setdefault(stat, {})[source] = (add, mul, expires)
+        if expires is not None:
+            heapq.heappush(self._expiry, (expires, stat, source))
+        self._cache.pop(stat, None)
+
+    def remove(self, source, stat=None):
+        """Drop source's modifier on stat, or on every stat"""
+        for s in (stat,) if stat is not None else tuple(self.mods):
+            if self.mods.get(s, {}).pop(source, None) is not None:
+                self._cache.pop(s, None)
+
+    def modifier(self, source, stat):
+        """(add, mul, expires) of source's modifier on stat, or None"""
+        return self.mods.get(stat, {}).get(source)
+
+    def has(self, source):
+        return any(source in m for m in self.mods.values())
+
+    def remaining(self, source):
+        """Seconds until source's timed modifiers run out (0 when it has none)"""
+        ends = [m[source][2] for m in self.mods.values() if source in m and m[source][2] is not None]
+        return max(ends) - self.clock if ends else 0.0
+
+    def update(self, dt):
+        """Run the clock on by dt and drop the modifiers that have expired"""
+        self.clock += dt
+        heap = self._expiry
+        while heap and heap[0][0] <= self.clock:
+            expires, stat, source = heapq.heappop(heap)
+            mod = self.mods.get(stat, {}).get(source)
+            # Skip entries for modifiers that were replaced or removed since
+            if mod is not None and mod[2] == expires:
+                del self.mods[stat][source]
+                self._cache.pop(stat, None)
@@ -1,12 +1,13 @@
 import pygame
-from config import COLORS, WIDTH
-from utils import draw_text
+from config import COLORS, WIDTH, HEIGHT
+from utils import draw_text, get_font
 
 class HUD:
     def __init__(self, font):
         self.font = font
 
     def draw(self, surf, player, enemies, wave, elapsed):
+        """player is a PlayerView (Player.view)"""
         maxw = 240
         hpw = int(maxw * (player.hp / player.max_hp))
         pygame.draw.rect(surf, COLORS["ui_hp_back"], (16, 16, maxw, 18), border_radius=6)
@@ -34,15 +35,15 @@ class HUD:
         # Level up notification
         if player.level_up_timer > 0:
             level_up_text = f"LEVEL UP! Now Level {player.level}!"
-            level_up_surf = pygame.font.SysFont("arial", 32, bold=True).render(level_up_text, True, (255, 215, 0))
+            level_up_surf = get_font("arial", 32, bold=True).render(level_up_text, True, (255, 215, 0))
             alpha = int(255 * min(1.0, player.level_up_timer / 2.0))
             level_up_surf.set_alpha(alpha)
             surf.blit(level_up_surf, (WIDTH//2 - level_up_surf.get_width()//2, HEIGHT//3))
         
         # Ability cooldowns with labels
-        dash_status = "READY ✓" if player._dash_timer == 0 else f"{player._dash_timer:.1f}s"
-        parry_status = "READY ✓" if player._parry_timer == 0 else f"{player._parry_timer:.1f}s"
-        area_status = "READY ✓" if player._area_attack_timer == 0 else f"{player._area_attack_timer:.1f}s"
+        dash_status = "READY ✓" if player.dash_timer == 0 else f"{player.dash_timer:.1f}s"
+        parry_status = "READY ✓" if player.parry_timer == 0 else f"{player.parry_timer:.1f}s"
+        area_status = "READY ✓" if player.area_attack_timer == 0 else f"{player.area_attack_timer:.1f}s"
         
         draw_text(surf, f"[Shift] Dash: {dash_status}", (16, 158), self.font, (150, 200, 255))
         draw_text(surf, f"[C] Parry: {parry_status}", (16, 182), self.font, (255, 180, 100))
@@ -61,7 +62,7 @@ class HUD:
         
         # NEW: Berserk indicator
         if player.berserk_active:
-            berserk_text = f"BERSERK MODE! {player._berserk_timer:.1f}s"
+            berserk_text = f"BERSERK MODE! {player.berserk_timer:.1f}s"
             draw_text(surf, berserk_text, (WIDTH//2 - 80, 50), self.font, (255, 50, 50))
         
         # Buff indicators
@@ -0,0 +1,255 @@
+"""
+Per-session performance telemetry.
+
+Each game session (process) writes one JSONL file under TELEMETRY["dir"]:
+
+- "session": machine info and settings
+- "startup": time from launch to the first menu and gameplay frames
+- "run": one per game started
+- "room": one per room played, with its enemy mix, time to clear,
+  frame-time percentiles, peak projectiles and particles, surfaces
+  allocated and GC pauses
+- "run_end": how and where the run finished
+
+The game thread only queues plain dicts. JSON encoding, the percentile maths
+and disk writes happen on a background thread that flushes every few seconds.
+Frame times and GC pauses are kept as running aggregates (a histogram, and
+count/total/longest per generation), so however long a room is played they
+take the same memory.
+"""
+import atexit
+import gc
+import json
+import os
+import platform
+import queue
+import threading
+import time
+from collections import Counter
+
+import pygame
+
+from config import FPS, TELEMETRY, RENDER, LOD
+import quality
+import utils
+
+
+class GCWatch:
+    """Times garbage collector pauses through gc.callbacks"""
+    def __init__(self):
+        self.pauses = {}  # generation -> (count, seconds, longest) since the last drain
+        self._start = 0.0
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            t = time.perf_counter() - self._start
+            gen = info["generation"]
+            count, total, worst = self.pauses.get(gen, (0, 0.0, 0.0))
+            self.pauses[gen] = (count + 1, total + t, max(worst, t))
+
+    def drain(self):
+        pauses, self.pauses = self.pauses, {}
+        return pauses
+
+    def close(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+
+def machine_info():
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(map(str, pygame.get_sdl_version())),
+    }
+    if pygame.display.get_init():
+        info["video_driver"] = pygame.display.get_driver()
+    return info
+
+
+def percentiles(values):
+    """p50/p90/p99/max of frame times given in seconds, as milliseconds"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    pick = lambda q: round(ordered[min(last, int(q * len(ordered)))] * 1000, 2)
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(ordered[-1] * 1000, 2)}
+
+
+class FrameTimes:
+    """Histogram of frame times (TELEMETRY["frame_bins"] bins of frame_bin_ms)"""
+    def __init__(self):
+        self.bin = TELEMETRY["frame_bin_ms"] / 1000.0
+        self.counts = [0] * TELEMETRY["frame_bins"]
+        self.n = 0
+        self.max = 0.0
+
+    def add(self, dt):
+        self.counts[min(int(dt / self.bin), len(self.counts) - 1)] += 1
+        self.n += 1
+        if dt > self.max:
+            self.max = dt
+
+    def percentiles(self):
+        """As percentiles(), each read as the top of its bin"""
+        if not self.n:
+            return {}
+        ranks = [(name, min(self.n - 1, int(q * self.n)))
+                 for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))]
+        out = {}
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            while ranks and ranks[0][1] < seen:
+                out[ranks.pop(0)[0]] = round(min((i + 1) * self.bin, self.max) * 1000, 2)
+            if not ranks:
+                break
+        out["max"] = round(self.max * 1000, 2)
+        return out
+
+
+def merge_pauses(into, pauses):
+    """Add GCWatch.drain() totals into another such dict; returns into"""
+    for gen, (c, t, w) in pauses.items():
+        count, total, worst = into.get(gen, (0, 0.0, 0.0))
+        into[gen] = (count + c, total + t, max(worst, w))
+    return into
+
+
+def gc_summary(pauses):
+    """Per-generation count, total and longest pause of GCWatch.drain() totals, in milliseconds"""
+    return {f"gen{gen}": {"count": c, "total_ms": round(total * 1000, 3), "max_ms": round(worst * 1000, 3)}
+            for gen, (c, total, worst) in sorted(pauses.items())}
+
+
+class Telemetry:
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(TELEMETRY["dir"], exist_ok=True)
+            name = f"session-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+            path = os.path.join(TELEMETRY["dir"], name)
+        self.path = path
+        self.gc_watch = GCWatch()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        self._room = None
+        self.emit("session", machine=machine_info(), settings={
+            "fps": FPS, "render": RENDER, "lod": LOD, "quality": quality.governor.state()["level"],
+        })
+
+    def emit(self, event, **fields):
+        fields["event"] = event
+        fields["t"] = round(time.time(), 3)
+        self._queue.put(fields)
+
+    # --- runs and rooms (game thread) ---
+
+    def start_run(self, world, mode):
+        mm = world.map_manager
+        self.emit("run", mode=mode, classes=mm.selected_classes, difficulty=mm.difficulty_year,
+                  seed=mm.seed)
+        self._room = None
+
+    def frame(self, world, dt):
+        """Account one presented frame; dt is the frame interval in seconds"""
+        room = world.map_manager.current_room
+        if room is not self._room:
+            self._end_room(world)
+            self._begin_room(world, room)
+        from world import count_projectiles  # loaded with the world, after the menu
+        self._frames.add(dt)
+        projectiles = count_projectiles(room.enemies)
+        if projectiles > self._max_projectiles:
+            self._max_projectiles = projectiles
+        if len(world.particles) > self._max_particles:
+            self._max_particles = len(world.particles)
+        if room.cleared and self._cleared_in is None:
+            self._cleared_in = world.elapsed - self._entered
+
+    def end_run(self, world, reason):
+        self._end_room(world)
+        self._room = None
+        player = world.player
+        self.emit("run_end", reason=reason, elapsed=round(world.elapsed, 2),
+                  floor=world.map_manager.room_index + 1, level=player.level,
+                  kills=player.total_kills, quality_actions=len(quality.governor.actions))
+
+    def _begin_room(self, world, room):
+        self._room = room
+        self._entered = world.elapsed
+        self._cleared_in = None
+        self._frames = FrameTimes()
+        self._max_projectiles = 0
+        self._max_particles = 0
+        self._surfaces = utils.surfaces_allocated
+        self._quality = quality.governor.level
+        self.gc_watch.drain()
+
+    def _end_room(self, world):
+        room = self._room
+        if room is None:
+            return
+        mix = Counter(getattr(e, "archetype", type(e).__name__) for e in room.enemies)
+        self.emit("room", id=room.id, type=room.room_type, subject=room.class_type,
+                  difficulty=room.difficulty_mult, enemies=dict(mix),
+                  cleared_in=None if self._cleared_in is None else round(self._cleared_in, 2),
+                  time=round(world.elapsed - self._entered, 2), frames=self._frames.n,
+                  max_projectiles=self._max_projectiles, max_particles=self._max_particles,
+                  surfaces=utils.surfaces_allocated - self._surfaces,
+                  quality=(self._quality, quality.governor.level),
+                  _frames=self._frames, _gc=self.gc_watch.drain())
+
+    # --- writer thread ---
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self.gc_watch.close()
+
+    def _run(self):
+        interval = TELEMETRY["flush_interval"]
+        with open(self.path, "a", encoding="utf-8") as f:
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    record = self._queue.get(timeout=interval)
+                except queue.Empty:
+                    record = False
+                if record is None:
+                    f.flush()
+                    return
+                if record:
+                    if "_frames" in record:
+                        record["frame_ms"] = record.pop("_frames").percentiles()
+                    if "_gc" in record:
+                        record["gc"] = gc_summary(record.pop("_gc"))
+                    f.write(json.dumps(record) + "\n")
+                if time.monotonic() - last_flush >= interval:
+                    f.flush()
+                    last_flush = time.monotonic()
+
+
+_session = None
+
+
+def start():
+    """Open this process's telemetry session (once); returns None when disabled"""
+    global _session
+    if _session is None and TELEMETRY["enabled"]:
+        _session = Telemetry()
+        atexit.register(_session.close)
+    return _session
+
+
+def current():
+    return _session
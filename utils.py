@@ -1,6 +1,23 @@
 import pygame
 import math
 
+_font_cache = {}
+surfaces_allocated = 0  # read by telemetry to spot per-frame allocation churn
+
+def get_font(name, size, bold=False):
+    """SysFont lookups are slow; create each font once and reuse it"""
+    key = (name, size, bold)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _font_cache[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+def new_surface(size, flags=0):
+    """pygame.Surface, counted so telemetry can report allocations per room"""
+    global surfaces_allocated
+    surfaces_allocated += 1
+    return pygame.Surface(size, flags)
+
 def clamp(value, min_val, max_val):
     return max(min_val, min(max_val, value))
 
@@ -22,6 +39,31 @@ def circle_hit(x1, y1, r1, x2, y2, r2):
     dist = math.sqrt(dx*dx + dy*dy)
     return dist < (r1 + r2)
 
+def swept_circle_hit(a0, a1, ra, b0, b1, rb):
+    """Time of impact of two moving circles over one step, or None if they never touch.
+
+    a0/a1 and b0/b1 are each circle's position at the start and end of the step;
+    the result is the fraction of the step (0..1) at which they first overlap.
+    Fast movers can't tunnel through each other however long the step is.
+    """
+    dx = b0[0] - a0[0]
+    dy = b0[1] - a0[1]
+    r = ra + rb
+    c = dx * dx + dy * dy - r * r
+    if c <= 0.0:
+        return 0.0
+    vx = (b1[0] - b0[0]) - (a1[0] - a0[0])
+    vy = (b1[1] - b0[1]) - (a1[1] - a0[1])
+    a = vx * vx + vy * vy
+    b = dx * vx + dy * vy
+    if a == 0.0 or b >= 0.0:
+        return None  # not moving, or moving apart
+    disc = b * b - a * c
+    if disc < 0.0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    return t if t <= 1.0 else None
+
 def draw_triangle(surface, center, angle_rad, size, color):
     """Draw a simple isosceles triangle pointing along angle_rad"""
     cx, cy = center
@@ -1,22 +1,36 @@
 import pygame
 import random
+from collections import OrderedDict
+from config import DAMAGE_NUMBERS
+from utils import get_font
 
 
 class DamageNumber:
     """Floating damage number that appears when hitting enemies"""
-    def __init__(self, pos, damage, is_crit=False):
+    def __init__(self, pos, damage, is_crit=False, target=None):
         self.pos = pygame.Vector2(pos)
         self.damage = damage
         self.is_crit = is_crit
+        self.target = target  # the enemy it belongs to, for merging later hits
         self.lifetime = 1.0
+        self.since_hit = 0.0
         self.velocity = pygame.Vector2(
             random.uniform(-20, 20),
             random.uniform(-80, -40)
         )
-        self.font = pygame.font.SysFont("arial", 20 if is_crit else 16, bold=True)
         self.alive = True
-    
+        self._text = None  # rendered text, redone only when the number changes
+        self._surf = None
+
+    def add(self, damage, is_crit=False):
+        """Another hit on the same target: tick the number up and keep it on screen"""
+        self.damage += damage
+        self.is_crit = self.is_crit or is_crit
+        self.lifetime = 1.0
+        self.since_hit = 0.0
+
     def update(self, dt):
+        self.since_hit += dt
         self.lifetime -= dt
         if self.lifetime <= 0:
             self.alive = False
@@ -26,18 +40,70 @@ class DamageNumber:
         # Slow down
         self.velocity.y += 100 * dt
     
+    def view(self):
+        """(text, is_crit, alpha, (x, y)) as drawn this frame, for draw_damage_number"""
+        text = f"-{self.damage:g}" + (" CRIT!" if self.is_crit else "")
+        return text, self.is_crit, int(255 * min(1.0, self.lifetime / 1.0)), (int(self.pos.x), int(self.pos.y))
+
     def draw(self, surf):
         if not self.alive:
             return
         
-        alpha = int(255 * min(1.0, self.lifetime / 1.0))
-        color = (255, 100, 100) if self.is_crit else (255, 200, 100)
-        text = f"-{self.damage}" + (" CRIT!" if self.is_crit else "")
-        
-        damage_surf = self.font.render(text, True, color)
+        text, is_crit, alpha, (x, y) = self.view()
+        if text != self._text:
+            self._surf = _render_number(text, is_crit)
+            self._text = text
+        damage_surf = self._surf
         damage_surf.set_alpha(alpha)
-        surf.blit(damage_surf, (int(self.pos.x) - damage_surf.get_width()//2, 
-                                int(self.pos.y)))
+        surf.blit(damage_surf, (x - damage_surf.get_width() // 2, y))
+
+
+def _render_number(text, is_crit):
+    color = (255, 100, 100) if is_crit else (255, 200, 100)
+    return get_font("arial", 20 if is_crit else 16, bold=True).render(text, True, color)
+
+
+# (text, is_crit) -> surface, least recently drawn first; only the render thread uses it
+_number_cache = OrderedDict()
+
+
+def draw_damage_number(surf, view):
+    """Draw a DamageNumber.view(), reusing the rendered text while it is unchanged"""
+    text, is_crit, alpha, (x, y) = view
+    key = (text, is_crit)
+    damage_surf = _number_cache.get(key)
+    if damage_surf is None:
+        damage_surf = _number_cache[key] = _render_number(text, is_crit)
+        if len(_number_cache) > DAMAGE_NUMBERS["text_cache"]:
+            _number_cache.popitem(last=False)
+    else:
+        _number_cache.move_to_end(key)
+    damage_surf.set_alpha(alpha)
+    surf.blit(damage_surf, (x - damage_surf.get_width() // 2, y))
+
+
+class DamageNumbers(list):
+    """The live damage numbers: a list, plus at most one number per target open for merging"""
+    def __init__(self):
+        super().__init__()
+        self.open = {}  # id(target) -> its DamageNumber while it still merges hits
+
+    def add(self, target, pos, damage, is_crit=False):
+        dn = self.open.get(id(target))
+        if dn is not None and dn.target is target and dn.alive and dn.since_hit < DAMAGE_NUMBERS["merge_window"]:
+            dn.add(damage, is_crit)
+        else:
+            dn = DamageNumber(pos, damage, is_crit, target)
+            self.append(dn)
+            self.open[id(target)] = dn
+        return dn
+
+    def update(self, dt):
+        for dn in self:
+            dn.update(dt)
+        self[:] = [dn for dn in self if dn.alive]
+        window = DAMAGE_NUMBERS["merge_window"]
+        self.open = {k: dn for k, dn in self.open.items() if dn.alive and dn.since_hit < window}
 
 
 class HitParticle:
@@ -65,6 +131,10 @@ class HitParticle:
         # Slow down
         self.velocity *= 0.95
     
+    def view(self):
+        """(color, (x, y), size) as drawn this frame"""
+        return self.color, (int(self.pos.x), int(self.pos.y)), self.size
+
     def draw(self, surf):
         if not self.alive:
             return
@@ -111,6 +181,11 @@ class LevelUpEffect:
                 p['pos'] += p['vel'] * dt
                 p['vel'] *= 0.96
     
+    def view(self):
+        """((x, y), size) of each sparkle still showing"""
+        return tuple(((int(p['pos'].x), int(p['pos'].y)), int(4 * (p['lifetime'] / 1.5)))
+                     for p in self.particles if p['lifetime'] > 0)
+
     def draw(self, surf):
         if not self.alive:
             return
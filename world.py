@@ -0,0 +1,337 @@
+import pygame
+import random
+from config import WIDTH, HEIGHT, CROWD
+from utils import swept_circle_hit
+from player import Player
+from map_system import MapManager
+from loot import Loot
+from visual_effects import DamageNumbers, HitParticle, LevelUpEffect
+from sprite_renderer import update_lod
+import quality
+import pathing
+import crowd
+import flocking
+import hazards
+import raycast
+import patterns
+from rewind import RewindBuffer
+
+
+def handle_player_attack(player, enemies, loot_items, damage_numbers, particles):
+    """Resolve the player's melee against enemies.
+
+    A swing stays active for several frames but lands on each enemy once
+    (player.swing_id). damage_numbers (a DamageNumbers) and particles may be
+    None for headless simulation.
+    """
+    hits = 0
+    if not player.attacking:
+        return hits
+    swing = player.swing_id
+    reach = player.stats["attack_range"]
+    for e in enemies:
+        if not e.alive() or getattr(e, "last_swing", None) == swing:
+            continue
+        was_alive = e.hp > 0
+        # Swept along the player's step so a dash-attack hits what it passes through
+        if swept_circle_hit(player.prev_pos, player.pos, reach,
+                            e.pos, e.pos, e.radius) is not None:
+            dmg = player.get_damage()
+            if getattr(e, "flock", False):
+                # Swarms share the hit between the bugs it reaches; those bugs scatter
+                dealt = e.hit_units(player.prev_pos, player.pos, reach, dmg)
+                if not dealt:
+                    continue
+                dmg = round(dealt, 1)
+            else:
+                e.take_damage(dmg)
+                if e.alive():
+                    crowd.knockback(e, player.pos, CROWD["melee_knockback"])
+            e.last_swing = swing
+            hits += 1
+
+            # Show damage number, merged into the enemy's last one if it is still fresh
+            if damage_numbers is not None:
+                is_crit = player.crit_timer > 0
+                damage_numbers.add(e, e.pos.copy(), dmg, is_crit)
+
+            # Create hit particles
+            if particles is not None:
+                for _ in range(quality.current["hit_particles"]):
+                    particles.append(HitParticle(e.pos.copy()))
+
+            # Check if enemy just died
+            if was_alive and not e.alive():
+                # Grant XP based on enemy HP
+                xp_reward = int(e.max_hp * 2)
+                player.gain_xp(xp_reward)
+                player.add_kill()
+
+                # Create more particles on death
+                if particles is not None:
+                    for _ in range(quality.current["death_particles"]):
+                        particles.append(HitParticle(e.pos.copy(), (200, 100, 100)))
+
+                # Drop loot (30% chance), rolled on the run's generator
+                if player.rng.random() < 0.3:
+                    loot_type = player.rng.choice(["health", "damage"])
+                    loot_items.append(Loot(e.pos.copy(), loot_type))
+    return hits
+
+
+def count_projectiles(enemies):
+    return (sum(len(e.projectiles) for e in enemies if hasattr(e, "projectiles"))
+            + sum(patterns.count_live(e.batches) for e in enemies if hasattr(e, "batches")))
+
+
+def update_enemy_projectiles(enemies, player, geometry=None):
+    """Projectile hits on the player; with room geometry, shots that reach a wall are culled"""
+    walls = geometry if geometry is not None and geometry.rects else None
+    for e in enemies:
+        if hasattr(e, "projectiles"):
+            for p in e.projectiles:
+                if p.alive_flag:
+                    if walls and walls.blocks(p.pos, p.radius):
+                        p.alive_flag = False
+                        continue
+                    p.try_hit_player(player)
+        # Pattern bullets already expire where they meet a wall
+        for b in getattr(e, "batches", ()):
+            b.hit_player(player)
+
+
+def trigger_area_attack(player):
+    """Start an area attack if it is off cooldown"""
+    if player.try_area_attack():
+        # Mark for area attack processing
+        player.attacking = True
+        player.attack_visual_timer = 0.2
+        player.stats.add("area_attack", "attack_range", mul=2.0)
+        return True
+    return False
+
+
+class World:
+    """Simulation state for one run: the player, the map and everything spawned in it.
+
+    The interactive game loop and the headless environments share this so both
+    step exactly the same rules. With headless=True no visual effects are created.
+    """
+    def __init__(self, selected_classes, difficulty_year, headless=False, endless=False, horde=False,
+                 seed=None, practice=False):
+        self.headless = headless
+        self.practice = practice  # chosen on the menu; only practice runs can rewind
+        # The run's rolls (run seed, crits, loot) draw from this, and each room
+        # from its own generator seeded off the run seed, so worlds sharing a
+        # process don't disturb each other's streams
+        self.rng = random.Random(seed)
+        self.player = Player((WIDTH / 2, HEIGHT / 2), self.rng)
+        self.map_manager = MapManager(selected_classes, difficulty_year, endless=endless,
+                                      prewarm=not headless, horde=horde, rng=self.rng)
+        self.map_manager.load_map()
+        self.elapsed = 0.0
+        self.loot_items = []  # Track loot drops
+        self.damage_numbers = DamageNumbers()  # Track damage numbers, one per enemy at a time
+        self.particles = []  # Track visual particles
+        self.level_up_effects = []  # Track level up effects
+        # Set when a room is cleared (or the rest stop is reached) so the caller can autosave
+        self.checkpoint = False
+        self._last_room = self.map_manager.current_room
+        # Optional profiler.FrameProfiler; update() and draw() report laps to it
+        self.profiler = None
+        self.rewinder = self._new_rewinder()
+
+    def __getstate__(self):
+        # Visual effects are cosmetic and hold fonts; a resumed run starts without them
+        state = self.__dict__.copy()
+        state["damage_numbers"] = []
+        state["particles"] = []
+        state["level_up_effects"] = []
+        state["profiler"] = None
+        state["rewinder"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.damage_numbers = DamageNumbers()
+        self.rewinder = self._new_rewinder()
+
+    def _new_rewinder(self):
+        # Practice runs only; horde rooms are too big to capture every few ticks
+        if self.practice and not self.headless and not self.map_manager.horde:
+            return RewindBuffer()
+        return None
+
+    @property
+    def current_room(self):
+        return self.map_manager.current_room
+
+    def update(self, dt, keys, pressed_e=False):
+        """Advance the simulation by dt seconds with the given held keys"""
+        self.elapsed += dt
+        player = self.player
+        if not player.alive():
+            return
+        prof = self.profiler
+        enemies = self.map_manager.current_room.enemies
+        ground = self.map_manager.current_room.hazards
+        damage_numbers = None if self.headless else self.damage_numbers
+        particles = None if self.headless else self.particles
+
+        # Track level before update
+        old_level = player.level
+
+        # Track space key hold for charged attack (only when not on cooldown)
+        if keys[pygame.K_SPACE] and player._atk_timer <= 0.0:
+            player.charged_attack_time += dt
+
+        player.update(dt, keys)
+        if player.spills:
+            ground.drain(player.spills)  # from attacks made since the last tick
+        if ground.hurts[hazards.PLAYER]:
+            # Slowed by where the step ends, hurt by the worst cell it crossed, so a dash can't skip one
+            player.take_ground_damage(ground.hinder(player, player.prev_pos, hazards.PLAYER) * dt)
+        if prof:
+            prof.lap("player")
+
+        # An area attack doubles the range for the one resolve that follows it
+        handle_player_attack(player, enemies, self.loot_items, damage_numbers, particles)
+        player.stats.remove("area_attack", "attack_range")
+
+        # Check if leveled up
+        if player.level > old_level and not self.headless:
+            self.level_up_effects.append(LevelUpEffect(player.pos.copy()))
+        if prof:
+            prof.lap("melee")
+
+        pathing.track(self.map_manager.current_room, player.pos)
+        raycast.track(self.map_manager.current_room)
+        swarms = [e for e in enemies if getattr(e, "flock", False) and e.alive()]
+        if swarms:
+            flocking.step(swarms, dt, player, self.map_manager.current_room.geometry)
+        hinder = ground.hurts[hazards.ENEMIES]
+        for e in enemies:
+            if e.alive():
+                if hinder:
+                    start = (e.pos.x, e.pos.y)
+                    e.update(dt, player)
+                    if getattr(e, "flock", False):
+                        dps = ground.sample(e.pos, hazards.ENEMIES)[0]  # bugs move in flocking.step
+                    else:
+                        dps = ground.hinder(e, start, hazards.ENEMIES)
+                    if dps:
+                        e.take_damage(dps * dt)
+                else:
+                    e.update(dt, player)
+                if getattr(e, "spills", None):
+                    ground.drain(e.spills)
+        if prof:
+            prof.lap("enemies")
+
+        # Entities move freely in their own update; push them off each other, then out of the walls
+        bodies = [e for e in enemies if e.alive() and not getattr(e, "flock", False)]
+        bodies.append(player)
+        crowd.separate(bodies, dt)
+        geometry = self.map_manager.current_room.geometry
+        if geometry.rects:
+            for body in bodies:
+                geometry.resolve(body.pos, body.radius)
+        if prof:
+            prof.lap("crowd")
+
+        update_enemy_projectiles(enemies, player, geometry)
+        if prof:
+            prof.lap("projectiles")
+
+        # Update loot items
+        for loot in self.loot_items:
+            if loot.alive_flag:
+                loot.update(dt, player)
+        # Remove collected/expired loot
+        self.loot_items = [l for l in self.loot_items if l.alive_flag]
+
+        ground.update(dt)
+
+        # Update visual effects
+        self.damage_numbers.update(dt)
+
+        for p in self.particles:
+            p.update(dt)
+        self.particles = [p for p in self.particles if p.alive]
+
+        for effect in self.level_up_effects:
+            effect.update(dt)
+        self.level_up_effects = [e for e in self.level_up_effects if e.alive]
+        if prof:
+            prof.lap("effects")
+
+        room = self.map_manager.current_room
+        was_cleared = room.cleared
+        self.map_manager.update_logic(player, dt, pressed_e)
+        room = self.map_manager.current_room
+        if (room.cleared and not was_cleared) or (room.room_type == "shop" and room is not self._last_room):
+            self.checkpoint = True
+        self._last_room = room
+        if self.rewinder is not None:
+            self.rewinder.capture(self)
+        if prof:
+            prof.lap("map")
+
+    def rewind(self, seconds):
+        """Practice mode: go back seconds within the current room; False if nothing was captured"""
+        if self.rewinder is None:
+            return False
+        room = self.current_room
+        frame = self.rewinder.rewind(room, self.elapsed - seconds)
+        if frame is None:
+            return False
+        self.elapsed, (player, enemies, loot, room.cleared, room.door_open) = frame
+        self.player.__setstate__(player)
+        room.enemies[:] = enemies  # the game loop holds on to this list
+        self.loot_items = loot
+        # Hazards and effects aren't captured; leaving them would show what hasn't happened yet
+        room._hazards = None
+        self.damage_numbers = DamageNumbers()
+        self.particles = []
+        self.level_up_effects = []
+        return True
+
+    def draw(self, screen):
+        """Draw the room, its enemies, loot, the player and visual effects"""
+        prof = self.profiler
+        room = self.map_manager.current_room
+        # Live entities only, as render_thread.snapshot counts them
+        update_lod(sum(1 for e in room.enemies if e.alive()) + count_projectiles(room.enemies))
+        screen.blit(room.get_background(), (0, 0))
+        hazards.draw(screen, room.hazards.codes())
+
+        for e in room.enemies:
+            if e.alive():
+                e.draw(screen)
+        if prof:
+            prof.lap("draw_enemies")
+
+        # Draw loot items
+        for loot in self.loot_items:
+            if loot.alive_flag:
+                loot.draw(screen)
+
+        if self.player.alive():
+            self.player.draw(screen)
+
+        # Draw visual effects
+        for p in self.particles:
+            p.draw(screen)
+
+        for dn in self.damage_numbers:
+            dn.draw(screen)
+
+        for effect in self.level_up_effects:
+            effect.draw(screen)
+        if prof:
+            prof.lap("draw_effects")
+
+    def is_over(self):
+        """True once the player died or the final room has been cleared"""
+        mm = self.map_manager
+        return not self.player.alive() or (mm.is_final_room() and mm.current_room.cleared)